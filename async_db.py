@@ -0,0 +1,156 @@
+# Asenkron Veri Erişim Katmanı
+# Senkron SQLAlchemy fonksiyonlarını sınırlı bir thread havuzunda çalıştırarak
+# NiceGUI olay döngüsünün (event loop) yavaş sorgular yüzünden kilitlenmesini önler
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+# Aynı anda çalışabilecek veritabanı çağrısı sayısı.
+# SQLAlchemy bağlantı havuzunun (varsayılan 5 + 10 taşma) üstüne çıkmamalıdır.
+DB_THREADS = int(os.getenv("DB_THREADS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="db")
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Senkron bir veri fonksiyonunu thread havuzunda çalıştırır ve sonucunu bekler
+
+    ContextVar değerleri (ör. sorgu bütçesi sayaçları) çağrıyla birlikte thread'e taşınır.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(context.run, func, *args, **kwargs))
+
+async def call_handler(handler: Any) -> None:
+    """Senkron ya da async olabilen geri çağırma fonksiyonunu çalıştırır"""
+    if handler is None:
+        return
+    result = handler()
+    if asyncio.iscoroutine(result):
+        await result
+
+def shutdown() -> None:
+    """Bekleyen çağrıları iptal eder ve havuzu kapatır (uygulama kapanışında çağrılır)"""
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+# Test fonksiyonu
+def test_concurrency(clients: int = 8, query_seconds: float = 0.2) -> bool:
+    """Eşzamanlı istemcilerin sıraya girmediğini ve olay döngüsünün donmadığını doğrular
+
+    Her istemci `query_seconds` süren bloklayıcı bir sorgu çalıştırır. Çağrılar sıraya
+    girseydi toplam süre clients x query_seconds olurdu; offload ile yaklaşık tek sorgu süresidir.
+    """
+    def slow_query(client_id: int) -> int:
+        time.sleep(query_seconds)  # Yavaş veritabanı çağrısı yerine
+        return client_id
+
+    async def scenario() -> tuple:
+        max_lag = 0.0
+        stop = asyncio.Event()
+
+        async def heartbeat() -> None:
+            # Olay döngüsü gecikmesini ölç: 10 ms'lik uyku ne kadar geç uyanıyor?
+            nonlocal max_lag
+            while not stop.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                max_lag = max(max_lag, time.perf_counter() - start - 0.01)
+
+        monitor = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(run_db(slow_query, i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+        return results, elapsed, max_lag
+
+    results, elapsed, max_lag = asyncio.run(scenario())
+    serial = clients * query_seconds
+    batches = -(-clients // DB_THREADS)
+    parallel_ok = elapsed < serial * 0.75 and elapsed < batches * query_seconds + 0.15
+    lag_ok = max_lag < query_seconds / 2
+    print(f"{'✅' if parallel_ok else '❌'} {clients} istemci: {elapsed:.2f} sn (sıralı olsaydı {serial:.2f} sn)")
+    print(f"{'✅' if lag_ok else '❌'} En yüksek olay döngüsü gecikmesi: {max_lag * 1000:.1f} ms")
+    return sorted(results) == list(range(clients)) and parallel_ok and lag_ok
+
+def test_page_handlers(clients: int = 8, lock_seconds: float = 0.3) -> bool:
+    """Gerçek sayfa veri fonksiyonu (get_books_page) yavaş bir SQLite çağrısında döngüyü dondurmuyor mu?
+
+    Başka bir bağlantı veritabanını EXCLUSIVE kilitle `lock_seconds` boyunca tutar; sayfa sorguları
+    SQLite'ın meşgul bekleyişinde (GIL bırakılmış halde) bekler. Aynı çağrılar önce doğrudan olay
+    döngüsünde (karşılaştırma), sonra run_db ile çalıştırılır.
+    """
+    import sqlite3
+    import tempfile
+    import threading
+    from sqlalchemy import insert
+    import main
+
+    original_url = main.engine.url.render_as_string(hide_password=False)
+    path = os.path.join(tempfile.mkdtemp(prefix="async_db_"), "pages.db")
+    main.bind_database(f"sqlite:///{path}")
+    main.init_db()
+    db = main.SessionLocal()
+    try:
+        db.execute(insert(main.Book), [{"title": f"Kitap {i:05d}", "author": "Yazar"} for i in range(2000)])
+        db.commit()
+    finally:
+        db.close()
+
+    async def scenario(offload: bool) -> tuple:
+        locked = threading.Event()
+
+        def hold_lock() -> None:
+            connection = sqlite3.connect(path, isolation_level=None)
+            connection.execute("BEGIN EXCLUSIVE")
+            locked.set()
+            time.sleep(lock_seconds)
+            connection.execute("ROLLBACK")
+            connection.close()
+
+        locker = threading.Thread(target=hold_lock)
+        locker.start()
+        locked.wait()
+        max_lag = 0.0
+        stop = asyncio.Event()
+
+        async def heartbeat() -> None:
+            nonlocal max_lag
+            while not stop.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                max_lag = max(max_lag, time.perf_counter() - start - 0.01)
+
+        monitor = asyncio.create_task(heartbeat())
+        await asyncio.sleep(0.02)
+        if offload:
+            pages = await asyncio.gather(*(run_db(main.get_books_page) for _ in range(clients)))
+        else:
+            pages = [main.get_books_page() for _ in range(clients)]
+        stop.set()
+        await monitor
+        locker.join()
+        return pages, max_lag
+
+    try:
+        _, inline_lag = asyncio.run(scenario(offload=False))
+        pages, offload_lag = asyncio.run(scenario(offload=True))
+    finally:
+        main.bind_database(original_url)
+    pages_ok = all(len(page["items"]) == main.DEFAULT_PAGE_SIZE for page in pages)
+    lag_ok = offload_lag < lock_seconds / 4 and inline_lag > lock_seconds / 2
+    print(f"{'✅' if pages_ok and lag_ok else '❌'} get_books_page x{clients}: run_db ile döngü gecikmesi "
+          f"{offload_lag * 1000:.1f} ms, doğrudan çağrıda {inline_lag * 1000:.1f} ms")
+    return pages_ok and lag_ok
+
+if __name__ == "__main__":
+    import sys
+    print("🧪 Asenkron veri erişim katmanı test ediliyor...")
+    passed = test_concurrency()
+    passed = test_page_handlers() and passed
+    sys.exit(0 if passed else 1)
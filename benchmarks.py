@@ -0,0 +1,385 @@
+# Performans Ölçümleri (Benchmark)
+# Veri erişim katmanının bellek ve süre maliyetlerini karşılaştırır
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import closing
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from database_manager import NUMPY_AVAILABLE, RESULT_FORMATS, SQLiteManager
+
+def measure(func: Callable[[], Any]) -> Tuple[Any, float, int]:
+    """Fonksiyonu çalıştırır: (sonuç, süre sn, tepe bellek bayt)
+    tracemalloc süreyi şişirdiği için süre ve bellek ayrı çalıştırmalarda ölçülür.
+    """
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def _seed_loans(db: SQLiteManager, rows: int, members: int = 5000, books: int = 20000, seed: int = 42) -> None:
+    """Sentetik üye, kitap ve ödünç kayıtları oluşturur"""
+    rng = random.Random(seed)
+    today = date.today()
+    with closing(db.get_connection()) as connection:
+        connection.executemany(
+            "INSERT INTO members (name, email) VALUES (?, ?)",
+            ((f"Üye {i}", f"uye{i}@ornek.com") for i in range(members)),
+        )
+        connection.executemany(
+            "INSERT INTO books (title, author, isbn, year) VALUES (?, ?, ?, ?)",
+            ((f"Kitap {i}", f"Yazar {i % 700}", f"978-{i:09d}", 1900 + i % 120) for i in range(books)),
+        )
+        loans = []
+        for _ in range(rows):
+            loan_date = today - timedelta(days=rng.randint(0, 720))
+            returned = rng.random() < 0.8
+            loans.append((
+                rng.randint(1, books), rng.randint(1, members), loan_date.isoformat(),
+                (loan_date + timedelta(days=14)).isoformat(),
+                (loan_date + timedelta(days=rng.randint(1, 30))).isoformat() if returned else None,
+            ))
+        connection.executemany(
+            "INSERT INTO loans (book_id, member_id, loan_date, due_date, return_date) VALUES (?, ?, ?, ?, ?)",
+            loans,
+        )
+        connection.commit()
+
+def _active_loans_per_member(result: Any, result_format: str) -> Dict[int, int]:
+    """Rapor örneği: üye başına aktif (iade edilmemiş) ödünç sayısı"""
+    if result_format == "dict":
+        return Counter(row["member_id"] for row in result if row["return_date"] is None)
+    if result_format == "tuple":
+        return Counter(member_id for member_id, return_date in result if return_date is None)
+    if result_format == "row":
+        return Counter(row.member_id for row in result if row.return_date is None)
+    member_ids, return_dates = result["member_id"], result["return_date"]
+    if NUMPY_AVAILABLE:
+        import numpy as np
+        active = np.array([value is None for value in return_dates], dtype=bool)
+        ids, counts = np.unique(member_ids[active], return_counts=True)
+        return dict(zip(ids.tolist(), counts.tolist()))
+    return Counter(member_id for member_id, return_date in zip(member_ids, return_dates) if return_date is None)
+
+def benchmark_result_formats(rows: int = 500000) -> List[Dict[str, Any]]:
+    """execute_query() sonuç biçimlerini ödünç tablosunun tamamı üzerinde karşılaştırır"""
+    db = SQLiteManager(os.path.join(tempfile.mkdtemp(), "benchmark.db"), pool_max=1)
+    _seed_loans(db, rows)
+    query = "SELECT id, book_id, member_id, loan_date, due_date, return_date FROM loans"
+    report_query = "SELECT member_id, return_date FROM loans"
+
+    results = []
+    expected = None
+    for result_format in RESULT_FORMATS:
+        fetched, fetch_time, fetch_peak = measure(lambda: db.execute_query(query, result_format=result_format))
+        del fetched
+        report, report_time, report_peak = measure(
+            lambda: _active_loans_per_member(db.execute_query(report_query, result_format=result_format), result_format)
+        )
+        report = dict(report)
+        if expected is None:
+            expected = report
+        results.append({
+            "format": result_format,
+            "fetch_seconds": round(fetch_time, 3),
+            "fetch_peak_mb": round(fetch_peak / 1e6, 1),
+            "report_seconds": round(report_time, 3),
+            "report_peak_mb": round(report_peak / 1e6, 1),
+            "consistent": report == expected,
+        })
+    db.close()
+
+    print(f"📊 {rows} ödünç kaydı (NumPy: {'var' if NUMPY_AVAILABLE else 'yok'})")
+    print(f"{'biçim':<8} {'okuma sn':>9} {'okuma MB':>9} {'rapor sn':>9} {'rapor MB':>9}")
+    for result in results:
+        mark = "✅" if result["consistent"] else "❌"
+        print(f"{result['format']:<8} {result['fetch_seconds']:>9} {result['fetch_peak_mb']:>9} "
+              f"{result['report_seconds']:>9} {result['report_peak_mb']:>9} {mark}")
+    return results
+
+def benchmark_batched_writes(rows: int = 100000, sample: int = 2000) -> Dict[str, Any]:
+    """Satır başına execute_update() ile tek transaction'lı execute_many() yazma hızını karşılaştırır
+    Satır başına yazma yavaş olduğundan `sample` satır ölçülüp `rows` için oransal tahmin yapılır.
+    """
+    db = SQLiteManager(os.path.join(tempfile.mkdtemp(), "benchmark.db"), pool_max=1)
+    query = "INSERT INTO books (title, author, isbn, year) VALUES (?, ?, ?, ?)"
+    make_row = lambda i: (f"Kitap {i}", f"Yazar {i % 700}", f"978-{i:09d}", 1900 + i % 120)
+
+    start = time.perf_counter()
+    for i in range(sample):
+        db.execute_update(query, make_row(i))
+    single_seconds = (time.perf_counter() - start) * rows / sample
+
+    start = time.perf_counter()
+    inserted = db.execute_many(query, (make_row(i) for i in range(sample, sample + rows)))
+    batch_seconds = time.perf_counter() - start
+    db.close()
+
+    ok = inserted == rows
+    print(f"📊 {rows} satır ekleme")
+    print(f"   execute_update (satır başına commit, tahmini): {single_seconds:.1f} sn")
+    print(f"{'✅' if ok else '❌'} execute_many (tek transaction): {batch_seconds:.2f} sn "
+          f"({single_seconds / max(batch_seconds, 1e-9):.0f}x)")
+    return {"rows": rows, "single_seconds": round(single_seconds, 2), "batch_seconds": round(batch_seconds, 3)}
+
+# Benchmark takımı: main.py veri fonksiyonları ve DatabaseManager arka uçları
+# Varsayılan ölçüm tekrarları (ısınma çalıştırması hariç)
+SUITE_REPEAT = 3
+# Medyan süre tabandan bu oranda ve MIN_REGRESSION_SECONDS'tan fazla uzunsa regresyon sayılır
+REGRESSION_TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.005
+# Ödünç ver/iade et döngüsünün bir ölçümdeki tekrar sayısı
+LOAN_CYCLES = 20
+# Sentetik veri seti referans tarihi: aynı tohumla her çalıştırmada aynı veri
+BENCHMARK_TODAY = date(2026, 1, 1)
+BENCHMARK_LOANS_SQL = "SELECT id, book_id, member_id, loan_date, due_date, return_date FROM loans"
+
+def time_case(func: Callable[[], Any], repeat: int = SUITE_REPEAT, warmup: bool = True) -> Dict[str, Any]:
+    """Fonksiyonu (isteğe bağlı bir ısınma çalıştırmasından sonra) `repeat` kez çalıştırır"""
+    if warmup:
+        func()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    ordered = sorted(runs)
+    return {
+        "median": round(ordered[len(ordered) // 2], 6),
+        "min": round(ordered[0], 6),
+        "runs": [round(run, 6) for run in runs],
+    }
+
+def _quiet(func: Callable[[], Any]) -> Callable[[], Any]:
+    """Rapor yazdıran fonksiyonların çıktısını ölçüm sırasında bastırır"""
+    def wrapper() -> Any:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapper
+
+def _prepare_backend(backend: str, size: str, seed: int, workdir: str):
+    """Veri setini üretir, main.py'yi arka uca bağlar; (DatabaseManager, yer tutucu) döndürür"""
+    import main
+    from generate_dataset import PRESETS, SyntheticSource, load_postgres, load_sqlite
+
+    source = SyntheticSource(seed=seed, today=BENCHMARK_TODAY, **PRESETS[size])
+    quiet = lambda message: None
+    if backend == "sqlite":
+        path = os.path.join(workdir, f"benchmark_{size}.db")
+        if os.path.exists(path):
+            os.remove(path)
+        main.bind_database(f"sqlite:///{path}")
+        _quiet(main.init_db)()
+        load_sqlite(source, path, log=quiet)
+        return SQLiteManager(path, pool_max=1), "?"
+
+    from sqlalchemy.engine import URL
+    from config import get_connection_params
+    from database_manager import PostgreSQLManager
+
+    # Tablolar her boyutta TRUNCATE edilir: ayrı bir benchmark veritabanı kullanılmalı
+    params = {**get_connection_params(), "database": os.getenv("BENCHMARK_DB_NAME", "library_benchmark")}
+    main.bind_database(URL.create(
+        "postgresql+psycopg2", username=params["user"], password=params["password"],
+        host=params["host"], port=int(params["port"]), database=params["database"],
+    ))
+    _quiet(main.init_db)()
+    load_postgres(source, reset=True, log=quiet, params=params)
+    return PostgreSQLManager(params, pool_max=2), "%s"
+
+def _suite_cases(manager, placeholder: str) -> List[Tuple[str, Callable[[], Any], bool]]:
+    """(ad, fonksiyon, ağır mı) listesi; ağır durumlar ısınmasız tek sefer ölçülür"""
+    import main
+
+    db = main.get_db()
+    try:
+        book_id = db.query(main.Book.id).filter(main.BOOK_AVAILABLE).order_by(main.Book.id).first()[0]
+        member_id = db.query(main.Member.id).order_by(main.Member.id).first()[0]
+    finally:
+        db.close()
+    today = date.today()
+
+    def loan_cycle() -> None:
+        for _ in range(LOAN_CYCLES):
+            loan_id = main.create_loan(book_id, member_id, today.isoformat(), (today + timedelta(days=14)).isoformat())
+            main.return_book(loan_id)
+
+    insert_query = f"INSERT INTO books (title, author, isbn, year) VALUES ({', '.join([placeholder] * 4)})"
+    return [
+        ("main.get_books", main.get_books, False),
+        ("main.get_books_page", lambda: main.get_books_page(limit=50), False),
+        ("main.get_available_books", main.get_available_books, False),
+        ("main.get_active_loans", main.get_active_loans, False),
+        ("main.get_active_loans_page", lambda: main.get_active_loans_page(limit=50), False),
+        (f"main.create_loan+return_book x{LOAN_CYCLES}", loan_cycle, False),
+        ("main.merge_duplicate_books(dry_run)", _quiet(lambda: main.merge_duplicate_books(dry_run=True)), False),
+        ("main.merge_duplicate_members(dry_run)", _quiet(lambda: main.merge_duplicate_members(dry_run=True)), False),
+        ("main.find_near_duplicate_members", main.find_near_duplicate_members, True),
+        ("main.find_near_duplicate_books", main.find_near_duplicate_books, True),
+        ("manager.execute_query[dict]", lambda: manager.execute_query(BENCHMARK_LOANS_SQL), False),
+        ("manager.execute_query[tuple]", lambda: manager.execute_query(BENCHMARK_LOANS_SQL, result_format="tuple"), False),
+        ("manager.iter_query", lambda: sum(1 for _ in manager.iter_query(BENCHMARK_LOANS_SQL, result_format="tuple")), False),
+        ("manager.execute_many x10000", lambda: manager.execute_many(
+            insert_query, ((f"Benchmark {i}", "benchmark", None, 2000) for i in range(10000))
+        ), False),
+    ]
+
+def run_suite(sizes: Sequence[str] = ("small", "medium"), backends: Sequence[str] = ("sqlite", "postgresql"),
+              seed: int = 42, repeat: int = SUITE_REPEAT) -> Dict[str, Any]:
+    """Her arka uç ve veri seti boyutunda tüm durumları ölçer
+    Dönüş: {"meta": {...}, "results": {"arka uç/boyut/durum": {"median", "min", "runs"}}}
+    """
+    import platform
+    import subprocess
+    import sqlalchemy
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "numpy": NUMPY_AVAILABLE,
+            "seed": seed,
+            "sizes": list(sizes),
+            "backends": [],
+            "skipped_backends": {},
+        },
+        "results": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="benchmark_")
+    for backend in backends:
+        for size in sizes:
+            print(f"🏗️ {backend}/{size}: veri seti hazırlanıyor...")
+            start = time.perf_counter()
+            try:
+                manager, placeholder = _prepare_backend(backend, size, seed, workdir)
+            except Exception as exc:
+                if backend == "postgresql":
+                    print(f"⚠️ PostgreSQL atlandı: {exc}")
+                    report["meta"]["skipped_backends"][backend] = str(exc)
+                    break
+                raise
+            print(f"   {time.perf_counter() - start:.1f} sn")
+            try:
+                for name, func, heavy in _suite_cases(manager, placeholder):
+                    key = f"{backend}/{size}/{name}"
+                    result = time_case(func, repeat=1 if heavy else repeat, warmup=not heavy)
+                    report["results"][key] = result
+                    print(f"   ⏱️ {name:<42} {result['median'] * 1000:>10.1f} ms")
+                manager.execute_update(f"DELETE FROM books WHERE author = {placeholder}", ("benchmark",))
+            finally:
+                manager.close()
+        else:
+            report["meta"]["backends"].append(backend)
+    return report
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = REGRESSION_TOLERANCE,
+                        min_seconds: float = MIN_REGRESSION_SECONDS) -> List[Dict[str, Any]]:
+    """Medyan süreleri tabanla karşılaştırır, tabloyu yazdırır ve regresyonları döndürür
+
+    Bu çalıştırmanın kapsamındaki (istenen arka uç ve boyut) bir taban durumu ölçülmemişse
+    (ör. PostgreSQL'e bağlanılamadı) `current` değeri None olan bir hata olarak döner.
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+    meta = results.get("meta", {})
+    backends = set(meta.get("backends", [])) | set(meta.get("skipped_backends", {}))
+    sizes = set(meta.get("sizes", []))
+    print(f"{'durum':<70} {'taban ms':>10} {'şimdi ms':>10} {'oran':>6}")
+    for key, result in results["results"].items():
+        base = base_results.get(key)
+        current = result["median"]
+        if base is None:
+            print(f"🆕 {key:<68} {'-':>10} {current * 1000:>10.1f}")
+            continue
+        ratio = current / max(base["median"], 1e-9)
+        regressed = ratio > 1 + tolerance and current - base["median"] > min_seconds
+        mark = "❌" if regressed else ("🚀" if ratio < 1 - tolerance else "✅")
+        print(f"{mark} {key:<68} {base['median'] * 1000:>10.1f} {current * 1000:>10.1f} {ratio:>6.2f}")
+        if regressed:
+            regressions.append({"case": key, "baseline": base["median"], "current": current, "ratio": round(ratio, 2)})
+    for key, base in base_results.items():
+        if key in results["results"]:
+            continue
+        backend, size = key.split("/", 2)[:2]
+        if backend in backends and size in sizes:
+            print(f"❌ {key:<68} {base['median'] * 1000:>10.1f} {'ölçülmedi':>10}")
+            regressions.append({"case": key, "baseline": base["median"], "current": None, "ratio": None})
+        else:
+            print(f"⏭️ {key:<68} {base['median'] * 1000:>10.1f} {'istenmedi':>10}")
+    return regressions
+
+def _suite_main(args) -> int:
+    report = run_suite(sizes=args.sizes.split(","), backends=args.backends.split(","), seed=args.seed, repeat=args.repeat)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    print(f"💾 Sonuçlar: {args.output}")
+    skipped = report["meta"]["skipped_backends"]
+    if args.save_baseline and skipped:
+        print(f"❌ Taban güncellenmedi: {', '.join(skipped)} atlandı (yalnızca diğerleri için --backends kullanın)")
+        return 1
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"📌 Taban güncellendi: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"❌ Taban dosyası yok ({args.baseline}); karşılaştırma yapılamadı, oluşturmak için --save-baseline kullanın")
+        return 1
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare_to_baseline(report, baseline, tolerance=args.tolerance)
+    if regressions:
+        print(f"\n❌❌❌ {len(regressions)} PERFORMANS REGRESYONU (tolerans %{args.tolerance * 100:.0f}):")
+        for regression in regressions:
+            if regression["current"] is None:
+                print(f"   ❌ {regression['case']}: {regression['baseline'] * 1000:.1f} ms -> ölçülmedi")
+                continue
+            print(f"   ❌ {regression['case']}: {regression['baseline'] * 1000:.1f} ms -> "
+                  f"{regression['current'] * 1000:.1f} ms ({regression['ratio']}x)")
+        for backend, reason in skipped.items():
+            print(f"   ⚠️ {backend} atlandı: {reason}")
+        return 1
+    print("✅ Regresyon yok")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Veri erişim katmanı performans ölçümleri")
+    commands = parser.add_subparsers(dest="command")
+    suite = commands.add_parser("suite", help="main.py ve DatabaseManager benchmark takımı (taban karşılaştırmalı)")
+    suite.add_argument("--sizes", default="small,medium", help="generate_dataset preset'leri (virgülle)")
+    suite.add_argument("--backends", default="sqlite,postgresql", help="sqlite, postgresql (virgülle)")
+    suite.add_argument("--seed", type=int, default=42)
+    suite.add_argument("--repeat", type=int, default=SUITE_REPEAT, help="Ölçüm tekrarı (ısınma hariç)")
+    suite.add_argument("--output", default="benchmark_results.json", help="Sonuç JSON dosyası")
+    suite.add_argument("--baseline", default="benchmark_baseline.json", help="Karşılaştırılacak taban JSON dosyası")
+    suite.add_argument("--save-baseline", action="store_true", help="Sonuçları yeni taban olarak kaydet")
+    suite.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="İzin verilen yavaşlama oranı")
+    args = parser.parse_args()
+    if args.command == "suite":
+        sys.exit(_suite_main(args))
+    print("🧪 Performans ölçümleri çalıştırılıyor...")
+    benchmark_result_formats()
+    benchmark_batched_writes()
@@ -0,0 +1,130 @@
+# Toplu Dışa Aktarma (Bulk Export)
+# Sorgu sonuçlarını CSV veya NDJSON olarak (isteğe bağlı gzip ile) parça parça üretir;
+# satırlar sunucu taraflı imleçten geldiği için bellek kullanımı dışa aktarma boyutundan bağımsızdır
+import csv
+import io
+import json
+import os
+import sys
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, Sequence, Tuple
+
+# Bir parçada (chunk) kodlanan satır sayısı; sunucu taraflı imlecin okuma boyutu da budur
+DEFAULT_EXPORT_BATCH = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+GZIP_LEVEL = 6
+
+EXPORT_FORMATS = ("csv", "ndjson")
+_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+class ExportFormatError(Exception):
+    """Desteklenmeyen dışa aktarma biçimi"""
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"JSON'a çevrilemeyen değer: {type(value).__name__}")
+
+def _batches(rows: Iterable[Sequence[Any]], size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def csv_chunks(columns: Sequence[str], rows: Iterable[Sequence[Any]], batch_size: int = DEFAULT_EXPORT_BATCH) -> Iterator[bytes]:
+    """Başlık satırı ve ardından her `batch_size` satır için bir CSV parçası üretir"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    for batch in _batches(rows, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+def ndjson_chunks(columns: Sequence[str], rows: Iterable[Sequence[Any]], batch_size: int = DEFAULT_EXPORT_BATCH) -> Iterator[bytes]:
+    """Her satırı bir JSON nesnesi olarak yazar; her `batch_size` satır bir parçadır"""
+    encoder = json.JSONEncoder(ensure_ascii=False, default=_json_default)
+    for batch in _batches(rows, batch_size):
+        yield "".join(encoder.encode(dict(zip(columns, row))) + "\n" for row in batch).encode()
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """Parçaları akış halinde gzip ile sıkıştırır (tüm çıktıyı bellekte toplamadan)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip başlığı ve sağlama
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_chunks(
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    file_format: str = "csv",
+    compress: bool = False,
+    batch_size: int = DEFAULT_EXPORT_BATCH,
+) -> Iterator[bytes]:
+    """Biçime göre kodlanmış (ve istenirse sıkıştırılmış) bayt parçaları"""
+    if file_format not in EXPORT_FORMATS:
+        raise ExportFormatError(f"Desteklenmeyen biçim: {file_format} ({', '.join(EXPORT_FORMATS)})")
+    encode = csv_chunks if file_format == "csv" else ndjson_chunks
+    chunks = encode(columns, rows, batch_size)
+    return gzip_chunks(chunks) if compress else chunks
+
+def response_headers(name: str, file_format: str, compress: bool = False) -> Tuple[str, Dict[str, str]]:
+    """(media type, başlıklar): tarayıcı dosyayı indirsin diye Content-Disposition eklenir"""
+    if file_format not in EXPORT_FORMATS:
+        raise ExportFormatError(f"Desteklenmeyen biçim: {file_format} ({', '.join(EXPORT_FORMATS)})")
+    filename = f"{name}.{file_format}"
+    media_type = _MEDIA_TYPES[file_format]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return media_type, {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+# Test fonksiyonu
+def test_export(rows: int = 200000) -> bool:
+    """Biçimlerin geri okunabilirliğini ve üretilirken belleğin sabit kaldığını kontrol eder"""
+    import gzip
+    import time
+    import tracemalloc
+
+    columns = ("id", "title", "loan_date", "returned")
+    source = lambda count: ((i, f'Kitap "{i}", cilt {i % 3}', date(2024, 1, 1 + i % 28), i % 2 == 0) for i in range(count))
+
+    csv_text = b"".join(export_chunks(columns, source(1000), "csv")).decode()
+    parsed = list(csv.reader(io.StringIO(csv_text)))
+    csv_ok = parsed[0] == list(columns) and len(parsed) == 1001 and parsed[5][1] == 'Kitap "4", cilt 1'
+
+    ndjson_text = gzip.decompress(b"".join(export_chunks(columns, source(1000), "ndjson", compress=True))).decode()
+    records = [json.loads(line) for line in ndjson_text.splitlines()]
+    ndjson_ok = len(records) == 1000 and records[3] == {"id": 3, "title": 'Kitap "3", cilt 0', "loan_date": "2024-01-04", "returned": False}
+    print(f"{'✅' if csv_ok else '❌'} CSV geri okundu, {'✅' if ndjson_ok else '❌'} gzip NDJSON geri okundu")
+
+    def peak_for(count: int) -> Tuple[int, float]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in export_chunks(columns, source(count), "csv", compress=True))
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak, elapsed
+
+    small_peak, _ = peak_for(rows // 10)
+    large_peak, elapsed = peak_for(rows)
+    constant = large_peak < small_peak * 2
+    print(f"{'✅' if constant else '❌'} Tepe bellek {rows // 10} satırda {small_peak / 1e6:.1f} MB, "
+          f"{rows} satırda {large_peak / 1e6:.1f} MB ({elapsed:.2f} sn)")
+    return csv_ok and ndjson_ok and constant
+
+if __name__ == "__main__":
+    print("🧪 Toplu dışa aktarma test ediliyor...")
+    sys.exit(0 if test_export() else 1)
@@ -29,3 +29,14 @@ def get_database_url() -> str:
 def get_connection_params() -> dict:
     """PostgreSQL bağlantı parametrelerini döndürür"""
     return DB_CONFIG.copy()
+
+# Bağlantı havuzu ayarları
+def get_pool_params() -> dict:
+    """Bağlantı havuzu parametrelerini çevre değişkenlerinden döndürür"""
+    return {
+        'pool_min': int(os.getenv('DB_POOL_MIN', '1')),
+        'pool_max': int(os.getenv('DB_POOL_MAX', '10')),
+        'pool_max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    }
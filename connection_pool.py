@@ -0,0 +1,345 @@
+# Veritabanı Bağlantı Havuzu
+# PostgreSQL ve SQLite bağlantılarını yeniden kullanarak her sorguda yeni
+# bağlantı (TCP + kimlik doğrulama) açma maliyetini ortadan kaldırır
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+class PoolTimeout(Exception):
+    """Havuz dolu ve süre içinde boş bağlantı bulunamadı"""
+
+class PoolClosed(Exception):
+    """Kapatılmış havuzdan bağlantı istendi"""
+
+def default_ping(connection) -> None:
+    """Bağlantının hâlâ kullanılabilir olduğunu doğrular (hata fırlatırsa bağlantı atılır)"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    finally:
+        cursor.close()
+    connection.rollback()
+
+def default_reset(connection) -> None:
+    """İade edilen bağlantıda yarım kalan transaction'ı geri alır"""
+    connection.rollback()
+
+class PooledConnection:
+    """Havuzdan alınan bağlantı için vekil nesne
+
+    Gerçek bağlantının tüm özelliklerine erişim sağlar; tek fark `close()` çağrısının
+    bağlantıyı kapatmak yerine havuza iade etmesidir. Böylece mevcut
+    `with closing(get_connection()) as connection:` kalıbı değişmeden çalışır.
+    """
+
+    __slots__ = ("_pool", "_connection", "_created_at")
+
+    def __init__(self, pool: "ConnectionPool", connection: Any, created_at: float):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_connection", connection)
+        object.__setattr__(self, "_created_at", created_at)
+
+    @property
+    def raw(self) -> Any:
+        """Alttaki gerçek DB-API bağlantısı"""
+        if self._connection is None:
+            raise PoolClosed("Bağlantı havuza iade edilmiş")
+        return self._connection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.raw, name, value)
+
+    def __enter__(self):
+        self.raw.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.raw.__exit__(exc_type, exc, tb)
+
+    def close(self) -> None:
+        """Bağlantıyı havuza iade eder"""
+        connection = self._connection
+        if connection is None:
+            return
+        object.__setattr__(self, "_connection", None)
+        self._pool._release(connection, self._created_at)
+
+    def invalidate(self) -> None:
+        """Bağlantıyı havuza iade etmeden kapatır (ör. bozulduğu biliniyorsa)"""
+        connection = self._connection
+        if connection is None:
+            return
+        object.__setattr__(self, "_connection", None)
+        self._pool._discard(connection)
+
+class ConnectionPool:
+    """Thread-safe, boyutu sınırlı bağlantı havuzu
+
+    - `min_size` bağlantı ilk checkout'ta hazırlanır (oluşturmak veritabanına bağlanmaz),
+      en fazla `max_size` bağlantı açılır
+    - Havuzdan alırken (checkout) bağlantı `pre_ping` ile sağlık kontrolünden geçer
+    - `max_lifetime` saniyeden eski bağlantılar kapatılıp yenilenir
+    - Havuz dolduğunda bekleyen istekler ve bekleme süreleri metrik olarak tutulur
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_lifetime: float = 1800.0,
+        timeout: float = 30.0,
+        pre_ping: bool = True,
+        ping: Callable[[Any], None] = default_ping,
+        reset: Callable[[Any], None] = default_reset,
+        name: str = "pool",
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Geçersiz havuz boyutu: min={min_size}, max={max_size}")
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self._connect = connect
+        self._ping = ping
+        self._reset = reset
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._warmed = min_size == 0
+        self._warm_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._metrics: Dict[str, float] = {
+            "checkouts": 0,
+            "created": 0,
+            "waits": 0,  # Havuz dolu olduğu için beklemek zorunda kalan checkout sayısı
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "ping_failures": 0,
+            "expired": 0,
+            "discarded": 0,
+            "peak_in_use": 0,
+        }
+
+
+    def _warm_up(self) -> None:
+        """İlk checkout'ta havuzu `min_size` bağlantıya tamamlar; bağlanamazsa sonraki checkout yeniden dener"""
+        with self._warm_lock:
+            if self._warmed:
+                return
+            while True:
+                with self._condition:
+                    if self._closed or self._size >= self.min_size:
+                        break
+                    self._size += 1  # Yer ayır, bağlantıyı kilit dışında aç
+                try:
+                    connection = self._create()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                with self._condition:
+                    self._idle.append((connection, time.monotonic()))
+                    self._condition.notify()
+            self._warmed = True
+
+    def _create(self) -> Any:
+        connection = self._connect()
+        with self._condition:
+            self._metrics["created"] += 1
+        return connection
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.max_lifetime > 0 and time.monotonic() - created_at > self.max_lifetime
+
+    def connection(self) -> PooledConnection:
+        """Havuzdan bir bağlantı alır; iş bitince `close()` ile iade edilmelidir"""
+        if not self._warmed:
+            self._warm_up()
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        entry: Optional[Tuple[Any, float]] = None
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolClosed(f"'{self.name}' havuzu kapatılmış")
+                if self._idle:
+                    entry = self._idle.pop()  # LIFO: sıcak bağlantıyı tercih et
+                    break
+                if self._size < self.max_size:
+                    self._size += 1  # Yer ayır, bağlantıyı kilit dışında aç
+                    break
+                if not waited:
+                    waited = True
+                    self._metrics["waits"] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._metrics["timeouts"] += 1
+                    self._record_wait(time.monotonic() - start)
+                    raise PoolTimeout(f"'{self.name}' havuzu dolu ({self.max_size} bağlantı), {self.timeout} sn beklendi")
+                self._condition.wait(remaining)
+            self._in_use += 1
+            self._metrics["checkouts"] += 1
+            self._metrics["peak_in_use"] = max(self._metrics["peak_in_use"], self._in_use)
+            if waited:
+                self._record_wait(time.monotonic() - start)
+
+        try:
+            if entry is not None:
+                connection, created_at = entry
+                if self._is_expired(created_at):
+                    self._count("expired")
+                    self._close_quietly(connection)
+                    entry = None
+                elif self.pre_ping:
+                    try:
+                        self._ping(connection)
+                    except Exception:
+                        self._count("ping_failures")
+                        self._close_quietly(connection)
+                        entry = None
+            if entry is None:
+                connection, created_at = self._create(), time.monotonic()
+        except Exception:
+            # Yeni bağlantı açılamadı: ayrılan yeri geri ver
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        return PooledConnection(self, connection, created_at)
+
+    def _count(self, metric: str) -> None:
+        with self._condition:
+            self._metrics[metric] += 1
+
+    def _record_wait(self, wait_time: float) -> None:
+        # Çağıran kilidi tutuyor olmalı
+        self._metrics["wait_time_total"] += wait_time
+        self._metrics["wait_time_max"] = max(self._metrics["wait_time_max"], wait_time)
+
+    def _release(self, connection: Any, created_at: float) -> None:
+        try:
+            self._reset(connection)
+        except Exception:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._in_use -= 1
+            if self._closed or self._is_expired(created_at):
+                self._size -= 1
+                self._metrics["discarded" if self._closed else "expired"] += 1
+                self._condition.notify()
+                close = True
+            else:
+                self._idle.append((connection, created_at))
+                self._condition.notify()
+                close = False
+        if close:
+            self._close_quietly(connection)
+
+    def _discard(self, connection: Any) -> None:
+        with self._condition:
+            self._in_use -= 1
+            self._size -= 1
+            self._metrics["discarded"] += 1
+            self._condition.notify()
+        self._close_quietly(connection)
+
+    @staticmethod
+    def _close_quietly(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Havuz durumu ve tükenme (exhaustion) metrikleri"""
+        with self._condition:
+            return {
+                "name": self.name,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                **self._metrics,
+            }
+
+    def close(self) -> None:
+        """Boştaki tüm bağlantıları kapatır; kullanımdakiler iade edilince kapanır"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+# Test fonksiyonu
+def test_pool() -> bool:
+    """SQLite üzerinde yeniden kullanım, tükenme ve ömür kontrolü"""
+    import sqlite3
+    import tempfile
+    import os
+
+    path = os.path.join(tempfile.mkdtemp(), "pool_test.db")
+    pool = ConnectionPool(lambda: sqlite3.connect(path, check_same_thread=False), min_size=1, max_size=2, timeout=0.2, name="test")
+    lazy = pool.stats()["created"] == 0
+    print(f"{'✅' if lazy else '❌'} Havuz oluşturulurken bağlantı açılmadı")
+
+    def unreachable():
+        raise sqlite3.OperationalError("veritabanına ulaşılamıyor")
+
+    offline = ConnectionPool(unreachable, min_size=2, max_size=2, name="offline")
+    try:
+        offline.connection()
+        offline_ok = False
+    except sqlite3.OperationalError:
+        offline_ok = offline.stats()["size"] == 0
+    print(f"{'✅' if offline_ok else '❌'} Ulaşılamayan veritabanı yalnızca checkout'ta hata verdi")
+
+    first = pool.connection()
+    raw = first.raw
+    first.close()
+    second = pool.connection()
+    reused = second.raw is raw
+    print(f"{'✅' if reused else '❌'} Bağlantı yeniden kullanıldı")
+
+    third = pool.connection()
+    try:
+        pool.connection()
+        exhausted = False
+    except PoolTimeout:
+        exhausted = True
+    print(f"{'✅' if exhausted else '❌'} Havuz dolunca PoolTimeout: {pool.stats()['timeouts']} zaman aşımı")
+    second.close()
+    third.close()
+
+    pool.max_lifetime = 0.01
+    time.sleep(0.02)
+    renewed = pool.connection()
+    expired_ok = pool.stats()["expired"] >= 1
+    renewed.close()
+    print(f"{'✅' if expired_ok else '❌'} Süresi dolan bağlantı yenilendi")
+    print(f"📊 {pool.stats()}")
+    pool.close()
+    return lazy and offline_ok and reused and exhausted and expired_ok
+
+if __name__ == "__main__":
+    import sys
+    print("🧪 Bağlantı havuzu test ediliyor...")
+    sys.exit(0 if test_pool() else 1)
@@ -3,14 +3,46 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import closing
 from typing import List, Dict, Any, Optional
-from config import get_connection_params
+import threading
+from config import get_connection_params, get_pool_params
+from connection_pool import ConnectionPool
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def _connect():
+    """Yeni bir PostgreSQL bağlantısı açar"""
+    connection = psycopg2.connect(**get_connection_params())
+    connection.autocommit = False
+    return connection
+
+def get_pool() -> Optional[ConnectionPool]:
+    """Modül genelindeki bağlantı havuzunu ilk kullanımda oluşturur (DB_POOL_MAX=0 ise None)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                params = get_pool_params()
+                if not params['pool_max']:
+                    return None
+                _pool = ConnectionPool(
+                    _connect,
+                    min_size=min(params['pool_min'], params['pool_max']),
+                    max_size=params['pool_max'],
+                    max_lifetime=params['pool_max_lifetime'],
+                    timeout=params['pool_timeout'],
+                    pre_ping=params['pool_pre_ping'],
+                    name="database",
+                )
+    return _pool
 
 def get_connection():
-    """PostgreSQL veritabanı bağlantısı oluşturur"""
+    """PostgreSQL veritabanı bağlantısı döndürür
+    Bağlantı havuzdan alınır; close() çağrısı bağlantıyı kapatmak yerine havuza iade eder.
+    """
     try:
-        connection = psycopg2.connect(**get_connection_params())
-        connection.autocommit = False
-        return connection
+        pool = get_pool()
+        return pool.connection() if pool is not None else _connect()
     except psycopg2.Error as e:
         print(f"Veritabanı bağlantı hatası: {e}")
         raise
@@ -1,78 +1,372 @@
 # Veritabanı Yönetici Sınıfı
 # PostgreSQL ve SQLite desteği
+import datetime
+import functools
+import itertools
+import keyword
 import os
+import re
 import sqlite3
-from contextlib import closing
-from typing import Any, Dict, List, Optional, Union
+import sys
+import time
+import uuid
+from contextlib import closing, contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from abc import ABC, abstractmethod
+from connection_pool import ConnectionPool
+from config import get_pool_params
+from slow_query_log import is_slow, log_slow_query
 
 try:
     import psycopg2
-    from psycopg2.extras import RealDictCursor
+    from psycopg2.extras import RealDictCursor, execute_batch, execute_values
     POSTGRES_AVAILABLE = True
 except ImportError:
     POSTGRES_AVAILABLE = False
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# iter_query() ve execute_many() için varsayılan parti (batch) boyutu
+DEFAULT_BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', '2000'))
+# execute_batch() ile tek gidiş-dönüşte gönderilen en fazla sorgu sayısı
+EXECUTE_BATCH_PAGE_SIZE = 200
+
+# Sonuç biçimleri:
+#   "dict"    -> [{"id": 1, ...}]           (varsayılan, geriye dönük uyumlu)
+#   "tuple"   -> [(1, ...)]                 (en az bellek)
+#   "row"     -> [Row(id=1, ...)]           (__slots__ sınıfı, alan adıyla erişim)
+#   "columns" -> {"id": array([1, ...])}    (sütun bazlı; NumPy varsa sayısal sütunlar dizi olur)
+RESULT_FORMATS = ("dict", "tuple", "row", "columns")
+
+_IDENTIFIER_RE = re.compile(r"\W|^(?=\d)")
+# execute_values() ile çalıştırılabilecek sorgular: "INSERT INTO t (a, b) VALUES %s"
+_VALUES_PLACEHOLDER_RE = re.compile(r"\bVALUES\s+%s(?!\w)", re.IGNORECASE)
+
+def _attribute_name(column: str, index: int, used: set) -> str:
+    """Sütun adını geçerli bir Python özellik adına çevirir (ör. "COUNT(1)" -> "COUNT_1_")"""
+    name = _IDENTIFIER_RE.sub("_", column) or f"_{index}"
+    if keyword.iskeyword(name) or name.startswith("__") or name in used:
+        # Yedek ad da başka bir sütunun adı olabilir (ör. "_1" ve "1"); boş bir ad bulunana kadar uzatılır
+        name = f"_{index}"
+        while name in used:
+            name += "_"
+    used.add(name)
+    return name
+
+@functools.lru_cache(maxsize=256)
+def row_class(columns: Tuple[str, ...]) -> type:
+    """Sütun listesi için satır başına sözlük taşımayan __slots__ sınıfı üretir"""
+    used: set = set()
+    names = tuple(_attribute_name(column, i, used) for i, column in enumerate(columns))
+    arguments = ", ".join(names)
+    body = "".join(f"\n    self.{name} = {name}" for name in names) or "\n    pass"
+    namespace: Dict[str, Any] = {}
+    exec(f"def __init__(self, {arguments}):{body}", {}, namespace)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in names)
+
+    def __repr__(self):
+        return "Row(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in names) + ")"
+
+    def __eq__(self, other):
+        return isinstance(other, type(self)) and tuple(self) == tuple(other)
+
+    def _asdict(self) -> Dict[str, Any]:
+        return {column: getattr(self, name) for column, name in zip(columns, names)}
+
+    return type("Row", (), {
+        "__slots__": names,
+        "__init__": namespace["__init__"],
+        "__iter__": __iter__,
+        "__repr__": __repr__,
+        "__eq__": __eq__,
+        "__hash__": None,
+        "_asdict": _asdict,
+        "_fields": names,
+    })
+
+def _to_array(values: List[Any]):
+    """Tek tipli sayısal/tarih sütunlarını NumPy dizisine çevirir, diğerlerini liste bırakır"""
+    if not NUMPY_AVAILABLE or not values:
+        return values
+    kinds = {type(value) for value in values}
+    if kinds == {bool}:
+        return np.array(values, dtype=bool)
+    if kinds == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            return values
+    if kinds <= {int, float}:
+        return np.array(values, dtype=np.float64)
+    if kinds == {datetime.date}:
+        return np.array(values, dtype="datetime64[D]")
+    return values
+
+def _column_names(cursor) -> Tuple[str, ...]:
+    return tuple(description[0] for description in cursor.description or ())
+
+def shape_rows(cursor, result_format: str = "dict", batch_size: int = DEFAULT_BATCH_SIZE):
+    """Çalıştırılmış cursor'un sonucunu istenen biçimde toplar
+    "dict" dışındaki biçimler için cursor ham tuple döndürmelidir.
+    """
+    if result_format == "dict":
+        return [dict(row) for row in cursor.fetchall()]
+    if result_format == "tuple":
+        return cursor.fetchall()
+    columns = _column_names(cursor)
+    if result_format == "row":
+        row_type = row_class(columns)
+        return [row_type(*row) for row in cursor.fetchall()]
+    if result_format == "columns":
+        # Sütunlar parti parti doldurulur: tepe bellek = sütunlar + tek parti
+        values: List[List[Any]] = [[] for _ in columns]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for target, column in zip(values, zip(*rows)):
+                target.extend(column)
+        return {column: _to_array(column_values) for column, column_values in zip(columns, values)}
+    raise ValueError(f"Geçersiz sonuç biçimi: {result_format} (seçenekler: {', '.join(RESULT_FORMATS)})")
+
+def _check_format(result_format: str, allowed: Sequence[str] = RESULT_FORMATS) -> None:
+    if result_format not in allowed:
+        raise ValueError(f"Geçersiz sonuç biçimi: {result_format} (seçenekler: {', '.join(allowed)})")
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yinelenebilir nesneyi en fazla `size` elemanlı listelere böler"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class Transaction:
+    """Tek bağlantı ve tek transaction üzerinde çalışan toplu işlem nesnesi
+    `DatabaseManager.transaction()` tarafından üretilir; blok hatasız biterse commit,
+    hata olursa rollback yapılır.
+    """
+    
+    def __init__(self, manager: "DatabaseManager", connection):
+        self.manager = manager
+        self.connection = connection
+        self.rowcount = 0  # Transaction boyunca etkilenen toplam satır
+    
+    def execute(self, query: str, params: tuple = None) -> int:
+        """Tek bir UPDATE/INSERT/DELETE sorgusu çalıştırır (commit etmez)"""
+        with closing(self.manager._cursor(self.connection)) as cursor:
+            self.manager._execute(cursor, query, params)
+            rowcount = max(cursor.rowcount, 0)
+        self.rowcount += rowcount
+        return rowcount
+    
+    def execute_many(self, query: str, params_seq: Iterable[Sequence[Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Aynı sorguyu parametre dizisindeki her kayıt için toplu çalıştırır (commit etmez)"""
+        with closing(self.manager._cursor(self.connection)) as cursor:
+            rowcount = self.manager._execute_many(cursor, query, params_seq, batch_size)
+        self.rowcount += rowcount
+        return rowcount
+    
+    def query(self, query: str, params: tuple = None, result_format: str = "dict") -> Any:
+        """Transaction içinde SELECT çalıştırır (henüz commit edilmemiş değişiklikleri görür)"""
+        _check_format(result_format)
+        with closing(self.manager._cursor(self.connection, result_format)) as cursor:
+            self.manager._execute(cursor, query, params)
+            return shape_rows(cursor, result_format)
+
 class DatabaseManager(ABC):
     """Soyut veritabanı yönetici sınıfı"""
     
+    pool: Optional[ConnectionPool] = None
+    dialect: str = ""
+    
     @abstractmethod
-    def get_connection(self):
-        """Veritabanı bağlantısı döndürür"""
+    def connect(self):
+        """Havuzdan bağımsız yeni bir veritabanı bağlantısı açar"""
         pass
     
+    def get_connection(self):
+        """Veritabanı bağlantısı döndürür
+        Havuz etkinse bağlantı havuzdan alınır ve close() çağrısı onu havuza iade eder.
+        """
+        if self.pool is not None:
+            return self.pool.connection()
+        return self.connect()
+    
+    def _init_pool(self, pool_min: int = 1, pool_max: int = 10, pool_max_lifetime: float = 1800.0,
+                   pool_timeout: float = 30.0, pool_pre_ping: bool = True) -> None:
+        """Bağlantı havuzunu oluşturur (pool_max=0 havuzu kapatır)"""
+        if not pool_max:
+            self.pool = None
+            return
+        self.pool = ConnectionPool(
+            self.connect,
+            min_size=min(pool_min, pool_max),
+            max_size=pool_max,
+            max_lifetime=pool_max_lifetime,
+            timeout=pool_timeout,
+            pre_ping=pool_pre_ping,
+            name=type(self).__name__,
+        )
+    
+    def _execute(self, cursor, query: str, params: tuple = None) -> None:
+        """Sorguyu çalıştırır; eşiği aşarsa planıyla yavaş sorgu günlüğüne yazar"""
+        start = time.perf_counter()
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        elapsed = time.perf_counter() - start
+        if is_slow(elapsed):
+            log_slow_query(self.dialect, cursor.connection, query, params, elapsed, source="database_manager")
+    
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Havuz metriklerini döndürür (havuz yoksa None)"""
+        return self.pool.stats() if self.pool is not None else None
+    
+    def close(self) -> None:
+        """Havuzdaki bağlantıları kapatır"""
+        if self.pool is not None:
+            self.pool.close()
+    
     @abstractmethod
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        """SQL sorgusu çalıştırır"""
+    def execute_query(self, query: str, params: tuple = None, result_format: str = "dict") -> Any:
+        """SQL sorgusu çalıştırır
+        `result_format`: "dict" (varsayılan), "tuple", "row" ya da "columns" (bkz. RESULT_FORMATS)
+        """
         pass
     
     @abstractmethod
     def execute_update(self, query: str, params: tuple = None) -> int:
         """UPDATE/INSERT/DELETE sorgusu çalıştırır"""
         pass
+    
+    @abstractmethod
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                   result_format: str = "dict") -> Iterator[Any]:
+        """SQL sorgusunun satırlarını partiler halinde akıtır (bellekte en fazla bir parti tutulur)
+        Bağlantı, üreteç tükenince ya da close() çağrılınca serbest bırakılır.
+        `result_format`: "dict", "tuple" ya da "row"
+        """
+        pass
+    
+    @abstractmethod
+    def _cursor(self, connection, result_format: str = "tuple"):
+        """Sonuç biçimine uygun cursor açar ("dict" dışında ham tuple döndürür)"""
+        pass
+    
+    @abstractmethod
+    def _execute_many(self, cursor, query: str, params_seq: Iterable[Sequence[Any]], batch_size: int) -> int:
+        """Sürücüye özgü toplu çalıştırma; etkilenen satır sayısını döndürür"""
+        pass
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """Tek bağlantıda birden çok yazma işlemini tek commit ile çalıştırır
+        
+            with db.transaction() as tx:
+                tx.execute_many("INSERT INTO books (title, author) VALUES (?, ?)", rows)
+                tx.execute("UPDATE books SET year = ? WHERE id = ?", (2024, 1))
+        """
+        with closing(self.get_connection()) as connection:
+            try:
+                yield Transaction(self, connection)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+    
+    def execute_many(self, query: str, params_seq: Iterable[Sequence[Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Aynı sorguyu tüm parametre kayıtları için tek transaction'da çalıştırır
+        Parametreler `batch_size`'lık partiler halinde gönderilir; etkilenen toplam satır döner.
+        """
+        with self.transaction() as tx:
+            return tx.execute_many(query, params_seq, batch_size)
+    
+    @staticmethod
+    def _stream(cursor, batch_size: int, result_format: str) -> Iterator[Any]:
+        """Çalıştırılmış cursor'dan satırları partiler halinde istenen biçimde üretir"""
+        row_type = None
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if result_format == "row" and row_type is None:
+                # Named cursor'da description ilk fetch'ten sonra dolar
+                row_type = row_class(_column_names(cursor))
+            if result_format == "dict":
+                for row in rows:
+                    yield dict(row)
+            elif row_type is not None:
+                for row in rows:
+                    yield row_type(*row)
+            else:
+                yield from rows
 
 class SQLiteManager(DatabaseManager):
     """SQLite veritabanı yöneticisi"""
     
-    def __init__(self, db_path: str = None):
+    dialect = "sqlite"
+    
+    def __init__(self, db_path: str = None, **pool_options):
         if db_path is None:
             from config import get_db_path
             self.db_path = get_db_path()
         else:
             self.db_path = db_path
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._init_pool(**pool_options)
         self.init_database()
     
-    def get_connection(self):
+    def connect(self):
         """SQLite bağlantısı oluşturur"""
         connection = sqlite3.connect(self.db_path, check_same_thread=False)
         connection.row_factory = sqlite3.Row
         connection.execute("PRAGMA foreign_keys = ON;")
         return connection
     
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    def execute_query(self, query: str, params: tuple = None, result_format: str = "dict") -> Any:
         """SQL sorgusu çalıştırır"""
-        with closing(self.get_connection()) as connection, closing(connection.cursor()) as cursor:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+        _check_format(result_format)
+        with closing(self.get_connection()) as connection, closing(self._cursor(connection, result_format)) as cursor:
+            self._execute(cursor, query, params)
+            return shape_rows(cursor, result_format)
     
     def execute_update(self, query: str, params: tuple = None) -> int:
         """UPDATE/INSERT/DELETE sorgusu çalıştırır"""
         with closing(self.get_connection()) as connection, closing(connection.cursor()) as cursor:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            self._execute(cursor, query, params)
             connection.commit()
             return cursor.rowcount
     
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                   result_format: str = "dict") -> Iterator[Any]:
+        """SQL sorgusunun satırlarını fetchmany partileriyle akıtır"""
+        _check_format(result_format, ("dict", "tuple", "row"))
+        with closing(self.get_connection()) as connection, closing(self._cursor(connection, result_format)) as cursor:
+            self._execute(cursor, query, params)
+            yield from self._stream(cursor, batch_size, result_format)
+    
+    def _cursor(self, connection, result_format: str = "tuple"):
+        cursor = connection.cursor()
+        if result_format != "dict":
+            cursor.row_factory = None  # sqlite3.Row yerine ham tuple
+        return cursor
+    
+    def _execute_many(self, cursor, query: str, params_seq: Iterable[Sequence[Any]], batch_size: int) -> int:
+        """sqlite3 executemany parametreleri zaten akış halinde okur; tümü tek transaction'dadır"""
+        cursor.executemany(query, params_seq)
+        return max(cursor.rowcount, 0)
+    
     def init_database(self):
         """Veritabanını başlatır"""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
         # Tabloları oluştur
         create_tables_sql = [
             """
@@ -148,60 +442,101 @@ class SQLiteManager(DatabaseManager):
 class PostgreSQLManager(DatabaseManager):
     """PostgreSQL veritabanı yöneticisi"""
     
-    def __init__(self, config: Dict[str, Any]):
+    dialect = "postgresql"
+    
+    def __init__(self, config: Dict[str, Any], **pool_options):
         self.config = config
         if not POSTGRES_AVAILABLE:
             raise ImportError("psycopg2 paketi kurulu değil!")
+        self._init_pool(**pool_options)
     
-    def get_connection(self):
+    def connect(self):
         """PostgreSQL bağlantısı oluşturur"""
         connection = psycopg2.connect(**self.config)
         connection.autocommit = False
         return connection
     
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    def execute_query(self, query: str, params: tuple = None, result_format: str = "dict") -> Any:
         """SQL sorgusu çalıştırır"""
-        with closing(self.get_connection()) as connection, closing(connection.cursor(cursor_factory=RealDictCursor)) as cursor:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+        _check_format(result_format)
+        with closing(self.get_connection()) as connection, closing(self._cursor(connection, result_format)) as cursor:
+            self._execute(cursor, query, params)
+            return shape_rows(cursor, result_format)
     
     def execute_update(self, query: str, params: tuple = None) -> int:
         """UPDATE/INSERT/DELETE sorgusu çalıştırır"""
         with closing(self.get_connection()) as connection, closing(connection.cursor()) as cursor:
             try:
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
+                self._execute(cursor, query, params)
                 connection.commit()
                 return cursor.rowcount
             except Exception:
                 connection.rollback()
                 raise
+    
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                   result_format: str = "dict") -> Iterator[Any]:
+        """SQL sorgusunun satırlarını sunucu tarafı (named) cursor ile akıtır
+        Sonuç kümesi sunucuda kalır; istemciye her seferinde `batch_size` satır gelir.
+        """
+        _check_format(result_format, ("dict", "tuple", "row"))
+        with closing(self.get_connection()) as connection:
+            cursor_factory = RealDictCursor if result_format == "dict" else None
+            cursor = connection.cursor(name=f"iter_{uuid.uuid4().hex}", cursor_factory=cursor_factory)
+            cursor.itersize = batch_size
+            try:
+                self._execute(cursor, query, params)
+                yield from self._stream(cursor, batch_size, result_format)
+            finally:
+                cursor.close()
+                # Salt okunur transaction'ı kapat (named cursor bir transaction içinde yaşar)
+                connection.rollback()
+    
+    def _cursor(self, connection, result_format: str = "tuple"):
+        return connection.cursor(cursor_factory=RealDictCursor if result_format == "dict" else None)
+    
+    def _execute_many(self, cursor, query: str, params_seq: Iterable[Sequence[Any]], batch_size: int) -> int:
+        """`INSERT ... VALUES %s` biçimindeki sorgular execute_values ile çok satırlı tek
+        INSERT'e, diğerleri execute_batch ile parti başına tek gidiş-dönüşe dönüştürülür.
+        execute_batch sorguları ";" ile birleştirdiği için rowcount yalnızca son sorguyu
+        gösterir; bu yolda işlenen parametre kaydı sayısı döndürülür.
+        """
+        multi_row = _VALUES_PLACEHOLDER_RE.search(query) is not None
+        rowcount = 0
+        for chunk in _chunks(params_seq, batch_size):
+            if multi_row:
+                # Parti tek sayfa olduğundan rowcount partinin tamamını kapsar
+                execute_values(cursor, query, chunk, page_size=len(chunk))
+                rowcount += max(cursor.rowcount, 0)
+            else:
+                execute_batch(cursor, query, chunk, page_size=min(len(chunk), EXECUTE_BATCH_PAGE_SIZE))
+                rowcount += len(chunk)
+        return rowcount
 
 class DatabaseFactory:
     """Veritabanı yönetici fabrikası"""
     
     @staticmethod
     def create_manager(db_type: str = "postgresql", **kwargs) -> DatabaseManager:
-        """Veritabanı yöneticisi oluşturur"""
+        """Veritabanı yöneticisi oluşturur
+        `pool_` ile başlayan parametreler (pool_min, pool_max, pool_max_lifetime,
+        pool_timeout, pool_pre_ping) bağlantı havuzunu yapılandırır; pool_max=0 havuzu kapatır.
+        """
+        pool_options = {key: kwargs.pop(key) for key in list(kwargs) if key.startswith('pool_')}
         if db_type.lower() == "postgresql":
             if not POSTGRES_AVAILABLE:
                 print("⚠️ PostgreSQL paketi kurulu değil, SQLite kullanılıyor")
-                return SQLiteManager(kwargs.get('db_path', 'database.db'))
-            return PostgreSQLManager(kwargs)
+                return SQLiteManager(kwargs.get('db_path', 'database.db'), **pool_options)
+            return PostgreSQLManager(kwargs, **pool_options)
         else:
-            return SQLiteManager(kwargs.get('db_path', 'database.db'))
+            return SQLiteManager(kwargs.get('db_path', 'database.db'), **pool_options)
 
 # Varsayılan veritabanı yöneticisi
 def get_database_manager() -> DatabaseManager:
     """Varsayılan veritabanı yöneticisini döndürür"""
     # Çevre değişkenlerinden veritabanı tipini al
     db_type = os.getenv('DB_TYPE', 'postgresql')
+    pool_options = get_pool_params()
     
     if db_type.lower() == 'postgresql':
         config = {
@@ -211,9 +546,9 @@ def get_database_manager() -> DatabaseManager:
             'user': os.getenv('DB_USER', 'postgres'),
             'password': os.getenv('DB_PASSWORD', 'postgres'),
         }
-        return DatabaseFactory.create_manager('postgresql', **config)
+        return DatabaseFactory.create_manager('postgresql', **config, **pool_options)
     else:
-        return SQLiteManager('./database.db')
+        return SQLiteManager('./database.db', **pool_options)
 
 # Test fonksiyonu
 def test_database():
@@ -225,12 +560,68 @@ def test_database():
         # Test sorgusu
         result = db.execute_query("SELECT 1 as test")
         print(f"✅ Test sorgusu başarılı: {result}")
+        print(f"📊 Bağlantı havuzu: {db.pool_stats()}")
         
         return True
     except Exception as e:
         print(f"❌ Veritabanı test hatası: {e}")
         return False
 
+def test_result_formats() -> bool:
+    """Sonuç biçimlerinin aynı veriyi verdiğini ve çakışan sütun adlarından geçerli satır sınıfı üretildiğini doğrular"""
+    import tempfile
+    
+    db = SQLiteManager(os.path.join(tempfile.mkdtemp(), "format_test.db"), pool_max=1)
+    db.execute_many("INSERT INTO books (title, author, isbn, year) VALUES (?, ?, ?, ?)",
+                    [(f"Kitap {i}", "Yazar", None, 2000 + i) for i in range(3)])
+    query = "SELECT id, title, year FROM books ORDER BY id"
+    dicts = db.execute_query(query)
+    tuples = db.execute_query(query, result_format="tuple")
+    rows = db.execute_query(query, result_format="row")
+    columns = db.execute_query(query, result_format="columns")
+    consistent = (
+        [tuple(row.values()) for row in dicts] == [tuple(row) for row in tuples] == [tuple(row) for row in rows]
+        and [row._asdict() for row in rows] == dicts
+        and list(columns["year"]) == [row["year"] for row in dicts]
+    )
+    print(f"{'✅' if consistent else '❌'} dict/tuple/row/columns biçimleri aynı {len(dicts)} satırı verdi")
+    
+    # Geçersiz, anahtar kelime ve yedek adla çakışan sütun adları
+    odd = db.execute_query('SELECT 1 AS "_1", 2 AS "1", 3 AS "class", 4 AS "COUNT(1)", 5 AS "_2_"', result_format="row")[0]
+    names_ok = len(set(odd._fields)) == 5 and tuple(odd) == (1, 2, 3, 4, 5) and list(odd._asdict()) == ["_1", "1", "class", "COUNT(1)", "_2_"]
+    print(f"{'✅' if names_ok else '❌'} Çakışan sütun adları: {odd._fields}")
+    db.close()
+    return consistent and names_ok
+
+def test_iter_query(rows: int = 200000) -> bool:
+    """iter_query() ile tam tablo taramasında bellek kullanımının sabit kaldığını doğrular"""
+    import tempfile
+    import tracemalloc
+    
+    db = SQLiteManager(os.path.join(tempfile.mkdtemp(), "iter_test.db"), pool_max=2)
+    with closing(db.get_connection()) as connection:
+        connection.executemany(
+            "INSERT INTO books (title, author, isbn, year) VALUES (?, ?, ?, ?)",
+            ((f"Kitap {i}", f"Yazar {i % 500}", f"978-{i:09d}", 1900 + i % 120) for i in range(rows)),
+        )
+        connection.commit()
+    
+    def peak_of(scan) -> tuple:
+        tracemalloc.start()
+        count = scan()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return count, peak
+    
+    streamed, stream_peak = peak_of(lambda: sum(1 for _ in db.iter_query("SELECT * FROM books", batch_size=1000)))
+    fetched, fetch_peak = peak_of(lambda: len(db.execute_query("SELECT * FROM books")))
+    ok = streamed == fetched == rows and stream_peak * 10 < fetch_peak
+    print(f"{'✅' if ok else '❌'} {rows} satır: iter_query tepe bellek {stream_peak / 1e6:.1f} MB, "
+          f"execute_query {fetch_peak / 1e6:.1f} MB")
+    db.close()
+    return ok
+
 if __name__ == "__main__":
     print("🧪 Veritabanı test ediliyor...")
-    test_database()
+    results = [test_database(), test_result_formats(), test_iter_query()]
+    sys.exit(0 if all(results) else 1)
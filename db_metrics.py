@@ -0,0 +1,366 @@
+# Veritabanı Metrikleri
+# SQLAlchemy cursor olaylarından normalize edilmiş SQL parmak izine göre süre histogramları,
+# sürücünün bildirdiği satır sayıları, istek başına sorgu sayısı ve havuzdan bağlantı alma
+# bekleme süresi toplar; render_prometheus() hepsini Prometheus metin biçiminde döndürür
+import bisect
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# DB_METRICS=0 dinleyicileri hiç kaydetmez (ölçüm maliyeti sıfır)
+ENABLED = os.getenv("DB_METRICS", "1") != "0"
+# Etiket kardinalitesi sınırı: sonraki yeni parmak izleri "other" altında toplanır
+MAX_FINGERPRINTS = int(os.getenv("DB_METRICS_MAX_FINGERPRINTS", "500"))
+# Ham SQL -> parmak izi önbelleği (IN listelerinin farklı uzunlukları ayrı ham metin üretir)
+MAX_CACHED_STATEMENTS = 5000
+STATEMENT_LABEL_LENGTH = 200
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+QUERIES_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\?|(?<![:\w]):[A-Za-z_]\w*|\$\d+")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST_RE = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_SPACE_RE = re.compile(r"\s+")
+
+# İstek başına sorgu sayacı; run_db bağlamı kopyaladığı için thread havuzundaki sorgular da sayılır
+_request_counter: ContextVar[Optional[List[int]]] = ContextVar("db_metrics_request_counter", default=None)
+
+def normalize_sql(statement: str) -> str:
+    """Değişmezleri ve parametreleri `?` yapar, IN/VALUES listelerini tek elemana indirir"""
+    normalized = _STRING_RE.sub("?", statement)
+    normalized = _PARAM_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("(?)", normalized)
+    normalized = _VALUES_LIST_RE.sub("(?)", normalized)
+    return _SPACE_RE.sub(" ", normalized).strip()
+
+def fingerprint_sql(statement: str) -> Tuple[str, str]:
+    """(parmak izi, normalize SQL); parmak izi normalize metnin kısa MD5 özetidir"""
+    normalized = normalize_sql(statement)
+    return hashlib.md5(normalized.encode()).hexdigest()[:16], normalized
+
+class Histogram:
+    """Sabit sınırlı kümülatif olmayan kova sayaçları (Prometheus'a yazarken toplanır)"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def buckets(self) -> List[Tuple[str, int]]:
+        """(le, kümülatif sayı) çiftleri; son kova +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(list(self.bounds) + ["+Inf"], self.counts):
+            total += count
+            result.append((bound if isinstance(bound, str) else repr(float(bound)), total))
+        return result
+
+class QueryStats:
+    """Bir SQL parmak izinin metrikleri"""
+    __slots__ = ("fingerprint", "statement", "operation", "latency", "rows", "errors")
+
+    def __init__(self, fingerprint: str, statement: str, operation: str):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        self.operation = operation
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.rows = 0
+        self.errors = 0
+
+class DBMetrics:
+    """Süreç genelindeki metrik deposu"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.queries: Dict[str, QueryStats] = {}
+            self._by_statement: Dict[str, QueryStats] = {}
+            self.requests: Dict[str, Histogram] = {}
+            self.checkout = Histogram(CHECKOUT_BUCKETS)
+            self.engines: List[weakref.ref] = []
+
+    def _stats_for(self, statement: str) -> QueryStats:
+        """Ham SQL için parmak izi kaydı (kilit altında çağrılır)"""
+        stats = self._by_statement.get(statement)
+        if stats is not None:
+            return stats
+        fingerprint, normalized = fingerprint_sql(statement)
+        stats = self.queries.get(fingerprint)
+        if stats is None:
+            if len(self.queries) >= MAX_FINGERPRINTS:
+                fingerprint, normalized = "other", "other"
+                stats = self.queries.get(fingerprint)
+            if stats is None:
+                operation = normalized.split(" ", 1)[0].upper() if normalized else "?"
+                stats = QueryStats(fingerprint, normalized[:STATEMENT_LABEL_LENGTH], operation)
+                self.queries[fingerprint] = stats
+        if len(self._by_statement) >= MAX_CACHED_STATEMENTS:
+            self._by_statement.clear()
+        self._by_statement[statement] = stats
+        return stats
+
+    def observe_query(self, statement: str, seconds: float, rows: int) -> None:
+        with self._lock:
+            stats = self._stats_for(statement)
+            stats.latency.observe(seconds)
+            if rows > 0:
+                stats.rows += rows
+
+    def observe_error(self, statement: str) -> None:
+        with self._lock:
+            self._stats_for(statement).errors += 1
+
+    def observe_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checkout.observe(seconds)
+
+    def observe_request(self, route: str, queries: int) -> None:
+        with self._lock:
+            histogram = self.requests.get(route)
+            if histogram is None:
+                histogram = self.requests[route] = Histogram(QUERIES_PER_REQUEST_BUCKETS)
+            histogram.observe(queries)
+
+metrics = DBMetrics()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("db_metrics_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["db_metrics_start"].pop()
+    # Satırlar cursor.rowcount'tan gelir: DML'de etkilenen satırlar her sürücüde, SELECT'te dönen
+    # satırlar yalnızca psycopg2'de bilinir. sqlite3 SELECT için -1 bildirir ve sayılmaz; çekilen
+    # satırları saymak sonuç nesnesini sarmayı gerektirir, bu da her sorguya maliyet ekler.
+    metrics.observe_query(statement, elapsed, cursor.rowcount)
+    counter = _request_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("db_metrics_start"):
+        connection.info["db_metrics_start"].pop()
+    if exception_context.statement is not None:
+        metrics.observe_error(exception_context.statement)
+
+def install() -> None:
+    """Dinleyicileri tüm motorlar için kaydeder"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+def uninstall() -> None:
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.remove(Engine, "handle_error", _handle_error)
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Havuzdan bağlantı alma süresini ölçer ve havuz doluluğunu metriklere ekler
+
+    SQLAlchemy'de checkout öncesi olayı yoktur; Engine.raw_connection() (havuzdan alma)
+    motor örneği üzerinde sarılır, böylece engine.dispose() sonrası da geçerli kalır.
+    """
+    if not ENABLED or "raw_connection" in vars(engine):
+        return engine
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            metrics.observe_checkout(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+    with metrics._lock:
+        metrics.engines = [ref for ref in metrics.engines if ref() is not None] + [weakref.ref(engine)]
+    return engine
+
+@contextmanager
+def request_queries():
+    """Blok içindeki (thread havuzuna taşınanlar dahil) sorguları sayar: counter[0]"""
+    counter = [0]
+    token = _request_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_counter.reset(token)
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_label_value(str(value))}"' for name, value in labels.items())
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str) -> List[str]:
+    prefix = labels + "," if labels else ""
+    lines = [f'{name}_bucket{{{prefix}le="{le}"}} {count}' for le, count in histogram.buckets()]
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum!r}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+def render_prometheus() -> str:
+    """Tüm metrikleri Prometheus metin biçiminde (0.0.4) döndürür"""
+    with metrics._lock:
+        queries = list(metrics.queries.values())
+        requests = list(metrics.requests.items())
+        checkout = metrics.checkout
+        lines = [
+            "# HELP library_db_query_duration_seconds SQL ifadesi süresi (normalize edilmiş parmak izine göre)",
+            "# TYPE library_db_query_duration_seconds histogram",
+        ]
+        for stats in queries:
+            labels = _labels(fingerprint=stats.fingerprint, operation=stats.operation, statement=stats.statement)
+            lines += _histogram_lines("library_db_query_duration_seconds", stats.latency, labels)
+        lines += [
+            "# HELP library_db_query_rows_total Sürücünün bildirdiği satır sayısı (DML: etkilenen; SELECT: dönen, yalnızca PostgreSQL - SQLite'ta 0)",
+            "# TYPE library_db_query_rows_total counter",
+        ]
+        lines += [f"library_db_query_rows_total{{{_labels(fingerprint=stats.fingerprint)}}} {stats.rows}" for stats in queries]
+        lines += [
+            "# HELP library_db_query_errors_total Hata ile sonuçlanan SQL ifadeleri",
+            "# TYPE library_db_query_errors_total counter",
+        ]
+        lines += [f"library_db_query_errors_total{{{_labels(fingerprint=stats.fingerprint)}}} {stats.errors}" for stats in queries]
+        lines += [
+            "# HELP library_http_request_queries HTTP isteği başına çalışan SQL ifadesi sayısı",
+            "# TYPE library_http_request_queries histogram",
+        ]
+        for route, histogram in sorted(requests):
+            lines += _histogram_lines("library_http_request_queries", histogram, _labels(route=route))
+        lines += [
+            "# HELP library_db_pool_checkout_seconds Havuzdan bağlantı alma bekleme süresi (yeni bağlantı açma dahil)",
+            "# TYPE library_db_pool_checkout_seconds histogram",
+        ]
+        lines += _histogram_lines("library_db_pool_checkout_seconds", checkout, "")
+        engines = [ref() for ref in metrics.engines]
+    lines += [
+        "# HELP library_db_pool_connections Havuzdaki bağlantılar (durumuna göre)",
+        "# TYPE library_db_pool_connections gauge",
+    ]
+    for engine in engines:
+        pool = getattr(engine, "pool", None)
+        if pool is None or not hasattr(pool, "checkedout"):
+            continue
+        database = engine.url.database or ""
+        for state, value in (("checked_out", pool.checkedout()), ("idle", pool.checkedin()), ("overflow", max(0, pool.overflow()))):
+            lines.append(f"library_db_pool_connections{{{_labels(database=database, state=state)}}} {value}")
+    return "\n".join(lines) + "\n"
+
+if ENABLED:
+    install()
+
+def _timed_loop(func, iterations: int) -> float:
+    """Fonksiyonun bir çağrısının ortalama süresi (sn)"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+# Test fonksiyonu
+def test_metrics(iterations: int = 2000, rounds: int = 5) -> bool:
+    """Parmak izi, histogram ve Prometheus çıktısını doğrular; ölçüm maliyetini raporlar"""
+    from sqlalchemy import Column, Integer, String, create_engine, insert, select, text
+    from sqlalchemy.orm import declarative_base, sessionmaker
+
+    normalized = normalize_sql("SELECT * FROM books WHERE id IN (?, ?, ?) AND title = 'O''Neil' LIMIT 50")
+    normalize_ok = normalized == "SELECT * FROM books WHERE id IN (?) AND title = ? LIMIT ?"
+    same = normalize_sql("SELECT a FROM t WHERE x = %(x_1)s") == normalize_sql("SELECT a FROM t WHERE x = ?")
+    print(f"{'✅' if normalize_ok and same else '❌'} Normalize: {normalized}")
+
+    Base = declarative_base()
+
+    class Item(Base):
+        __tablename__ = "items"
+        id = Column(Integer, primary_key=True)
+        name = Column(String, nullable=False)
+
+    engine = instrument_engine(create_engine("sqlite://"))
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    metrics.reset()
+    instrument_engine(engine)
+    with Session() as session:
+        session.execute(insert(Item), [{"name": f"Öğe {i}"} for i in range(200)])
+        session.commit()
+        with request_queries() as counter:
+            for i in range(10):
+                session.execute(select(Item).where(Item.id.in_(list(range(i + 1))))).all()
+        metrics.observe_request("/items", counter[0])
+        try:
+            session.execute(text("SELECT missing FROM items")).all()
+        except Exception:
+            session.rollback()
+
+    select_stats = [stats for stats in metrics.queries.values() if "IN (?)" in stats.statement]
+    grouped = len(select_stats) == 1 and select_stats[0].latency.count == 10
+    counted = counter[0] == 10
+    errors = sum(stats.errors for stats in metrics.queries.values())
+    output = render_prometheus()
+    exposed = ('library_http_request_queries_bucket{route="/items",le="10.0"} 1' in output
+               and "library_db_pool_checkout_seconds_count" in output and errors == 1)
+    print(f"{'✅' if grouped else '❌'} Farklı uzunluktaki IN listeleri tek parmak izinde toplandı")
+    print(f"{'✅' if counted else '❌'} İstek başına sorgu sayısı: {counter[0]}")
+    # sqlite3: INSERT etkilenen satırları bildirir, SELECT -1 bildirir (sayılmaz)
+    insert_rows = sum(stats.rows for stats in metrics.queries.values() if stats.operation == "INSERT")
+    rows_ok = insert_rows == 200 and select_stats[0].rows == 0
+    print(f"{'✅' if rows_ok else '❌'} Satır sayacı: INSERT {insert_rows}, SELECT {select_stats[0].rows if select_stats else '-'}")
+    print(f"{'✅' if exposed else '❌'} Prometheus çıktısı ({len(output.splitlines())} satır, {errors} hata sayıldı)")
+
+    # Maliyet: dinleyici çiftinin sorgu başına süresi, sayfa sorgusuna benzer 50 satırlık ORM
+    # sorgusunun süresiyle karşılaştırılır (açık/kapalı tur karşılaştırması tek çekirdekte gürültüde kaybolur)
+    page_query = select(Item).where(Item.id > 10).order_by(Item.id).limit(50)
+    with Session() as session:
+        session.execute(page_query).scalars().all()
+        query_seconds = min(
+            _timed_loop(lambda: session.execute(page_query).scalars().all(), iterations) for _ in range(rounds)
+        )
+
+    class _Cursor:
+        rowcount = -1
+
+    statement = str(page_query.compile(engine))
+    with engine.connect() as connection:
+        def listeners() -> None:
+            _before_cursor_execute(connection, _Cursor, statement, (), None, False)
+            _after_cursor_execute(connection, _Cursor, statement, (), None, False)
+        listener_seconds = min(_timed_loop(listeners, iterations) for _ in range(rounds))
+    overhead = listener_seconds / query_seconds
+    cheap = overhead < 0.03
+    print(f"{'✅' if cheap else '❌'} Ölçüm maliyeti: sorgu başına {listener_seconds * 1e6:.1f} µs, "
+          f"sayfa sorgusu {query_seconds * 1e6:.0f} µs (%{overhead * 100:.1f})")
+    engine.dispose()
+    return normalize_ok and same and grouped and counted and rows_ok and exposed and cheap
+
+if __name__ == "__main__":
+    print("🧪 Veritabanı metrikleri test ediliyor...")
+    sys.exit(0 if test_metrics() else 1)
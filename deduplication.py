@@ -0,0 +1,168 @@
+# Kopya Kayıt Birleştirme
+# Aynı anahtara (ör. üye adı, kitap başlığı) sahip kayıtları birkaç toplu SQL
+# cümlesiyle tek transaction'da birleştirir
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import Column, Integer, MetaData, Table, delete, func, insert, select, update
+
+# Kuru çalıştırma (dry-run) raporunda gösterilecek en büyük kopya grubu sayısı
+DEFAULT_EXAMPLE_LIMIT = 20
+
+def _map_table() -> Table:
+    """Kopya id -> hayatta kalan id eşlemesini tutan geçici tablo"""
+    return Table(
+        "dedup_map", MetaData(),
+        Column("duplicate_id", Integer, primary_key=True),
+        Column("survivor_id", Integer, nullable=False, index=True),
+        prefixes=["TEMPORARY"],
+    )
+
+def merge_duplicates(
+    session,
+    model,
+    key_column,
+    references: Sequence[Any],
+    dry_run: bool = False,
+    before_commit: Optional[Callable[[Any, Table], None]] = None,
+    example_limit: int = DEFAULT_EXAMPLE_LIMIT,
+) -> Dict[str, Any]:
+    """`key_column` değeri aynı olan kayıtlardan en düşük id'liyi tutar, diğerlerini siler
+
+    1. Pencere fonksiyonu (MIN(id) OVER (PARTITION BY anahtar)) ile kopya -> hayatta kalan
+       eşlemesi geçici tabloya tek INSERT ... SELECT ile yazılır
+    2. `references` içindeki her yabancı anahtar sütunu UPDATE ... FROM ile hayatta kalana taşınır
+    3. Kopyalar tek DELETE ile silinir
+    `before_commit(session, map_table)` aynı transaction'da ek toplu güncellemeler içindir.
+    `dry_run=True` ise hiçbir değişiklik kalıcı olmaz, yalnızca rapor döner.
+
+    Dönüş: {"groups", "duplicates", "references_repointed", "examples", "duplicate_ids",
+    "survivor_ids", "dry_run", "seconds"}
+    """
+    start = time.perf_counter()
+    id_column = model.__table__.c.id
+    key = model.__table__.c[key_column.key]
+    map_table = _map_table()
+    connection = session.connection()
+    try:
+        # Önceki bir kuru çalıştırmadan bağlantıda kalmış olabilir (SQLite DDL'i transaction dışında çalıştırır)
+        map_table.drop(connection, checkfirst=True)
+        map_table.create(connection)
+        ranked = select(
+            id_column.label("duplicate_id"),
+            func.min(id_column).over(partition_by=key).label("survivor_id"),
+        ).subquery()
+        session.execute(insert(map_table).from_select(
+            ["duplicate_id", "survivor_id"],
+            select(ranked.c.duplicate_id, ranked.c.survivor_id).where(ranked.c.duplicate_id != ranked.c.survivor_id),
+        ))
+
+        duplicates, groups = session.execute(
+            select(func.count(), func.count(func.distinct(map_table.c.survivor_id)))
+        ).one()
+
+        repointed: Dict[str, int] = {}
+        for reference in references:
+            result = session.execute(
+                update(reference.table)
+                .where(reference == map_table.c.duplicate_id)
+                .values({reference.key: map_table.c.survivor_id})
+            )
+            repointed[f"{reference.table.name}.{reference.key}"] = result.rowcount
+
+        # En büyük kopya grupları (rapor için)
+        group_size = func.count().label("group_size")
+        largest = session.execute(
+            select(map_table.c.survivor_id, key, group_size)
+            .join(model.__table__, id_column == map_table.c.survivor_id)
+            .group_by(map_table.c.survivor_id, key)
+            .order_by(group_size.desc(), map_table.c.survivor_id)
+            .limit(example_limit)
+        ).all()
+        examples = [
+            {"key": row[1], "survivor_id": row.survivor_id, "duplicates": row.group_size}
+            for row in largest
+        ]
+
+        mapping = session.execute(select(map_table.c.duplicate_id, map_table.c.survivor_id)).all()
+        duplicate_ids: List[int] = [row.duplicate_id for row in mapping]
+        survivor_ids: List[int] = sorted({row.survivor_id for row in mapping})
+
+        session.execute(delete(model.__table__).where(id_column.in_(select(map_table.c.duplicate_id))))
+        if before_commit is not None:
+            before_commit(session, map_table)
+        map_table.drop(connection)
+
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return {
+        "groups": groups,
+        "duplicates": duplicates,
+        "references_repointed": repointed,
+        "examples": examples,
+        "duplicate_ids": duplicate_ids,
+        "survivor_ids": survivor_ids,
+        "dry_run": dry_run,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+def print_report(report: Dict[str, Any], label: str) -> None:
+    """Birleştirme raporunu yazdırır"""
+    mode = "🔎 Kuru çalıştırma" if report["dry_run"] else "🧹 Birleştirme"
+    print(f"{mode} ({label}): {report['groups']} grupta {report['duplicates']} kopya, {report['seconds']} sn")
+    for reference, count in report["references_repointed"].items():
+        print(f"   ↪️ {reference}: {count} kayıt taşındı")
+    for example in report["examples"]:
+        print(f"   • '{example['key']}' -> #{example['survivor_id']} ({example['duplicates']} kopya)")
+
+# Test fonksiyonu
+def test_merge(groups: int = 100000, copies: int = 3) -> bool:
+    """Bellek içi SQLite üzerinde toplu birleştirmenin doğruluğunu ve süresini kontrol eder"""
+    from sqlalchemy import ForeignKey, String, create_engine
+    from sqlalchemy.orm import declarative_base, sessionmaker
+
+    Base = declarative_base()
+
+    class Person(Base):
+        __tablename__ = "people"
+        id = Column(Integer, primary_key=True)
+        name = Column(String, nullable=False)
+
+    class Visit(Base):
+        __tablename__ = "visits"
+        id = Column(Integer, primary_key=True)
+        person_id = Column(Integer, ForeignKey("people.id"), nullable=False, index=True)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    people = [{"id": i * copies + c + 1, "name": f"Kişi {i}"} for i in range(groups) for c in range(copies)]
+    session.execute(insert(Person.__table__), people)
+    session.execute(insert(Visit.__table__), [{"person_id": person["id"]} for person in people])
+    session.commit()
+
+    dry = merge_duplicates(session, Person, Person.name, [Visit.person_id], dry_run=True)
+    untouched = session.query(Person).count() == groups * copies
+    report = merge_duplicates(session, Person, Person.name, [Visit.person_id])
+    remaining = session.query(Person).count()
+    orphans = session.query(Visit).filter(~Visit.person_id.in_(select(Person.id))).count()
+    expected = groups * (copies - 1)
+    ok = (untouched and dry["duplicates"] == expected and report["duplicates"] == expected
+          and remaining == groups and orphans == 0
+          and report["references_repointed"]["visits.person_id"] == expected)
+    print(f"{'✅' if untouched else '❌'} Kuru çalıştırma veriyi değiştirmedi ({dry['duplicates']} kopya bulundu)")
+    print(f"{'✅' if ok else '❌'} {expected} kopya {report['seconds']} sn'de birleştirildi, kalan {remaining}, yetim {orphans}")
+    session.close()
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Kopya birleştirme test ediliyor...")
+    sys.exit(0 if test_merge() else 1)
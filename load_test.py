@@ -0,0 +1,260 @@
+# Yük Testi (Load Test)
+# Eşzamanlı kütüphaneci istemcilerini taklit eder: /books, /members, /loans sayfa yüklemeleri,
+# typeahead aramaları ve HTTP üzerinden ödünç verme/iade. İstemci sayısı adım adım artırılır;
+# her adımda gecikme yüzdelikleri, işlem hacmi ve sunucunun olay döngüsü gecikmesi raporlanır.
+#
+#   python load_test.py serve --port 8082                 # test sunucusu (oturum açık başlar)
+#   python load_test.py run --clients 1,5,10,25,50        # çalışan sunucuya yük uygula
+#   python load_test.py run --spawn                       # sunucuyu kendisi başlatıp kapatır
+import argparse
+import asyncio
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from loop_monitor import summarize
+
+DEFAULT_URL = "http://127.0.0.1:8082"
+DEFAULT_CLIENTS = "1,5,10,25,50"
+DEFAULT_STEP_SECONDS = 30.0
+# Kütüphanecinin iki işlem arasındaki ortalama düşünme süresi (üstel dağılım); 0 = doyurma testi
+DEFAULT_THINK_SECONDS = 1.0
+REQUEST_TIMEOUT = 30.0
+SERVER_START_TIMEOUT = 120.0
+
+# (işlem, ağırlık): sayfa yüklemeleri sunucuda sayfayı kurar ve ilk tablo sayfasını sorgular
+ACTIONS = (
+    ("page:/books", 0.3),
+    ("page:/members", 0.2),
+    ("page:/loans", 0.3),
+    ("borrow_return", 0.2),
+)
+
+class LoadTestError(Exception):
+    """Yük testi başlatılamadı (sunucuya ulaşılamıyor ya da oturum kapalı)"""
+
+class StepStats:
+    """Bir adımdaki işlem sürelerini ve hataları toplar"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.conflicts = 0
+
+    def record(self, name: str, seconds: float) -> None:
+        self.latencies[name].append(seconds)
+
+    def all_latencies(self) -> List[float]:
+        return [value for values in self.latencies.values() for value in values]
+
+async def _timed(stats: StepStats, name: str, request) -> Optional[httpx.Response]:
+    """İsteği çalıştırır ve süresini kaydeder; ağ hatası ve 5xx hata olarak sayılır"""
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as exc:
+        stats.errors[f"{name}: {type(exc).__name__}"] += 1
+        return None
+    stats.record(name, time.perf_counter() - start)
+    if response.status_code >= 500 or response.status_code in (401, 404):
+        stats.errors[f"{name}: HTTP {response.status_code}"] += 1
+        return None
+    return response
+
+async def _pick(client: httpx.AsyncClient, stats: StepStats, path: str, rng: random.Random) -> Optional[int]:
+    """Typeahead ile rastgele bir önekten seçim yapar (kütüphanecinin yazarak araması gibi)"""
+    query = rng.choice(string.ascii_uppercase) if rng.random() < 0.7 else ""
+    response = await _timed(stats, "typeahead", client.get(path, params={"q": query}))
+    items = response.json() if response is not None else []
+    if not items and query:
+        response = await _timed(stats, "typeahead", client.get(path, params={"q": ""}))
+        items = response.json() if response is not None else []
+    return rng.choice(items)["id"] if items else None
+
+async def _borrow_and_return(client: httpx.AsyncClient, stats: StepStats, rng: random.Random) -> None:
+    book_id = await _pick(client, stats, "/api/typeahead/books", rng)
+    member_id = await _pick(client, stats, "/api/typeahead/members", rng)
+    if book_id is None or member_id is None:
+        stats.errors["borrow: seçilecek kitap/üye yok"] += 1
+        return
+    response = await _timed(stats, "borrow", client.post("/api/loans", json={"book_id": book_id, "member_id": member_id}))
+    if response is None:
+        return
+    if response.status_code == 409:
+        # Başka bir istemci aynı kitabı az önce ödünç aldı: beklenen yarış, hata değil
+        stats.conflicts += 1
+        return
+    await _timed(stats, "return", client.post(f"/api/loans/{response.json()['id']}/return"))
+
+async def _librarian(client: httpx.AsyncClient, stats: StepStats, deadline: float, think: float, rng: random.Random) -> None:
+    names = [name for name, _ in ACTIONS]
+    weights = [weight for _, weight in ACTIONS]
+    while time.perf_counter() < deadline:
+        action = rng.choices(names, weights)[0]
+        if action == "borrow_return":
+            await _borrow_and_return(client, stats, rng)
+        else:
+            await _timed(stats, action, client.get(action.split(":", 1)[1]))
+        remaining = deadline - time.perf_counter()
+        if think > 0 and remaining > 0:
+            await asyncio.sleep(min(rng.expovariate(1 / think), remaining))
+
+async def run_step(client: httpx.AsyncClient, clients: int, seconds: float, think: float, seed: int) -> Dict[str, Any]:
+    """`clients` eşzamanlı istemciyi `seconds` boyunca çalıştırır ve adım raporunu döndürür"""
+    stats = StepStats()
+    await client.get("/api/health/loop", params={"reset": "true"})
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*(
+        _librarian(client, stats, deadline, think, random.Random(seed * 1000 + i)) for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    loop_lag = (await client.get("/api/health/loop")).json()
+    latencies = stats.all_latencies()
+    return {
+        "clients": clients,
+        "seconds": round(elapsed, 2),
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency": summarize(latencies),
+        "actions": {name: summarize(values) for name, values in sorted(stats.latencies.items())},
+        "errors": dict(stats.errors),
+        "conflicts": stats.conflicts,
+        "loop_lag": loop_lag,
+    }
+
+def print_step(step: Dict[str, Any]) -> None:
+    latency, lag = step["latency"], step["loop_lag"]
+    errors = sum(step["errors"].values())
+    print(f"👥 {step['clients']:>3} istemci | {step['requests']:>6} istek | {step['throughput_rps']:>7.1f} istek/sn | "
+          f"p50 {latency['p50_ms']:.0f} ms, p95 {latency['p95_ms']:.0f} ms, p99 {latency['p99_ms']:.0f} ms | "
+          f"{'❌' if errors else '✅'} {errors} hata | 🔄 döngü gecikmesi p95 {lag['p95_ms']:.0f} ms, en fazla {lag['max_ms']:.0f} ms")
+    for name, summary in step["actions"].items():
+        print(f"      {name:<16} {summary['count']:>6} x  p50 {summary['p50_ms']:>8.1f}  p95 {summary['p95_ms']:>8.1f}  "
+              f"p99 {summary['p99_ms']:>8.1f} ms")
+    for error, count in step["errors"].items():
+        print(f"      ⚠️ {error}: {count}")
+
+async def run_load_test(url: str, clients: Sequence[int], seconds: float, think: float, seed: int = 42) -> List[Dict[str, Any]]:
+    """İstemci sayısını adım adım artırarak yük testi yapar"""
+    limits = httpx.Limits(max_connections=max(clients) + 10, max_keepalive_connections=max(clients) + 10)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        try:
+            response = await client.get("/api/health/loop")
+        except httpx.HTTPError as exc:
+            raise LoadTestError(f"Sunucuya ulaşılamadı ({url}): {exc}")
+        if response.status_code == 401:
+            raise LoadTestError("Sunucuda oturum açık değil: arayüzden giriş yapın ya da `python load_test.py serve` kullanın")
+        response.raise_for_status()
+        steps = []
+        for count in clients:
+            step = await run_step(client, count, seconds, think, seed)
+            print_step(step)
+            steps.append(step)
+        return steps
+
+def serve(host: str, port: int, database_url: Optional[str] = None) -> None:
+    """Uygulamayı yük testi için başlatır: tek kullanıcılı demo oturumu baştan açılır"""
+    from nicegui import ui
+    import main
+
+    if database_url:
+        main.bind_database(database_url)
+    main.init_db()
+    main.login_user()
+    print(f"🚀 Yük testi sunucusu: http://{host}:{port}")
+    ui.run(host=host, port=port, title="YB Kütüphane Sistemi (yük testi)", show=False, reload=False,
+           storage_secret="load-test-secret")
+
+def _spawn_server(port: int, database_url: Optional[str]) -> subprocess.Popen:
+    command = [sys.executable, os.path.abspath(__file__), "serve", "--port", str(port)]
+    if database_url:
+        command += ["--database-url", database_url]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise LoadTestError(f"Sunucu başlatılamadı (çıkış kodu {process.returncode})")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health/loop", timeout=2).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise LoadTestError(f"Sunucu {SERVER_START_TIMEOUT:.0f} sn içinde hazır olmadı")
+
+# Test fonksiyonu
+def test_load_test(port: int = 8093) -> bool:
+    """SQLite üzerinde kısa bir yük testi: tüm işlemler hatasız ölçülmeli"""
+    import tempfile
+    import main
+    from generate_dataset import PRESETS, SyntheticSource, load_sqlite
+
+    # Şema uygulamanınki olmalı (SQLiteManager şemasında is_on_loan, age gibi sütunlar yok)
+    path = os.path.join(tempfile.mkdtemp(), "load_test.db")
+    main.bind_database(f"sqlite:///{path}")
+    main.init_db()
+    load_sqlite(SyntheticSource(**PRESETS["small"]), path, log=lambda message: None)
+    process = _spawn_server(port, f"sqlite:///{path}")
+    try:
+        steps = asyncio.run(run_load_test(f"http://127.0.0.1:{port}", [1, 4], seconds=5, think=0.05))
+    finally:
+        process.terminate()
+        process.wait()
+    actions = set(steps[-1]["actions"])
+    covered = {"page:/books", "page:/members", "page:/loans", "borrow", "return"} <= actions
+    clean = all(not step["errors"] for step in steps)
+    lag_measured = all(step["loop_lag"]["count"] > 0 for step in steps)
+    print(f"{'✅' if covered else '❌'} Ölçülen işlemler: {', '.join(sorted(actions))}")
+    print(f"{'✅' if clean else '❌'} Hatasız tamamlandı, {'✅' if lag_measured else '❌'} döngü gecikmesi ölçüldü")
+    return covered and clean and lag_measured
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NiceGUI uygulaması için eşzamanlı kütüphaneci yük testi")
+    commands = parser.add_subparsers(dest="command")
+    serve_parser = commands.add_parser("serve", help="Uygulamayı oturum açık olarak başlat")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8082)
+    serve_parser.add_argument("--database-url", help="Varsayılan DATABASE_URL yerine (ör. sqlite:///yuk.db)")
+    run_parser = commands.add_parser("run", help="Çalışan sunucuya artan yük uygula")
+    run_parser.add_argument("--url", default=DEFAULT_URL)
+    run_parser.add_argument("--clients", default=DEFAULT_CLIENTS, help="Adım başına istemci sayıları (virgülle)")
+    run_parser.add_argument("--step-seconds", type=float, default=DEFAULT_STEP_SECONDS)
+    run_parser.add_argument("--think", type=float, default=DEFAULT_THINK_SECONDS, help="Ortalama düşünme süresi (sn)")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--output", help="Adım raporlarının yazılacağı JSON dosyası")
+    run_parser.add_argument("--spawn", action="store_true", help="Sunucuyu --url portunda kendisi başlatsın")
+    run_parser.add_argument("--database-url", help="--spawn ile başlatılan sunucunun veritabanı")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.database_url)
+    elif args.command == "run":
+        server = _spawn_server(httpx.URL(args.url).port or 80, args.database_url) if args.spawn else None
+        try:
+            results = asyncio.run(run_load_test(
+                args.url, [int(count) for count in args.clients.split(",")], args.step_seconds, args.think, args.seed,
+            ))
+        except LoadTestError as exc:
+            print(f"❌ {exc}")
+            sys.exit(1)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=2, ensure_ascii=False)
+            print(f"💾 Sonuçlar: {args.output}")
+    else:
+        print("🧪 Yük testi aracı test ediliyor...")
+        sys.exit(0 if test_load_test() else 1)
@@ -0,0 +1,87 @@
+# Olay Döngüsü Gecikme İzleyicisi
+# Kısa aralıklarla uyuyan bir görev, uyanışının ne kadar geciktiğini ölçer; gecikme,
+# olay döngüsünü bloklayan (thread havuzuna taşınmamış) işlerin doğrudan göstergesidir
+import asyncio
+import math
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+# Ölçüm aralığı ve saklanan en fazla örnek sayısı (0.05 sn x 12000 = son 10 dakika)
+DEFAULT_INTERVAL = 0.05
+MAX_SAMPLES = 12000
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Sıralı olmayan değerlerde en yakın sıra (nearest-rank) yüzdeliği; boşsa 0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(values: Sequence[float]) -> Dict[str, Any]:
+    """Saniye cinsinden değerleri milisaniye p50/p95/p99/max özetine çevirir"""
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2) if values else 0.0,
+    }
+
+class LoopLagMonitor:
+    """Çalışan olay döngüsünün gecikmesini arka plan görevinde örnekler"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, max_samples: int = MAX_SAMPLES):
+        self.interval = interval
+        self.samples: deque = deque(maxlen=max_samples)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Görevi çalışan döngüde başlatır (app.on_startup içinden çağrılır)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="loop-lag-monitor")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """Toplanan örneklerin özeti; reset=True ise örnekler sonra temizlenir"""
+        values = list(self.samples)
+        if reset:
+            self.samples.clear()
+        return {"interval_ms": self.interval * 1000, **summarize(values)}
+
+# Test fonksiyonu
+def test_monitor(block_seconds: float = 0.3) -> bool:
+    """Döngüyü bilerek bloklayan bir çağrının gecikme olarak ölçüldüğünü doğrular"""
+    async def scenario() -> tuple:
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.2)
+        idle = monitor.snapshot(reset=True)
+        time.sleep(block_seconds)  # Olay döngüsünü bloklayan senkron çağrı
+        await asyncio.sleep(0.05)
+        blocked = monitor.snapshot()
+        monitor.stop()
+        return idle, blocked
+
+    idle, blocked = asyncio.run(scenario())
+    idle_ok = idle["count"] > 5 and idle["p95_ms"] < 20
+    blocked_ok = blocked["max_ms"] >= block_seconds * 1000 * 0.9
+    print(f"{'✅' if idle_ok else '❌'} Boşta gecikme: p95 {idle['p95_ms']} ms ({idle['count']} örnek)")
+    print(f"{'✅' if blocked_ok else '❌'} {block_seconds * 1000:.0f} ms blok ölçüldü: en yüksek {blocked['max_ms']} ms")
+    return idle_ok and blocked_ok
+
+if __name__ == "__main__":
+    print("🧪 Olay döngüsü gecikme izleyicisi test ediliyor...")
+    sys.exit(0 if test_monitor() else 1)
@@ -1,16 +1,34 @@
+import asyncio
 import os
 from contextlib import closing
 import hashlib
 import secrets
+import shutil
+import tempfile
+import threading
 from datetime import date, datetime, timedelta
-from typing import Optional, Any, List, Dict
-from nicegui import ui, app
-from fastapi import Request, HTTPException
+from typing import Optional, Any, Iterable, List, Dict, Tuple
+from nicegui import ui, app, Client
+from fastapi import Depends, Request, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import create_engine, Column, Integer, String, Text, Date, ForeignKey, DateTime, func
+from sqlalchemy import create_engine, Column, Integer, String, Text, Date, ForeignKey, DateTime, Boolean, Index, func, tuple_, exists, false, true, select, update, insert, or_
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
 from sqlalchemy.sql import text
+from query_guard import query_budget_page
+from async_db import run_db, call_handler, shutdown as shutdown_db_threads
+from catalog_search import CatalogSearchIndex, load_from_session, normalize_isbn
+from typeahead import PrefixIndex, book_label, DEFAULT_LIMIT as TYPEAHEAD_LIMIT
+from deduplication import merge_duplicates, print_report as print_merge_report
+from near_duplicates import NearDuplicateFinder, normalize_email, normalize_phone
+from bulk_import import ImportFormatError, detect_format, get_job, start_import, validate_book, validate_member
+from bulk_export import DEFAULT_EXPORT_BATCH, ExportFormatError, export_chunks, response_headers
+from loop_monitor import LoopLagMonitor
+from db_metrics import PROMETHEUS_CONTENT_TYPE, instrument_engine, metrics as db_metrics, render_prometheus, request_queries
+import slow_query_log  # Yavaş ORM sorgularını planlarıyla logs/slow_queries.jsonl'e yazar (SLOW_QUERY_SECONDS)
+from tracing import trace_requests, traced_page
+from profiler import MemoryProfiler, ProfilerBusy, SamplingProfiler, collapsed
 
 # PostgreSQL bağlantı bilgileri
 DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -26,11 +44,23 @@ ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "yusuf1234")
 # Oturum yönetimi - Global değişken kullan
 _LOGGED_IN_USERS = set()
 
-# Database URL
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Sayfalama ayarları (keyset sayfalama için varsayılan ve en büyük sayfa boyutu)
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 500
+# Katalog araması puan sırasıyla en fazla bu kadar sonuca kadar sayfalanır
+MAX_SEARCH_RESULTS = 1000
+
+# Katalog arama indeksi (uygulama açılışında arka planda doldurulur)
+catalog_index = CatalogSearchIndex()
+# Ödünç sayfasındaki seçiciler için önek indeksleri: rafta olan kitaplar ve tüm üyeler
+book_suggestions = PrefixIndex()
+member_suggestions = PrefixIndex()
+
+# Database URL (DATABASE_URL ile geçersiz kılınabilir, ör. sqlite:///kutuphane.db)
+DATABASE_URL = os.getenv("DATABASE_URL", f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
 
 # SQLAlchemy setup
-engine = create_engine(DATABASE_URL)
+engine = instrument_engine(create_engine(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -48,7 +78,13 @@ class Member(Base):
     salt = Column(String, nullable=False)
     
     # Relationships
-    loans = relationship("Loan", back_populates="member")
+    # Liste görünümleri bu ilişkiyi hiç yüklemez (projeksiyon kullanır)
+    loans = relationship("Loan", back_populates="member", lazy="select")
+    
+    __table_args__ = (
+        # Keyset sayfalama: ORDER BY name, id
+        Index("ix_members_name_id", "name", "id"),
+    )
 
 class Book(Base):
     __tablename__ = "books"
@@ -58,9 +94,27 @@ class Book(Base):
     author = Column(String, nullable=False)
     isbn = Column(String, nullable=True)
     year = Column(Integer, nullable=True)
+    # Kitabın aktif bir ödüncü var mı? create_loan()/return_book() ile aynı transaction içinde güncellenir
+    is_on_loan = Column(Boolean, nullable=False, default=False, server_default=false())
     
     # Relationships
-    loans = relationship("Loan", back_populates="book")
+    # Liste görünümleri bu ilişkiyi hiç yüklemez (projeksiyon kullanır)
+    loans = relationship("Loan", back_populates="book", lazy="select")
+    
+    __table_args__ = (
+        # Keyset sayfalama: ORDER BY title, id
+        Index("ix_books_title_id", "title", "id"),
+        # Yalnızca rafta olan kitaplar: ödünç geçmişinin boyutundan bağımsız müsaitlik sorgusu
+        Index(
+            "ix_books_available_title_id", "title", "id",
+            postgresql_where=text("NOT is_on_loan"),
+            sqlite_where=text("NOT is_on_loan"),
+        ),
+    )
+
+# Müsaitlik koşulu kısmi indeksin WHERE ifadesiyle birebir aynı olmalı: SQLite'ta ~Book.is_on_loan
+# "is_on_loan = 0" olarak derlenir ve planlayıcı ix_books_available_title_id'yi seçmez
+BOOK_AVAILABLE = text("NOT books.is_on_loan")
 
 class Loan(Base):
     __tablename__ = "loans"
@@ -73,8 +127,35 @@ class Loan(Base):
     return_date = Column(Date, nullable=True)
     
     # Relationships
-    book = relationship("Book", back_populates="loans")
-    member = relationship("Member", back_populates="loans")
+    # Satır başına gizli sorgu (N+1) oluşmasın diye tembel yükleme kapalıdır;
+    # kitap/üye bilgisi join ile alınmalıdır.
+    book = relationship("Book", back_populates="loans", lazy="raise_on_sql")
+    member = relationship("Member", back_populates="loans", lazy="raise_on_sql")
+    
+    __table_args__ = (
+        # Aktif ödünçlerin keyset sayfalaması: ORDER BY loan_date DESC, id DESC
+        Index(
+            "ix_loans_active_loan_date_id", "loan_date", "id",
+            postgresql_where=text("return_date IS NULL"),
+            sqlite_where=text("return_date IS NULL"),
+        ),
+        # Kitabın aktif ödüncünü bulmak için kısmi indeks
+        Index(
+            "ix_loans_active_book_id", "book_id",
+            postgresql_where=text("return_date IS NULL"),
+            sqlite_where=text("return_date IS NULL"),
+        ),
+        # Yabancı anahtar indeksleri: kopya birleştirmede UPDATE/DELETE sırasındaki FK kontrolleri
+        Index("ix_loans_book_id", "book_id"),
+        Index("ix_loans_member_id", "member_id"),
+    )
+
+# Liste görünümleri için projeksiyonlar: ORM nesnesi oluşturmadan, ilişki yüklemeden tek sorgu
+MEMBER_LIST_COLUMNS = (
+    Member.id, Member.name, Member.email, Member.phone, Member.age,
+    Member.member_category, Member.password_hash, Member.salt,
+)
+BOOK_LIST_COLUMNS = (Book.id, Book.title, Book.author, Book.isbn, Book.year)
 
 def get_db() -> Session:
     db = SessionLocal()
@@ -84,11 +165,42 @@ def get_db() -> Session:
         db.close()
         raise
 
+def bind_database(url: str):
+    """Uygulama oturumlarını başka bir veritabanına bağlar (ör. benchmark için SQLite dosyası)"""
+    global engine
+    previous = engine
+    engine = instrument_engine(create_engine(url))
+    SessionLocal.configure(bind=engine)
+    previous.dispose()
+    return engine
+
 def init_db():
     # Database tablolarını oluştur
     Base.metadata.create_all(bind=engine)
     print("Database tabloları oluşturuldu!")
 
+def _keyset_page(query, order_columns: list, after: Optional[tuple], limit: int, cursor_of, serialize, descending: bool = False) -> Dict[str, Any]:
+    """Keyset (seek) sayfalaması uygular.
+
+    `order_columns` sıralama anahtarıdır ve benzersiz olması için son eleman her zaman id olmalıdır.
+    `after` bir önceki sayfanın `next_cursor` değeridir; None ise ilk sayfa döner.
+    OFFSET kullanılmadığı için her sayfa, tablo ne kadar büyük olursa olsun indeks üzerinden okunur.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    key = tuple_(*order_columns)
+    if after is not None:
+        query = query.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in order_columns])
+
+    # Bir fazla satır çekerek sonraki sayfanın olup olmadığını anla
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [serialize(row) for row in rows],
+        "next_cursor": cursor_of(rows[-1]) if has_more else None,
+    }
+
 # Oturum yönetimi fonksiyonları
 def is_logged_in() -> bool:
     """Kullanıcının oturum açıp açmadığını kontrol eder"""
@@ -129,8 +241,38 @@ async def add_csp_header(request: Request, call_next):
     response.headers["Content-Security-Policy"] = csp
     return response
 
+# İstek başına SQL sorgu sayısı (/metrics): etiket, eşleşen rota şablonudur (ör. /api/export/{kind}).
+# Akış yanıtlarında (/api/export/*) sorgular gövde gönderilirken çalışır; sayı gövde bitince kaydedilir.
+@app.middleware("http")
+async def record_request_queries(request: Request, call_next):
+    with request_queries() as counter:
+        response = await call_next(request)
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    body = getattr(response, "body_iterator", None)
+    if body is None:
+        db_metrics.observe_request(route, counter[0])
+        return response
+
+    async def observed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            db_metrics.observe_request(route, counter[0])
+
+    response.body_iterator = observed_body()
+    return response
+
+# İstek izleme: Server-Timing başlığı (total/db/render) ve logs/traces.jsonl'e OTLP/JSON span'ları.
+# En son eklenen ara katman en dışta çalışır; toplam süre diğer ara katmanları da kapsar.
+app.middleware("http")(trace_requests)
+
+def _default_password(name: str) -> str:
+    """Üyenin varsayılan şifresini isminden türetir"""
+    return name + "123"  # Basit şifre
+
 def create_member(name: str, email: str = None, phone: str = None, age: int = None, category: str = None) -> int:
-    password = name + "123"  # Basit şifre
+    password = _default_password(name)
     salt = secrets.token_hex(16)
     password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
     
@@ -148,37 +290,46 @@ def create_member(name: str, email: str = None, phone: str = None, age: int = No
         db.add(member)
         db.commit()
         db.refresh(member)
+        member_suggestions.add(member.id, member.name)
         return member.id
     finally:
         db.close()
 
+def _member_row(member) -> Dict[str, Any]:
+    return {
+        "id": member.id,
+        "name": member.name,
+        "email": member.email,
+        "phone": member.phone,
+        "age": member.age,
+        "member_category": member.member_category,
+        "password_hash": member.password_hash,
+        "salt": member.salt,
+        "password": _default_password(member.name),
+    }
+
 def get_members() -> List[Dict[str, Any]]:
     db = get_db()
     try:
-        members = db.query(Member).order_by(Member.name).all()
-        return [
-            {
-                "id": member.id,
-                "name": member.name,
-                "email": member.email,
-                "phone": member.phone,
-                "age": member.age,
-                "member_category": member.member_category,
-                "password_hash": member.password_hash,
-                "salt": member.salt
-            }
-            for member in members
-        ]
+        members = db.query(*MEMBER_LIST_COLUMNS).order_by(Member.name).all()
+        return [_member_row(member) for member in members]
     finally:
         db.close()
 
-def get_member_password(member_id: int) -> str:
+def get_members_page(limit: int = DEFAULT_PAGE_SIZE, after: Optional[list] = None) -> Dict[str, Any]:
+    """Üyeleri isim sırasına göre keyset sayfalama ile döndürür.
+    Dönüş değeri: {"items": [...], "next_cursor": [name, id] veya None}
+    """
     db = get_db()
     try:
-        member = db.query(Member).filter(Member.id == member_id).first()
-        if member:
-            return member.name + "123"
-        return "Bilinmiyor"
+        return _keyset_page(
+            db.query(*MEMBER_LIST_COLUMNS),
+            [Member.name, Member.id],
+            tuple(after) if after else None,
+            limit,
+            cursor_of=lambda member: [member.name, member.id],
+            serialize=_member_row,
+        )
     finally:
         db.close()
 
@@ -189,6 +340,7 @@ def delete_member(member_id: int) -> None:
         if member:
             db.delete(member)
             db.commit()
+            member_suggestions.remove(member_id)
     finally:
         db.close()
 
@@ -204,24 +356,43 @@ def create_book(title: str, author: str, isbn: str = None, year: int = None) ->
         db.add(book)
         db.commit()
         db.refresh(book)
+        catalog_index.add(book.id, book.title, book.author, book.isbn, book.year)
+        book_suggestions.add(book.id, book_label(book.title, book.author))
         return book.id
     finally:
         db.close()
 
+def _book_row(book) -> Dict[str, Any]:
+    return {
+        "id": book.id,
+        "title": book.title,
+        "author": book.author,
+        "isbn": book.isbn,
+        "year": book.year
+    }
+
 def get_books() -> List[Dict[str, Any]]:
     db = get_db()
     try:
-        books = db.query(Book).order_by(Book.title).all()
-        return [
-            {
-                "id": book.id,
-                "title": book.title,
-                "author": book.author,
-                "isbn": book.isbn,
-                "year": book.year
-            }
-            for book in books
-        ]
+        books = db.query(*BOOK_LIST_COLUMNS).order_by(Book.title).all()
+        return [_book_row(book) for book in books]
+    finally:
+        db.close()
+
+def get_books_page(limit: int = DEFAULT_PAGE_SIZE, after: Optional[list] = None) -> Dict[str, Any]:
+    """Kitapları başlık sırasına göre keyset sayfalama ile döndürür.
+    Dönüş değeri: {"items": [...], "next_cursor": [title, id] veya None}
+    """
+    db = get_db()
+    try:
+        return _keyset_page(
+            db.query(*BOOK_LIST_COLUMNS),
+            [Book.title, Book.id],
+            tuple(after) if after else None,
+            limit,
+            cursor_of=lambda book: [book.title, book.id],
+            serialize=_book_row,
+        )
     finally:
         db.close()
 
@@ -232,52 +403,211 @@ def delete_book(book_id: int) -> None:
         if book:
             db.delete(book)
             db.commit()
+            catalog_index.remove(book_id)
+            book_suggestions.remove(book_id)
+    finally:
+        db.close()
+
+def _like_prefix(query: str) -> str:
+    """LIKE için önek deseni (% ve _ kaçışlı)"""
+    escaped = query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+def _search_books_sql(query: str, limit: int, after: Optional[list]) -> Dict[str, Any]:
+    """İndeks hazır değilken yedek arama: başlık, yazar veya ISBN içinde geçen kitaplar, başlık sırasıyla"""
+    pattern = "%" + _like_prefix(query)
+    db = get_db()
+    try:
+        return _keyset_page(
+            db.query(*BOOK_LIST_COLUMNS).filter(or_(
+                Book.title.ilike(pattern, escape="\\"),
+                Book.author.ilike(pattern, escape="\\"),
+                Book.isbn.ilike(pattern, escape="\\"),
+            )),
+            [Book.title, Book.id],
+            tuple(after) if after else None,
+            limit,
+            cursor_of=lambda book: [book.title, book.id],
+            serialize=_book_row,
+        )
+    finally:
+        db.close()
+
+def search_books_page(query: str, limit: int = DEFAULT_PAGE_SIZE, after: Optional[Any] = None) -> Dict[str, Any]:
+    """Katalog aramasını sayfalar.
+    İndeks hazırsa sonuçlar puan sırasıyla bellekten gelir (imleç: int kaydırma, en fazla
+    MAX_SEARCH_RESULTS sonuç). Açılışta indeks arka planda dolarken veritabanında LIKE ile
+    aranır (imleç: [başlık, id]); bu durumda dönüşte "indexing": True olur.
+    Dönüş değeri: {"items": [...], "next_cursor": ..., "indexing": bool}
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    if catalog_index.ready and (after is None or isinstance(after, int)):
+        offset = after or 0
+        results = catalog_index.search(query, limit=min(offset + limit + 1, MAX_SEARCH_RESULTS))
+        has_more = len(results) > offset + limit
+        return {
+            "items": results[offset:offset + limit],
+            "next_cursor": offset + limit if has_more else None,
+            "indexing": False,
+        }
+    # Veritabanı imleciyle başlayan sayfalama, indeks bu arada hazır olsa da aynı sırayla sürer
+    page = _search_books_sql(query, limit, None if isinstance(after, int) else after)
+    page["indexing"] = not catalog_index.ready
+    return page
+
+def search_books(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Katalogda başlık, yazar ve ISBN üzerinden sıralı arama yapar (indeks hazırsa veritabanına gitmez)"""
+    return search_books_page(query, limit=limit)["items"]
+
+def build_catalog_index() -> int:
+    """Arama ve öneri indekslerini veritabanındaki kitap ve üyelerden yeniden oluşturur"""
+    db = get_db()
+    try:
+        catalog_index.clear()
+        count = load_from_session(catalog_index, db, Book)
+        print(f"🔍 Katalog arama indeksi hazır: {count} kitap")
+        
+        book_suggestions.clear()
+        book_suggestions.add_many(
+            (book.id, book_label(book.title, book.author))
+            for book in db.query(Book.id, Book.title, Book.author).filter(BOOK_AVAILABLE).yield_per(10000)
+        )
+        book_suggestions.ready = True
+        member_suggestions.clear()
+        member_suggestions.add_many(
+            (member.id, member.name) for member in db.query(Member.id, Member.name).yield_per(10000)
+        )
+        member_suggestions.ready = True
+        print(f"⌨️ Öneri indeksleri hazır: {len(book_suggestions)} kitap, {len(member_suggestions)} üye")
+        return count
+    finally:
+        db.close()
+
+def _sync_book_suggestions(db: Session, book_ids: List[int], removed_ids: Iterable[int] = ()) -> None:
+    """Kitapların öneri indeksindeki varlığını güncel müsaitlik durumuna göre ayarlar.
+    `removed_ids` (ör. birleştirmede silinen kopyalar) aynı toplu güncellemede çıkarılır.
+    """
+    available: List[Tuple[int, str]] = []
+    on_loan: List[int] = list(removed_ids)
+    for position in range(0, len(book_ids), 10000):
+        chunk = book_ids[position:position + 10000]
+        for book in db.query(Book.id, Book.title, Book.author, Book.is_on_loan).filter(Book.id.in_(chunk)):
+            if book.is_on_loan:
+                on_loan.append(book.id)
+            else:
+                available.append((book.id, book_label(book.title, book.author)))
+    book_suggestions.update_many(available, on_loan)
+
+def _suggest_books_sql(query: str, limit: int) -> List[Dict[str, Any]]:
+    """Öneri indeksi hazır değilken yedek: başlığı veya yazarı `query` ile başlayan rafta kitaplar"""
+    pattern = _like_prefix(query)
+    db = get_db()
+    try:
+        books = (
+            db.query(Book.id, Book.title, Book.author)
+            .filter(BOOK_AVAILABLE, or_(Book.title.ilike(pattern, escape="\\"), Book.author.ilike(pattern, escape="\\")))
+            .order_by(Book.title, Book.id)
+            .limit(limit)
+        )
+        return [{"id": book.id, "label": book_label(book.title, book.author)} for book in books]
     finally:
         db.close()
 
+def _suggest_members_sql(query: str, limit: int) -> List[Dict[str, Any]]:
+    """Öneri indeksi hazır değilken yedek: adı `query` ile başlayan üyeler"""
+    db = get_db()
+    try:
+        members = (
+            db.query(Member.id, Member.name)
+            .filter(Member.name.ilike(_like_prefix(query), escape="\\"))
+            .order_by(Member.name, Member.id)
+            .limit(limit)
+        )
+        return [{"id": member.id, "label": member.name} for member in members]
+    finally:
+        db.close()
+
+async def suggest_available_books(query: str = "", limit: int = TYPEAHEAD_LIMIT) -> List[Dict[str, Any]]:
+    """Rafta olan kitaplar için önek önerileri (bellek içi; indeks açılışta dolarken veritabanından)"""
+    limit = max(1, min(limit, TYPEAHEAD_LIMIT))
+    if not book_suggestions.ready:
+        return await run_db(_suggest_books_sql, query, limit)
+    return book_suggestions.search(query, limit=limit)
+
+async def suggest_members(query: str = "", limit: int = TYPEAHEAD_LIMIT) -> List[Dict[str, Any]]:
+    """Üyeler için önek önerileri (bellek içi; indeks açılışta dolarken veritabanından)"""
+    limit = max(1, min(limit, TYPEAHEAD_LIMIT))
+    if not member_suggestions.ready:
+        return await run_db(_suggest_members_sql, query, limit)
+    return member_suggestions.search(query, limit=limit)
+
+def refresh_book_availability(db: Session, book_ids: List[int]) -> None:
+    """Verilen kitapların is_on_loan bayrağını aktif ödünç kayıtlarından yeniden hesaplar.
+    Ödünçleri toplu olarak taşıyan işlemler (ör. kopya birleştirme) commit öncesi çağırmalıdır.
+    """
+    if not book_ids:
+        return
+    db.flush()
+    active_loan = exists().where(Loan.book_id == Book.id, Loan.return_date.is_(None))
+    db.query(Book).filter(Book.id.in_(book_ids)).update({Book.is_on_loan: active_loan}, synchronize_session=False)
+
 def get_available_books() -> List[Dict[str, Any]]:
     db = get_db()
     try:
-        # Ödünç verilmemiş kitapları bul
-        subquery = db.query(Loan.book_id).filter(Loan.return_date.is_(None)).subquery()
-        available_books = db.query(Book).filter(~Book.id.in_(subquery)).order_by(Book.title).all()
+        # Ödünç verilmemiş kitapları bul (kısmi indeks üzerinden, ödünç tablosuna dokunmadan)
+        available_books = db.query(*BOOK_LIST_COLUMNS).filter(BOOK_AVAILABLE).order_by(Book.title).all()
         
-        return [
-            {
-                "id": book.id,
-                "title": book.title,
-                "author": book.author,
-                "isbn": book.isbn,
-                "year": book.year
-            }
-            for book in available_books
-        ]
+        return [_book_row(book) for book in available_books]
     finally:
         db.close()
 
 def get_active_loans() -> List[Dict[str, Any]]:
     db = get_db()
     try:
-        active_loans = db.query(Loan, Book.title.label('book_title'), Member.name.label('member_name'))\
-            .join(Book, Loan.book_id == Book.id)\
-            .join(Member, Loan.member_id == Member.id)\
-            .filter(Loan.return_date.is_(None))\
+        active_loans = _active_loans_query(db)\
             .order_by(Loan.loan_date.desc())\
             .all()
         
-        return [
-            {
-                "id": loan.Loan.id,
-                "book_id": loan.Loan.book_id,
-                "member_id": loan.Loan.member_id,
-                "loan_date": loan.Loan.loan_date.isoformat() if loan.Loan.loan_date else None,
-                "due_date": loan.Loan.due_date.isoformat() if loan.Loan.due_date else None,
-                "return_date": loan.Loan.return_date.isoformat() if loan.Loan.return_date else None,
-                "book_title": loan.book_title,
-                "member_name": loan.member_name
-            }
-            for loan in active_loans
-        ]
+        return [_loan_row(loan) for loan in active_loans]
+    finally:
+        db.close()
+
+def _active_loans_query(db: Session):
+    return db.query(Loan, Book.title.label('book_title'), Member.name.label('member_name'))\
+        .join(Book, Loan.book_id == Book.id)\
+        .join(Member, Loan.member_id == Member.id)\
+        .filter(Loan.return_date.is_(None))
+
+def _loan_row(loan) -> Dict[str, Any]:
+    return {
+        "id": loan.Loan.id,
+        "book_id": loan.Loan.book_id,
+        "member_id": loan.Loan.member_id,
+        "loan_date": loan.Loan.loan_date.isoformat() if loan.Loan.loan_date else None,
+        "due_date": loan.Loan.due_date.isoformat() if loan.Loan.due_date else None,
+        "return_date": loan.Loan.return_date.isoformat() if loan.Loan.return_date else None,
+        "book_title": loan.book_title,
+        "member_name": loan.member_name
+    }
+
+def get_active_loans_page(limit: int = DEFAULT_PAGE_SIZE, after: Optional[list] = None) -> Dict[str, Any]:
+    """Aktif ödünçleri en yeniden eskiye keyset sayfalama ile döndürür.
+    Dönüş değeri: {"items": [...], "next_cursor": [loan_date (ISO), id] veya None}
+    """
+    db = get_db()
+    try:
+        cursor = None
+        if after:
+            cursor = (date.fromisoformat(after[0]), after[1])
+        return _keyset_page(
+            _active_loans_query(db),
+            [Loan.loan_date, Loan.id],
+            cursor,
+            limit,
+            cursor_of=lambda loan: [loan.Loan.loan_date.isoformat(), loan.Loan.id],
+            serialize=_loan_row,
+            descending=True,
+        )
     finally:
         db.close()
 
@@ -296,6 +626,13 @@ def create_loan(book_id: int, member_id: int, loan_date: str, due_date: str) ->
         if loan_date_obj > due_date_obj:
             raise ValueError("Ödünç tarihi, son tarihten sonra olamaz")
         
+        # Kitabı koşullu UPDATE ile ödünçte işaretle: aynı anda gelen iki istekten yalnızca biri kazanır
+        claimed = db.query(Book)\
+            .filter(Book.id == book_id, BOOK_AVAILABLE)\
+            .update({Book.is_on_loan: True}, synchronize_session=False)
+        if not claimed:
+            raise ValueError("Kitap bulunamadı veya zaten ödünçte")
+        
         loan = Loan(
             book_id=book_id,
             member_id=member_id,
@@ -305,6 +642,7 @@ def create_loan(book_id: int, member_id: int, loan_date: str, due_date: str) ->
         db.add(loan)
         db.commit()
         db.refresh(loan)
+        book_suggestions.remove(book_id)
         return loan.id
     except ValueError as e:
         raise e
@@ -315,12 +653,111 @@ def create_loan(book_id: int, member_id: int, loan_date: str, due_date: str) ->
         db.close()
 
 def return_book(loan_id: int) -> None:
+    """Ödüncü iade eder; ödünç yoksa LookupError, zaten iade edilmişse ValueError fırlatır"""
     db = get_db()
     try:
-        loan = db.query(Loan).filter(Loan.id == loan_id).first()
-        if loan:
-            loan.return_date = date.today()
-            db.commit()
+        book_id = db.query(Loan.book_id).filter(Loan.id == loan_id).scalar()
+        if book_id is None:
+            raise LookupError("Ödünç bulunamadı")
+        # Koşullu UPDATE: aynı ödünç için eşzamanlı iki iadeden yalnızca biri kazanır
+        returned = (
+            db.query(Loan)
+            .filter(Loan.id == loan_id, Loan.return_date.is_(None))
+            .update({Loan.return_date: date.today()}, synchronize_session=False)
+        )
+        if not returned:
+            raise ValueError("Ödünç zaten iade edilmiş")
+        refresh_book_availability(db, [book_id])
+        db.commit()
+        _sync_book_suggestions(db, [book_id])
+    finally:
+        db.close()
+
+def _refresh_merged_availability(db: Session, merge_map) -> None:
+    """Kopya birleştirmede ödünçleri taşınan kitapların is_on_loan bayrağını tek UPDATE ile yeniler"""
+    active_loan = exists().where(Loan.book_id == Book.id, Loan.return_date.is_(None))
+    db.execute(
+        update(Book)
+        .where(Book.id.in_(select(merge_map.c.survivor_id)))
+        .values(is_on_loan=active_loan)
+        .execution_options(synchronize_session=False)
+    )
+
+def merge_duplicate_members(dry_run: bool = False) -> Dict[str, Any]:
+    """Aynı isimdeki üyeleri toplu SQL ile birleştirir (en düşük id'li kayıt kalır).
+    Ödünç kayıtları tek UPDATE ile tutulan üyeye devredilir; dry_run=True ise yalnızca rapor döner.
+    """
+    db = get_db()
+    try:
+        report = merge_duplicates(db, Member, Member.name, [Loan.member_id], dry_run=dry_run)
+    finally:
+        db.close()
+    print_merge_report(report, "üyeler")
+    if not dry_run:
+        member_suggestions.update_many(remove_ids=report["duplicate_ids"])
+    return report
+
+def merge_duplicate_books(dry_run: bool = False) -> Dict[str, Any]:
+    """Aynı başlıktaki kitapları toplu SQL ile birleştirir (en düşük id'li kayıt kalır).
+    Ödünç kayıtları ve müsaitlik bayrağı aynı transaction'da güncellenir; dry_run=True ise yalnızca rapor döner.
+    """
+    db = get_db()
+    try:
+        report = merge_duplicates(
+            db, Book, Book.title, [Loan.book_id],
+            dry_run=dry_run, before_commit=_refresh_merged_availability,
+        )
+        if not dry_run:
+            # İndeksler kitap başına değil, tek toplu geçişle güncellenir
+            catalog_index.remove_many(report["duplicate_ids"])
+            _sync_book_suggestions(db, report["survivor_ids"], removed_ids=report["duplicate_ids"])
+    finally:
+        db.close()
+    print_merge_report(report, "kitaplar")
+    return report
+
+def _near_duplicate_report(db: Session, finder: NearDuplicateFinder, columns, min_score: float, limit: int) -> List[Dict[str, Any]]:
+    """Adayları puana göre sıralar ve yalnızca listelenen kayıtların bilgilerini çeker"""
+    candidates = finder.candidates(min_score=min_score, limit=limit)
+    ids = {candidate["left_id"] for candidate in candidates} | {candidate["right_id"] for candidate in candidates}
+    id_column = columns[0]
+    records = {}
+    ordered_ids = sorted(ids)
+    for position in range(0, len(ordered_ids), 1000):
+        for row in db.query(*columns).filter(id_column.in_(ordered_ids[position:position + 1000])):
+            records[row.id] = row._asdict()
+    for candidate in candidates:
+        candidate["left"] = records.get(candidate["left_id"])
+        candidate["right"] = records.get(candidate["right_id"])
+    return candidates
+
+def find_near_duplicate_books(min_score: float = 0.6, limit: int = 100) -> List[Dict[str, Any]]:
+    """Başlık + yazar benzerliği (MinHash/LSH) ve aynı ISBN ile olası kopya kitap çiftlerini bulur
+    Sonuç inceleme içindir; birleştirme merge_duplicate_books() veya elle yapılır.
+    """
+    finder = NearDuplicateFinder(key_names=("isbn",))
+    columns = (Book.id, Book.title, Book.author, Book.isbn)
+    db = get_db()
+    try:
+        finder.add_many(
+            (row.id, (row.title, row.author), (normalize_isbn(row.isbn),))
+            for row in db.query(*columns).yield_per(10000)
+        )
+        return _near_duplicate_report(db, finder, columns, min_score, limit)
+    finally:
+        db.close()
+
+def find_near_duplicate_members(min_score: float = 0.6, limit: int = 100) -> List[Dict[str, Any]]:
+    """İsim benzerliği (MinHash/LSH) ve aynı e-posta/telefon ile olası kopya üye çiftlerini bulur"""
+    finder = NearDuplicateFinder(key_names=("email", "phone"))
+    columns = (Member.id, Member.name, Member.email, Member.phone)
+    db = get_db()
+    try:
+        finder.add_many(
+            (row.id, (row.name,), (normalize_email(row.email), normalize_phone(row.phone)))
+            for row in db.query(*columns).yield_per(10000)
+        )
+        return _near_duplicate_report(db, finder, columns, min_score, limit)
     finally:
         db.close()
 
@@ -329,48 +766,82 @@ def delete_duplicate_members() -> int:
     Silmeden önce bu üyelerin ödünç kayıtlarını tutulan üyeye devreder.
     Dönüş değeri: silinen üye sayısı
     """
-    db = get_db()
-    deleted_count = 0
-    try:
-        duplicates = db.query(Member.name).group_by(Member.name).having(func.count(Member.id) > 1).all()
-        for (name,) in duplicates:
-            same_members = db.query(Member).filter(Member.name == name).order_by(Member.id.asc()).all()
-            if not same_members:
-                continue
-            keep = same_members[0]
-            for redundant in same_members[1:]:
-                # Ödünç kayıtlarını devret
-                db.query(Loan).filter(Loan.member_id == redundant.id).update({Loan.member_id: keep.id}, synchronize_session=False)
-                db.delete(redundant)
-                deleted_count += 1
-            db.commit()
-        return deleted_count
-    finally:
-        db.close()
+    return merge_duplicate_members()["duplicates"]
 
 def delete_duplicate_books() -> int:
     """Aynı başlığa sahip birden fazla kitap varsa, en düşük id'li kaydı tutar, diğerlerini siler.
     Silmeden önce bu kitapların ödünç kayıtlarını tutulan kitaba devreder.
     Dönüş değeri: silinen kitap sayısı
     """
+    return merge_duplicate_books()["duplicates"]
+
+def import_books_batch(rows: List[Dict[str, Any]]) -> int:
+    """Doğrulanmış kitap satırlarını tek transaction'da çok satırlı INSERT ... RETURNING ile ekler
+    create_book()'tan farklı olarak satır başına commit/refresh yapılmaz; indeksler toplu güncellenir.
+    """
     db = get_db()
-    deleted_count = 0
-    try:
-        duplicates = db.query(Book.title).group_by(Book.title).having(func.count(Book.id) > 1).all()
-        for (title,) in duplicates:
-            same_books = db.query(Book).filter(Book.title == title).order_by(Book.id.asc()).all()
-            if not same_books:
-                continue
-            keep = same_books[0]
-            for redundant in same_books[1:]:
-                # Ödünç kayıtlarını devret
-                db.query(Loan).filter(Loan.book_id == redundant.id).update({Loan.book_id: keep.id}, synchronize_session=False)
-                db.delete(redundant)
-                deleted_count += 1
-            db.commit()
-        return deleted_count
+    try:
+        inserted = db.execute(
+            insert(Book).returning(Book.id, Book.title, Book.author, Book.isbn, Book.year), rows
+        ).all()
+        db.commit()
     finally:
         db.close()
+    catalog_index.add_many(book._asdict() for book in inserted)
+    book_suggestions.add_many((book.id, book_label(book.title, book.author)) for book in inserted)
+    return len(inserted)
+
+def import_members_batch(rows: List[Dict[str, Any]]) -> int:
+    """Doğrulanmış üye satırlarını varsayılan şifreleriyle tek transaction'da toplu ekler"""
+    for row in rows:
+        row["salt"] = secrets.token_hex(16)
+        row["password_hash"] = hashlib.sha256((_default_password(row["name"]) + row["salt"]).encode()).hexdigest()
+    db = get_db()
+    try:
+        inserted = db.execute(insert(Member).returning(Member.id, Member.name), rows).all()
+        db.commit()
+    finally:
+        db.close()
+    member_suggestions.add_many((member.id, member.name) for member in inserted)
+    return len(inserted)
+
+# İçe aktarma türleri: (doğrulayıcı, parti yazıcı)
+IMPORTERS = {
+    "books": (validate_book, import_books_batch),
+    "members": (validate_member, import_members_batch),
+}
+# Yüklenen dosyanın bellekte tutulacağı en büyük boyut; aşılırsa geçici dosyaya taşar
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Dışa aktarma sorguları: id sırasıyla, şifre alanları hariç
+EXPORT_QUERIES = {
+    "books": lambda active: select(Book.id, Book.title, Book.author, Book.isbn, Book.year, Book.is_on_loan).order_by(Book.id),
+    "members": lambda active: select(
+        Member.id, Member.name, Member.email, Member.phone, Member.age, Member.member_category,
+    ).order_by(Member.id),
+    "loans": lambda active: select(
+        Loan.id, Loan.book_id, Loan.member_id, Loan.loan_date, Loan.due_date, Loan.return_date,
+        Book.title.label("book_title"), Member.name.label("member_name"),
+    ).join(Book, Loan.book_id == Book.id).join(Member, Loan.member_id == Member.id)
+     .where(Loan.return_date.is_(None) if active else true()).order_by(Loan.id),
+}
+
+def export_rows(kind: str, active: bool = False):
+    """(sütun adları, satır üreteci): satırlar sunucu taraflı imleçle parça parça okunur
+    Üreteç tükenince ya da kapatılınca (istemci bağlantıyı keserse) oturum kapanır.
+    """
+    statement = EXPORT_QUERIES[kind](active).execution_options(yield_per=DEFAULT_EXPORT_BATCH)
+    columns = [column.name for column in statement.selected_columns]
+
+    def rows():
+        db = get_db()
+        try:
+            for partition in db.execute(statement).partitions():
+                yield from partition
+        finally:
+            db.close()
+
+    return columns, rows()
 
 def add_sample_data():
     # 15 üye ekle
@@ -443,7 +914,11 @@ def nav_header():
                 ui.button("📖 Kitaplar", on_click=lambda: ui.navigate.to("/books")).classes("text-white")
                 ui.button("👥 Üyeler", on_click=lambda: ui.navigate.to("/members")).classes("text-white")
                 ui.button("📚 Ödünç", on_click=lambda: ui.navigate.to("/loans")).classes("text-white")
-                ui.button("➕ Örnek Veri", on_click=add_sample_data).classes("text-white")
+                async def do_add_sample_data():
+                    await run_db(add_sample_data)
+                    ui.notify("Örnek veriler eklendi", type="positive")
+                
+                ui.button("➕ Örnek Veri", on_click=do_add_sample_data).classes("text-white")
                 
                 def do_logout():
                     logout_user()
@@ -452,12 +927,76 @@ def nav_header():
                 
                 ui.button("🚪 Çıkış", on_click=do_logout).classes("text-white bg-red-600 hover:bg-red-700")
 
+class KeysetTable:
+    """Sunucu tarafında keyset sayfalanan tablo.
+    Yalnızca görünen sayfanın satırları veritabanından çekilir ve istemciye gönderilir.
+    `fetch_page(limit=..., after=...)` fonksiyonu {"items", "next_cursor"} döndürmelidir.
+    """
+    
+    def __init__(self, columns: List[Dict[str, Any]], fetch_page, row_transform=None, action=None, page_size: int = DEFAULT_PAGE_SIZE):
+        self.fetch_page = fetch_page
+        self.row_transform = row_transform
+        self.page_size = page_size
+        self._cursors: List[Optional[list]] = [None]  # Her sayfanın başlangıç imleci
+        self._next_cursor = None
+        
+        if action:
+            columns = columns + [{"name": "actions", "label": "", "field": "id", "align": "right"}]
+        self.table = ui.table(columns=columns, rows=[], row_key="id").classes("w-full")
+        
+        # Satır butonu: (etiket, renk, handler(row))
+        if action:
+            label, color, handler = action
+            self.table.add_slot("body-cell-actions", f"""
+                <q-td :props="props">
+                    <q-btn size="sm" color="{color}" label="{label}" @click="() => $parent.$emit('row-action', props.row)" />
+                </q-td>
+            """)
+            self.table.on("row-action", lambda e: handler(e.args))
+        
+        with ui.row().classes("items-center gap-4 mt-2"):
+            self.prev_button = ui.button("◀ Önceki", on_click=self.previous_page)
+            self.page_label = ui.label()
+            self.next_button = ui.button("Sonraki ▶", on_click=self.next_page)
+    
+    async def refresh(self) -> None:
+        """Geçerli sayfayı veritabanından yeniden yükler (sorgu olay döngüsünü bloklamaz)"""
+        page = await run_db(self.fetch_page, limit=self.page_size, after=self._cursors[-1])
+        if not page["items"] and len(self._cursors) > 1:
+            # Sayfadaki tüm kayıtlar silindiyse bir önceki sayfaya dön
+            self._cursors.pop()
+            await self.refresh()
+            return
+        rows = page["items"]
+        self.table.rows = [self.row_transform(row) for row in rows] if self.row_transform else rows
+        self._next_cursor = page["next_cursor"]
+        self.page_label.text = f"Sayfa {len(self._cursors)}"
+        self.prev_button.set_enabled(len(self._cursors) > 1)
+        self.next_button.set_enabled(self._next_cursor is not None)
+    
+    async def next_page(self) -> None:
+        if self._next_cursor is None:
+            return
+        self._cursors.append(self._next_cursor)
+        await self.refresh()
+    
+    async def previous_page(self) -> None:
+        if len(self._cursors) > 1:
+            self._cursors.pop()
+            await self.refresh()
+    
+    async def reset(self) -> None:
+        """İlk sayfaya döner (ör. arama terimi değiştiğinde)"""
+        self._cursors = [None]
+        await self.refresh()
+
 def app_footer():
     with ui.footer().classes("bg-gray-100 text-center py-4"):
         ui.label("© 2024 YB Kütüphane Sistemi").classes("text-gray-600")
 
 # Login sayfası
 @ui.page("/login")
+@traced_page
 def login_page() -> None:
     with ui.column().classes("w-full h-screen flex justify-center items-center bg-gradient-to-br from-blue-50 to-indigo-100"):
         with ui.card().classes("w-[400px] p-8 shadow-lg"):
@@ -496,6 +1035,7 @@ def login_page() -> None:
 
 # Ana sayfa
 @ui.page("/")
+@traced_page
 def home_page() -> None:
     require_login()  # Oturum kontrolü
     nav_header()
@@ -523,92 +1063,115 @@ def home_page() -> None:
 
 # Kitaplar sayfası
 @ui.page("/books")
-def books_page() -> None:
+@traced_page
+@query_budget_page(1)
+async def books_page() -> None:
     require_login()  # Oturum kontrolü
     nav_header()
     
     with ui.column().classes("w-full max-w-[1200px] mx-auto p-6"):
         with ui.row().classes("justify-between items-center mb-6"):
             ui.label("📖 Kitap Yönetimi").classes("text-h4 font-bold")
-            ui.button("➕ Yeni Kitap", on_click=lambda: create_book_dialog(on_saved=refresh_books), color="primary")
+            with ui.row().classes("gap-2"):
+                export_menu("books")
+                ui.button("📥 İçe Aktar", on_click=lambda: import_dialog("books", on_saved=refresh_books))
+                ui.button("➕ Yeni Kitap", on_click=lambda: create_book_dialog(on_saved=refresh_books), color="primary")
+        
+        search_input = ui.input("🔍 Kitap Ara", placeholder="Başlık, yazar veya ISBN")\
+            .props("clearable debounce=300").classes("w-full mb-4")
         
-        books_grid = ui.grid(columns=1, rows=0).classes("w-full")
+        indexing_label = ui.label("⏳ Arama indeksi hazırlanıyor; sonuçlar şimdilik başlık sırasıyla veritabanından geliyor")\
+            .classes("text-caption text-orange-600 mb-2")
+        indexing_label.set_visibility(False)
         
-        def refresh_books():
-            books_grid.clear()
-            books = get_books()
-            for book in books:
-                with books_grid:
-                    with ui.card().classes("w-full p-4"):
-                        with ui.row().classes("justify-between items-start"):
-                            with ui.column().classes("flex-1"):
-                                ui.label(book["title"]).classes("text-h6 font-bold")
-                                ui.label(f"Yazar: {book['author']}").classes("text-caption")
-                                if book["isbn"]:
-                                    ui.label(f"ISBN: {book['isbn']}").classes("text-caption")
-                                if book["year"]:
-                                    ui.label(f"Yıl: {book['year']}").classes("text-caption")
-                            
-                            with ui.row().classes("gap-2"):
-                                ui.button("🗑️", on_click=lambda b=book: delete_book_and_refresh(b["id"]), color="negative")
+        def fetch_books(limit: int, after: Optional[Any] = None) -> Dict[str, Any]:
+            # Arama varken sonuçlar indeksten puan sırasıyla gelir, yoksa katalog sayfalanır
+            if search_input.value:
+                return search_books_page(search_input.value, limit=limit, after=after)
+            return get_books_page(limit=limit, after=after)
         
-        def delete_book_and_refresh(book_id: int):
-            delete_book(book_id)
-            refresh_books()
+        async def delete_book_and_refresh(book_id: int):
+            await run_db(delete_book, book_id)
+            await refresh_books()
             ui.notify("Kitap silindi", type="positive")
         
-        refresh_books()
+        books_table = KeysetTable(
+            columns=[
+                {"name": "title", "label": "Başlık", "field": "title", "align": "left"},
+                {"name": "author", "label": "Yazar", "field": "author", "align": "left"},
+                {"name": "isbn", "label": "ISBN", "field": "isbn", "align": "left"},
+                {"name": "year", "label": "Yıl", "field": "year"},
+            ],
+            fetch_page=fetch_books,
+            action=("🗑️", "negative", lambda book: delete_book_and_refresh(book["id"])),
+        )
+        async def search_changed() -> None:
+            await books_table.reset()
+            indexing_label.set_visibility(bool(search_input.value) and not catalog_index.ready)
+        
+        search_input.on_value_change(search_changed)
+        
+        async def refresh_books():
+            await books_table.refresh()
+        
+        await refresh_books()
     
     app_footer()
 
 # Üyeler sayfası
 @ui.page("/members")
-def members_page() -> None:
+@traced_page
+@query_budget_page(1)
+async def members_page() -> None:
     require_login()  # Oturum kontrolü
     nav_header()
     
     with ui.column().classes("w-full max-w-[1200px] mx-auto p-6"):
         with ui.row().classes("justify-between items-center mb-6"):
             ui.label("👥 Üye Yönetimi").classes("text-h4 font-bold")
-            ui.button("➕ Yeni Üye", on_click=lambda: create_member_dialog(on_saved=refresh_members), color="primary")
+            with ui.row().classes("gap-2"):
+                export_menu("members")
+                ui.button("📥 İçe Aktar", on_click=lambda: import_dialog("members", on_saved=refresh_members))
+                ui.button("➕ Yeni Üye", on_click=lambda: create_member_dialog(on_saved=refresh_members), color="primary")
+        
+        async def delete_member_and_refresh(member_id: int):
+            await run_db(delete_member, member_id)
+            await refresh_members()
+            ui.notify("Üye silindi", type="positive")
         
-        members_grid = ui.grid(columns=1, rows=0).classes("w-full")
+        def member_table_row(member: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                **member,
+                "password_hash": f"{member['password_hash'][:20]}...",
+            }
         
-        def refresh_members():
-            members_grid.clear()
-            members = get_members()
-            for member in members:
-                with members_grid:
-                    with ui.card().classes("w-full p-4"):
-                        with ui.row().classes("justify-between items-start"):
-                            with ui.column().classes("flex-1"):
-                                ui.label(member["name"]).classes("text-h6 font-bold")
-                                if member["email"]:
-                                    ui.label(f"📧 E-posta: {member['email']}").classes("text-caption")
-                                if member["phone"]:
-                                    ui.label(f"📞 Telefon: {member['phone']}").classes("text-caption")
-                                if member["age"]:
-                                    ui.label(f"🎂 Yaş: {member['age']}").classes("text-caption text-blue-600")
-                                if member["member_category"]:
-                                    ui.label(f"🏷️ Kategori: {member['member_category']}").classes("text-caption text-purple-600")
-                                ui.label(f"🔑 Şifre: {get_member_password(member['id'])}").classes("text-caption text-green-600")
-                                ui.label(f"🔐 Hash: {member['password_hash'][:20]}...").classes("text-caption text-gray-500")
-                            
-                            with ui.row().classes("gap-2"):
-                                ui.button("🗑️", on_click=lambda m=member: delete_member_and_refresh(m["id"]), color="negative")
+        members_table = KeysetTable(
+            columns=[
+                {"name": "name", "label": "Ad Soyad", "field": "name", "align": "left"},
+                {"name": "email", "label": "📧 E-posta", "field": "email", "align": "left"},
+                {"name": "phone", "label": "📞 Telefon", "field": "phone", "align": "left"},
+                {"name": "age", "label": "🎂 Yaş", "field": "age"},
+                {"name": "member_category", "label": "🏷️ Kategori", "field": "member_category", "align": "left"},
+                {"name": "password", "label": "🔑 Şifre", "field": "password", "align": "left"},
+                {"name": "password_hash", "label": "🔐 Hash", "field": "password_hash", "align": "left"},
+            ],
+            fetch_page=get_members_page,
+            row_transform=member_table_row,
+            action=("🗑️", "negative", lambda member: delete_member_and_refresh(member["id"])),
+        )
         
-        def delete_member_and_refresh(member_id: int):
-            delete_member(member_id)
-            refresh_members()
-            ui.notify("Üye silindi", type="positive")
+        async def refresh_members():
+            await members_table.refresh()
         
-        refresh_members()
+        await refresh_members()
     
     app_footer()
 
 # Ödünç sayfası
 @ui.page("/loans")
-def loans_page() -> None:
+@traced_page
+@query_budget_page(1)
+async def loans_page() -> None:
     require_login()  # Oturum kontrolü
     nav_header()
     
@@ -623,19 +1186,32 @@ def loans_page() -> None:
                 # Kitap seçimi
                 with ui.column().classes("flex-1"):
                     ui.label("📖 Kitap").classes("text-caption mb-1")
+                    # İlk açılışta tüm katalog yerine yalnızca ilk öneriler gönderilir
                     book_select = ui.select(
-                        [(book["id"], f"{book['title']} - {book['author']}") for book in get_available_books()],
-                        label="Kitap Seçin"
+                        {item["id"]: item["label"] for item in await suggest_available_books()},
+                        label="Kitap Seçin (yazarak arayın)",
+                        with_input=True
                     ).classes("w-full")
                 
                 # Üye seçimi
                 with ui.column().classes("flex-1"):
                     ui.label("👤 Üye").classes("text-caption mb-1")
                     member_select = ui.select(
-                        [(member["id"], member["name"]) for member in get_members()],
-                        label="Üye Seçin"
+                        {item["id"]: item["label"] for item in await suggest_members()},
+                        label="Üye Seçin (yazarak arayın)",
+                        with_input=True
                     ).classes("w-full")
             
+            async def load_options(select, suggest, query: str = "") -> None:
+                # Her tuş vuruşunda yalnızca en fazla TYPEAHEAD_LIMIT öneri gönderilir
+                options = {item["id"]: item["label"] for item in await suggest(query or "")}
+                if select.value is not None and select.value not in options:
+                    options[select.value] = select.options.get(select.value, str(select.value))
+                select.set_options(options)
+            
+            book_select.on("input-value", lambda e: load_options(book_select, suggest_available_books, e.args))
+            member_select.on("input-value", lambda e: load_options(member_select, suggest_members, e.args))
+            
             with ui.row().classes("gap-4 w-full"):
                 # Ödünç tarihi
                 with ui.column().classes("flex-1"):
@@ -649,7 +1225,7 @@ def loans_page() -> None:
                     due_date = ui.date().classes("w-full")
                     due_date.value = (date.today() + timedelta(days=30)).isoformat()
             
-            def borrow_book():
+            async def borrow_book():
                 if not book_select.value or not member_select.value:
                     ui.notify("Lütfen kitap ve üye seçin", type="warning")
                     return
@@ -663,13 +1239,14 @@ def loans_page() -> None:
                     book_id = book_select.value[0] if isinstance(book_select.value, tuple) else book_select.value
                     member_id = member_select.value[0] if isinstance(member_select.value, tuple) else member_select.value
                     
-                    create_loan(book_id, member_id, loan_date.value, due_date.value)
+                    await run_db(create_loan, book_id, member_id, loan_date.value, due_date.value)
                     ui.notify("Kitap ödünç verildi!", type="positive")
                     book_select.value = None
                     member_select.value = None
-                    refresh_loans()
+                    await load_options(book_select, suggest_available_books)
+                    await refresh_loans()
                 except ValueError as e:
-                    ui.notify(f"Tarih Hatası: {str(e)}", type="negative")
+                    ui.notify(f"Ödünç Hatası: {str(e)}", type="negative")
                 except Exception as e:
                     ui.notify(f"Genel Hata: {str(e)}", type="negative")
             
@@ -677,32 +1254,36 @@ def loans_page() -> None:
         
         # Aktif ödünçler
         with ui.card().classes("w-full p-6"):
-            ui.label("📋 Aktif Ödünçler").classes("text-h6 font-bold mb-4")
+            with ui.row().classes("justify-between items-center w-full mb-4"):
+                ui.label("📋 Aktif Ödünçler").classes("text-h6 font-bold")
+                export_menu("loans", active=True)
             
-            loans_grid = ui.grid(columns=1, rows=0).classes("w-full")
+            async def return_book_and_refresh(loan_id: int):
+                try:
+                    await run_db(return_book, loan_id)
+                except (LookupError, ValueError) as e:
+                    ui.notify(f"Hata: {str(e)}", type="negative")
+                    await refresh_loans()
+                    return
+                await load_options(book_select, suggest_available_books)
+                await refresh_loans()
+                ui.notify("Kitap iade edildi!", type="positive")
             
-            def refresh_loans():
-                loans_grid.clear()
-                active_loans = get_active_loans()
-                for loan in active_loans:
-                    with loans_grid:
-                        with ui.card().classes("w-full p-4"):
-                            with ui.row().classes("justify-between items-start"):
-                                with ui.column().classes("flex-1"):
-                                    ui.label(f"📖 {loan['book_title']}").classes("text-h6 font-bold")
-                                    ui.label(f"👤 {loan['member_name']}").classes("text-caption")
-                                    ui.label(f"📅 Ödünç: {loan['loan_date']}").classes("text-caption")
-                                    ui.label(f"⏰ Son: {loan['due_date']}").classes("text-caption")
-                                
-                                with ui.row().classes("gap-2"):
-                                    ui.button("📦 İade Et", on_click=lambda l=loan: return_book_and_refresh(l["id"]), color="positive")
+            loans_table = KeysetTable(
+                columns=[
+                    {"name": "book_title", "label": "📖 Kitap", "field": "book_title", "align": "left"},
+                    {"name": "member_name", "label": "👤 Üye", "field": "member_name", "align": "left"},
+                    {"name": "loan_date", "label": "📅 Ödünç", "field": "loan_date"},
+                    {"name": "due_date", "label": "⏰ Son", "field": "due_date"},
+                ],
+                fetch_page=get_active_loans_page,
+                action=("📦 İade Et", "positive", lambda loan: return_book_and_refresh(loan["id"])),
+            )
             
-            def return_book_and_refresh(loan_id: int):
-                return_book(loan_id)
-                refresh_loans()
-                ui.notify("Kitap iade edildi!", type="positive")
+            async def refresh_loans():
+                await loans_table.refresh()
             
-            refresh_loans()
+            await refresh_loans()
     
     app_footer()
 
@@ -719,17 +1300,16 @@ def create_book_dialog(on_saved: Optional[Any] = None) -> None:
         with ui.row().classes("justify-end w-full gap-2"):
             ui.button("İptal", on_click=dialog.close)
 
-            def save() -> None:
+            async def save() -> None:
                 try:
                     if not title_input.value or not author_input.value:
                         ui.notify("Başlık ve Yazar zorunludur", type="warning")
                         return
                     year = int(year_input.value) if year_input.value not in (None, "") else None
-                    create_book(title_input.value, author_input.value, isbn_input.value or None, year)
+                    await run_db(create_book, title_input.value, author_input.value, isbn_input.value or None, year)
                     ui.notify("Kitap eklendi", type="positive")
                     dialog.close()
-                    if on_saved:
-                        on_saved()
+                    await call_handler(on_saved)
                 except Exception as exc:
                     ui.notify(str(exc), type="negative")
 
@@ -754,7 +1334,7 @@ def create_member_dialog(on_saved: Optional[Any] = None) -> None:
         with ui.row().classes("justify-end w-full gap-2"):
             ui.button("İptal", on_click=dialog.close)
 
-            def save() -> None:
+            async def save() -> None:
                 try:
                     if not name_input.value:
                         ui.notify("Ad Soyad zorunludur", type="warning")
@@ -769,7 +1349,8 @@ def create_member_dialog(on_saved: Optional[Any] = None) -> None:
                             ui.notify("Yaş sayısal olmalıdır", type="warning")
                             return
                     
-                    create_member(
+                    await run_db(
+                        create_member,
                         name_input.value, 
                         email_input.value or None, 
                         phone_input.value or None,
@@ -778,8 +1359,7 @@ def create_member_dialog(on_saved: Optional[Any] = None) -> None:
                     )
                     ui.notify("Üye eklendi", type="positive")
                     dialog.close()
-                    if on_saved:
-                        on_saved()
+                    await call_handler(on_saved)
                 except Exception as exc:
                     ui.notify(str(exc), type="negative")
 
@@ -787,6 +1367,254 @@ def create_member_dialog(on_saved: Optional[Any] = None) -> None:
 
     dialog.open()
 
+def import_dialog(kind: str, on_saved: Optional[Any] = None) -> None:
+    """CSV/NDJSON dosyası yükleyip toplu içe aktarmayı başlatır ve ilerlemesini gösterir"""
+    validate, write_batch = IMPORTERS[kind]
+    columns = "title, author, isbn, year" if kind == "books" else "name, email, phone, age, member_category"
+    dialog = ui.dialog()
+    with dialog, ui.card().classes("w-[600px] max-w-full"):
+        ui.label("📥 Kitap İçe Aktar" if kind == "books" else "📥 Üye İçe Aktar").classes("text-h6")
+        ui.label(f"CSV (başlık satırı ile) veya NDJSON. Alanlar: {columns}").classes("text-caption text-grey-7")
+        progress = ui.linear_progress(value=0, show_value=False).classes("w-full")
+        progress.visible = False
+        status = ui.label("")
+        errors_table = ui.table(
+            columns=[
+                {"name": "line", "label": "Satır", "field": "line", "align": "left"},
+                {"name": "error", "label": "Hata", "field": "error", "align": "left"},
+            ],
+            rows=[],
+            pagination=10,
+        ).classes("w-full")
+        errors_table.visible = False
+        state: Dict[str, Any] = {"job": None}
+
+        async def poll() -> None:
+            job = state["job"]
+            if job is None:
+                return
+            snapshot = job.snapshot()
+            progress.value = snapshot["progress"] or 0
+            status.text = (f"{snapshot['processed']} satır işlendi, {snapshot['inserted']} eklendi, "
+                           f"{snapshot['failed']} hata ({snapshot['seconds']} sn)")
+            if snapshot["errors"]:
+                errors_table.rows = snapshot["errors"]
+                errors_table.visible = True
+            if snapshot["status"] in ("done", "failed"):
+                timer.deactivate()
+                state["job"] = None
+                if snapshot["status"] == "failed":
+                    ui.notify(snapshot["message"] or "İçe aktarma başarısız", type="negative")
+                else:
+                    ui.notify(f"{snapshot['inserted']} kayıt eklendi", type="positive")
+                await call_handler(on_saved)
+
+        timer = ui.timer(0.5, poll, active=False)
+
+        def handle_upload(event) -> None:
+            try:
+                file_format = detect_format(event.name, event.type)
+            except ImportFormatError as exc:
+                ui.notify(str(exc), type="warning")
+                return
+            # Yükleme isteği bitince dosya kapatılır; içe aktarma arka planda sürdüğü için kopyalanır
+            spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+            shutil.copyfileobj(event.content, spool)
+            spool.seek(0)
+            state["job"] = start_import(kind, event.name, spool, file_format, validate, write_batch)
+            progress.visible = True
+            errors_table.rows = []
+            errors_table.visible = False
+            timer.activate()
+
+        ui.upload(label="Dosya seç", auto_upload=True, max_files=1, on_upload=handle_upload)\
+            .props('accept=".csv,.ndjson,.jsonl"').classes("w-full")
+        with ui.row().classes("justify-end w-full"):
+            ui.button("Kapat", on_click=dialog.close)
+
+    dialog.open()
+
+# Toplu içe aktarma uç noktaları: gövde ham dosyadır (ör. curl --data-binary @kitaplar.csv)
+@app.post("/api/import/{kind}")
+async def import_upload(kind: str, request: Request, format: Optional[str] = None, filename: Optional[str] = None) -> JSONResponse:
+    if not is_logged_in():
+        raise HTTPException(status_code=401, detail="Oturum açılmamış")
+    if kind not in IMPORTERS:
+        raise HTTPException(status_code=404, detail=f"Bilinmeyen içe aktarma türü: {kind}")
+    try:
+        file_format = detect_format(filename, request.headers.get("content-type"), format)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    validate, write_batch = IMPORTERS[kind]
+    job = start_import(kind, filename or "upload", spool, file_format, validate, write_batch)
+    return JSONResponse(job.snapshot(), status_code=202)
+
+@app.get("/api/import/jobs/{job_id}")
+async def import_status(job_id: str) -> Dict[str, Any]:
+    if not is_logged_in():
+        raise HTTPException(status_code=401, detail="Oturum açılmamış")
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job.snapshot()
+
+# Dışa aktarma: /api/export/books?format=csv|ndjson&gzip=true (loans için active=true yalnızca aktif ödünçler)
+@app.get("/api/export/{kind}")
+async def export_data(kind: str, format: str = "csv", gzip: bool = False, active: bool = False) -> StreamingResponse:
+    if not is_logged_in():
+        raise HTTPException(status_code=401, detail="Oturum açılmamış")
+    if kind not in EXPORT_QUERIES:
+        raise HTTPException(status_code=404, detail=f"Bilinmeyen dışa aktarma türü: {kind}")
+    try:
+        media_type, headers = response_headers(kind, format, gzip)
+    except ExportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    columns, rows = export_rows(kind, active)
+    # Senkron üreteç Starlette tarafından thread havuzunda tüketilir, olay döngüsü bloklanmaz
+    return StreamingResponse(export_chunks(columns, rows, format, gzip), media_type=media_type, headers=headers)
+
+def export_menu(kind: str, active: bool = False) -> None:
+    """Dışa aktarma biçimlerini listeleyen açılır buton"""
+    query = "&active=true" if active else ""
+    with ui.dropdown_button("📤 Dışa Aktar", auto_close=True):
+        for label, params in (("CSV", "format=csv"), ("NDJSON", "format=ndjson"), ("CSV (gzip)", "format=csv&gzip=true")):
+            ui.item(label, on_click=lambda params=params: ui.download(f"/api/export/{kind}?{params}{query}"))
+
+# Typeahead uç noktaları (seçiciler aynı fonksiyonları doğrudan kullanır)
+@app.get("/api/typeahead/books")
+async def typeahead_books(q: str = "", limit: int = TYPEAHEAD_LIMIT) -> List[Dict[str, Any]]:
+    if not is_logged_in():
+        raise HTTPException(status_code=401, detail="Oturum açılmamış")
+    return await suggest_available_books(q, limit)
+
+@app.get("/api/typeahead/members")
+async def typeahead_members(q: str = "", limit: int = TYPEAHEAD_LIMIT) -> List[Dict[str, Any]]:
+    if not is_logged_in():
+        raise HTTPException(status_code=401, detail="Oturum açılmamış")
+    return await suggest_members(q, limit)
+
+# Ödünç uç noktaları: arayüzdeki ödünç verme/iade işleyicileriyle aynı veri fonksiyonları
+# (yük testi ve betikler için HTTP karşılığı)
+@app.post("/api/loans")
+async def create_loan_api(request: Request) -> JSONResponse:
+    if not is_logged_in():
+        raise HTTPException(status_code=401, detail="Oturum açılmamış")
+    payload = await request.json()
+    try:
+        book_id = int(payload["book_id"])
+        member_id = int(payload["member_id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="book_id ve member_id zorunludur")
+    loan_date = payload.get("loan_date") or date.today().isoformat()
+    due_date = payload.get("due_date") or (date.today() + timedelta(days=30)).isoformat()
+    try:
+        loan_id = await run_db(create_loan, book_id, member_id, loan_date, due_date)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return JSONResponse({"id": loan_id}, status_code=201)
+
+@app.post("/api/loans/{loan_id}/return")
+async def return_loan_api(loan_id: int) -> Dict[str, Any]:
+    if not is_logged_in():
+        raise HTTPException(status_code=401, detail="Oturum açılmamış")
+    try:
+        await run_db(return_book, loan_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return {"id": loan_id, "returned": True}
+
+# Olay döngüsü gecikmesi: /api/health/loop?reset=true özetten sonra örnekleri sıfırlar
+loop_lag = LoopLagMonitor()
+
+@app.get("/api/health/loop")
+async def loop_health(reset: bool = False) -> Dict[str, Any]:
+    if not is_logged_in():
+        raise HTTPException(status_code=401, detail="Oturum açılmamış")
+    return loop_lag.snapshot(reset=reset)
+
+# Prometheus metrikleri: METRICS_TOKEN tanımlıysa "Authorization: Bearer <token>" gerekir
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+metrics_auth = HTTPBearer(auto_error=False)
+
+@app.get("/metrics")
+async def prometheus_metrics(credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_auth)) -> Response:
+    if METRICS_TOKEN and (credentials is None or not secrets.compare_digest(credentials.credentials, METRICS_TOKEN)):
+        raise HTTPException(status_code=401, detail="Geçersiz metrik anahtarı")
+    return Response(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+# Canlı profil (yalnızca yönetici): süre sınırlı örnekleme CPU profili ve tracemalloc farkları.
+# Her istek "Authorization: Bearer <PROFILER_TOKEN>" gerektirir; PROFILER_TOKEN tanımlı değilse uç noktalar kapalıdır.
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN")
+profiler_auth = HTTPBearer(auto_error=False)
+cpu_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler(client_count=lambda: len(Client.instances))
+
+def require_profiler_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(profiler_auth)) -> None:
+    if not PROFILER_TOKEN:
+        raise HTTPException(status_code=403, detail="Profil uç noktaları kapalı (PROFILER_TOKEN tanımlı değil)")
+    if credentials is None or not secrets.compare_digest(credentials.credentials, PROFILER_TOKEN):
+        raise HTTPException(status_code=401, detail="Geçersiz profil anahtarı")
+
+@app.get("/api/admin/profile/cpu", dependencies=[Depends(require_profiler_token)])
+async def profile_cpu(seconds: float = 10.0, interval_ms: float = 5.0, idle: bool = False,
+                      lines: bool = False, format: str = "collapsed") -> Any:
+    """Örnekleme süresince olay döngüsünü bloklamamak için profil ayrı thread'de çalışır"""
+    if format not in ("collapsed", "json"):
+        raise HTTPException(status_code=400, detail="format 'collapsed' veya 'json' olmalı")
+    try:
+        result = await asyncio.to_thread(cpu_profiler.profile, seconds, interval_ms / 1000, idle, lines)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if format == "json":
+        return result
+    return Response(collapsed(result), media_type="text/plain; charset=utf-8", headers={
+        "X-Profile-Samples": str(result["samples"]), "X-Profile-Overhead": str(result["overhead"]),
+    })
+
+@app.get("/api/admin/profile/memory", dependencies=[Depends(require_profiler_token)])
+async def memory_status() -> Dict[str, Any]:
+    return memory_profiler.status()
+
+@app.post("/api/admin/profile/memory/start", dependencies=[Depends(require_profiler_token)])
+async def memory_start(frames: int = 10) -> Dict[str, Any]:
+    return memory_profiler.start(max(1, min(frames, 50)))
+
+@app.post("/api/admin/profile/memory/stop", dependencies=[Depends(require_profiler_token)])
+async def memory_stop() -> Dict[str, Any]:
+    return memory_profiler.stop()
+
+@app.post("/api/admin/profile/memory/snapshots", dependencies=[Depends(require_profiler_token)])
+async def memory_snapshot(label: str = "") -> Dict[str, Any]:
+    try:
+        return await asyncio.to_thread(memory_profiler.snapshot, label)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+@app.get("/api/admin/profile/memory/diff", dependencies=[Depends(require_profiler_token)])
+async def memory_diff(base: str, target: str, group_by: str = "lineno", limit: int = 30,
+                      filename: Optional[str] = None) -> Dict[str, Any]:
+    """Örn. /books sayfası N kez açılmadan önce/sonra alınan görüntüler: per_client_kb istemci başına artıştır"""
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="group_by 'lineno', 'filename' veya 'traceback' olmalı")
+    try:
+        return await asyncio.to_thread(memory_profiler.diff, base, target, group_by, limit, filename)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0])
+
+def start_catalog_index() -> None:
+    # Büyük kataloglarda açılışı bekletmemek için indeksi arka planda doldur
+    threading.Thread(target=build_catalog_index, daemon=True, name="catalog-index").start()
+
+app.on_startup(start_catalog_index)
+app.on_startup(loop_lag.start)
+app.on_shutdown(shutdown_db_threads)
+
 # Uygulama başlatma
 if __name__ in {"__main__", "__mp_main__"}:
     init_db()
@@ -4,13 +4,16 @@ SQLite'dan PostgreSQL'e Veri Migrasyon Scripti
 Bu script SQLite verilerini PostgreSQL'e aktarır
 """
 
-import json
+import argparse
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import closing
 import os
 from dotenv import load_dotenv
 import sys
+from database_manager import SQLiteManager
+from migration_engine import MigrationEngine, MigrationError, SQLiteSource, open_backup_source
+from migration_verify import print_report, verify_tables
 
 # .env dosyasını yükle
 load_dotenv()
@@ -92,73 +95,54 @@ def create_postgres_tables():
                 print(f"❌ Tablo oluşturma hatası: {e}")
                 raise
 
-def migrate_data():
-    """Verileri SQLite'dan PostgreSQL'e aktarır"""
+# Aranan yedek dosyaları (ilk bulunan kullanılır)
+BACKUP_FILES = ('sqlite_backup.json', 'sqlite_backup.ndjson')
+
+def migrate_data(backup_path: str = None, sqlite_path: str = None) -> bool:
+    """Verileri SQLite'dan PostgreSQL'e aktarır
+    `sqlite_path` verilirse SQLite veritabanı ara dosya olmadan doğrudan okunur (id'ler korunur);
+    aksi halde yedek (JSON ya da satır başına bir kayıt içeren NDJSON) akış halinde okunur.
+    Tablolar COPY ile parça parça aktarılır; yarıda kalan migrasyon yeniden
+    çalıştırıldığında kaldığı yerden devam eder (bkz. migration_engine.py).
+    """
     print("🔄 Veri migrasyonu başlatılıyor...")
     
-    # SQLite yedek dosyasını oku
-    try:
-        with open('sqlite_backup.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        print("✅ SQLite yedek dosyası okundu")
-    except FileNotFoundError:
-        print("❌ sqlite_backup.json dosyası bulunamadı!")
-        return False
+    if sqlite_path is not None:
+        if not os.path.exists(sqlite_path):
+            print(f"❌ {sqlite_path} veritabanı bulunamadı!")
+            return False
+        print(f"🗄️ SQLite veritabanı: {sqlite_path}")
+        source = SQLiteSource(SQLiteManager(sqlite_path))
+    else:
+        if backup_path is None:
+            backup_path = next((path for path in BACKUP_FILES if os.path.exists(path)), BACKUP_FILES[0])
+        if not os.path.exists(backup_path):
+            print(f"❌ {backup_path} dosyası bulunamadı!")
+            return False
+        print(f"📄 Yedek dosyası: {backup_path}")
+        source = open_backup_source(backup_path)
     
-    with closing(get_postgres_connection()) as connection:
-        with closing(connection.cursor()) as cursor:
-            try:
-                # Members verilerini aktar
-                if data.get('members'):
-                    print(f"👥 {len(data['members'])} üye aktarılıyor...")
-                    for member in data['members']:
-                        cursor.execute("""
-                            INSERT INTO members (name, email, phone, password_hash) 
-                            VALUES (%s, %s, %s, %s)
-                        """, (member['name'], member['email'], member['phone'], member['password_hash']))
-                
-                # Books verilerini aktar
-                if data.get('books'):
-                    print(f"📚 {len(data['books'])} kitap aktarılıyor...")
-                    for book in data['books']:
-                        cursor.execute("""
-                            INSERT INTO books (title, author, isbn, year) 
-                            VALUES (%s, %s, %s, %s)
-                        """, (book['title'], book['author'], book['isbn'], book['year']))
-                
-                # Loans verilerini aktar
-                if data.get('loans'):
-                    print(f"📖 {len(data['loans'])} ödünç kaydı aktarılıyor...")
-                    for loan in data['loans']:
-                        cursor.execute("""
-                            INSERT INTO loans (book_id, member_id, loan_date, due_date, return_date) 
-                            VALUES (%s, %s, %s, %s, %s)
-                        """, (loan['book_id'], loan['member_id'], loan['loan_date'], loan['due_date'], loan['return_date']))
-                
-                # Users verilerini aktar
-                if data.get('users'):
-                    print(f"👤 {len(data['users'])} kullanıcı aktarılıyor...")
-                    for user in data['users']:
-                        # SQLite'tan gelen integer'ı boolean'a çevir
-                        is_admin = bool(user['is_admin'])
-                        cursor.execute("""
-                            INSERT INTO users (username, password_hash, salt, is_admin) 
-                            VALUES (%s, %s, %s, %s)
-                        """, (user['username'], user['password_hash'], user['salt'], is_admin))
-                
-                connection.commit()
-                print("✅ Veri migrasyonu tamamlandı!")
-                return True
-                
-            except psycopg2.Error as e:
-                connection.rollback()
-                print(f"❌ Veri aktarma hatası: {e}")
-                raise
+    engine = MigrationEngine(get_postgres_connection, source)
+    try:
+        engine.run()
+        print("✅ Veri migrasyonu tamamlandı!")
+        return True
+    except (psycopg2.Error, MigrationError) as e:
+        print(f"❌ Veri aktarma hatası: {e}")
+        print("ℹ️ Script'i yeniden çalıştırdığınızda migrasyon kaldığı yerden devam eder")
+        raise
 
-def verify_migration():
-    """Migrasyon sonrası veri kontrolü"""
+def verify_migration(sqlite_path: str = None) -> bool:
+    """Migrasyon sonrası veri kontrolü
+    `sqlite_path` verilirse tablolar id aralıklarına bölünüp kaynak ve hedefte özetlenir;
+    uyuşmayan aralıklardaki eksik, fazla ve farklı kayıtlar raporlanır.
+    """
     print("🔍 Migrasyon sonrası veri kontrolü...")
     
+    if sqlite_path is not None:
+        report = verify_tables(SQLiteManager(sqlite_path), get_postgres_connection)
+        return print_report(report)
+    
     with closing(get_postgres_connection()) as connection:
         with closing(connection.cursor(cursor_factory=RealDictCursor)) as cursor:
             try:
@@ -175,19 +159,24 @@ def verify_migration():
                 print(f"❌ Veri kontrol hatası: {e}")
                 return False
 
-def main():
+def main(sqlite_path: str = None, backup_path: str = None, verify_only: bool = False):
     """Ana migrasyon fonksiyonu"""
     print("🎯 SQLite → PostgreSQL Veri Migrasyonu")
     print("=" * 50)
     
+    if verify_only:
+        return verify_migration(sqlite_path)
+    
     try:
         # Tabloları oluştur
         create_postgres_tables()
         
         # Verileri aktar
-        if migrate_data():
+        if migrate_data(backup_path=backup_path, sqlite_path=sqlite_path):
             # Kontrol et
-            verify_migration()
+            if not verify_migration(sqlite_path):
+                print("\n💥 Doğrulama başarısız: kaynak ve hedef verileri farklı!")
+                return False
             print("\n🎉 Migrasyon başarıyla tamamlandı!")
         else:
             print("\n💥 Migrasyon başarısız!")
@@ -200,8 +189,13 @@ def main():
     return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite → PostgreSQL veri migrasyonu")
+    parser.add_argument("--sqlite", metavar="DOSYA", help="Verileri doğrudan bu SQLite veritabanından oku")
+    parser.add_argument("--backup", metavar="DOSYA", help="JSON/NDJSON yedek dosyası (varsayılan: sqlite_backup.json)")
+    parser.add_argument("--verify-only", action="store_true", help="Aktarmadan yalnızca doğrula (--sqlite ile özet karşılaştırması)")
+    args = parser.parse_args()
     try:
-        success = main()
+        success = main(sqlite_path=args.sqlite, backup_path=args.backup, verify_only=args.verify_only)
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\n⚠️ Migrasyon kullanıcı tarafından iptal edildi!")
@@ -0,0 +1,659 @@
+# Veri Migrasyon Motoru
+# SQLite verilerini PostgreSQL'e COPY FROM STDIN ile parça parça, paralel ve
+# kaldığı yerden devam edebilir şekilde aktarır
+import datetime
+import io
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Birbirine bağımlı olmayan tablolar paralel aktarılır; loans bunlara referans verdiği için en son
+INDEPENDENT_TABLES = ("members", "books", "users")
+DEPENDENT_TABLES = ("loans",)
+
+# Her COPY parçasında gönderilen satır sayısı; her parça ayrı transaction'da commit edilir
+DEFAULT_CHUNK_SIZE = int(os.getenv("MIGRATION_CHUNK_SIZE", "50000"))
+# Okuma thread'inin yazmanın önünde hazır tuttuğu en fazla parça sayısı
+PREFETCH_CHUNKS = 2
+
+CHECKPOINT_TABLE = "migration_checkpoints"
+
+class MigrationError(Exception):
+    """Migrasyon durdurulmalı (ör. checkpoint başka bir kaynağa ait)"""
+
+_WHITESPACE = " \t\n\r"
+
+class _JsonStream:
+    """Dosyayı parça parça okuyup JSON değerlerini tek tek çözen yardımcı
+    Bellekte yalnızca okuma tamponu ve o an çözülen değer bulunur.
+    """
+
+    def __init__(self, file, read_size: int = 1 << 20):
+        self.file = file
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.file.read(self.read_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Boşlukları atlayıp sıradaki karakteri döndürür (dosya sonunda "")"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Geçersiz yedek dosyası: '{char}' beklenirken '{found or 'dosya sonu'}' bulundu")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Sıradaki tam JSON değerini çözer; tampon yetmezse dosyadan okumaya devam eder"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Tampon sonunda biten sayı ya da sabit yarım kalmış olabilir ("12" + "34")
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+class JsonBackupSource:
+    """sqlite_backup.json yedeğini akış halinde okur: {"tablo": [{...}, ...], ...}
+
+    Dosya hiçbir zaman tamamen belleğe alınmaz; her tablo okunurken dosya baştan
+    taranır ve yalnızca istenen tablonun kayıtları tek tek üretilir.
+    """
+
+    def __init__(self, path: str = "sqlite_backup.json"):
+        self.path = path
+
+    @property
+    def description(self) -> str:
+        return f"json:{os.path.abspath(self.path)}"
+
+    def count(self, table: str) -> Optional[int]:
+        return None  # Saymak için dosyanın tamamını taramak gerekir
+
+    def iter_rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        """Tablonun satırlarını her çağrıda aynı sırayla döndürür"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            stream = _JsonStream(f)
+            stream.expect("{")
+            if stream.peek() == "}":
+                return
+            while True:
+                key = stream.value()
+                stream.expect(":")
+                if stream.peek() == "[":
+                    stream.pos += 1
+                    matching = key == table
+                    if stream.peek() == "]":
+                        stream.pos += 1
+                    else:
+                        while True:
+                            row = stream.value()
+                            if matching:
+                                yield row
+                            if stream.peek() == ",":
+                                stream.pos += 1
+                                continue
+                            stream.expect("]")
+                            break
+                    if matching:
+                        return
+                else:
+                    stream.value()  # Tablo olmayan alanlar (ör. yedek tarihi) atlanır
+                if stream.peek() == ",":
+                    stream.pos += 1
+                    continue
+                stream.expect("}")
+                return
+
+class NdjsonBackupSource:
+    """Satır başına bir kayıt içeren yedek: {"table": "members", "row": {...}}"""
+
+    def __init__(self, path: str = "sqlite_backup.ndjson"):
+        self.path = path
+
+    @property
+    def description(self) -> str:
+        return f"ndjson:{os.path.abspath(self.path)}"
+
+    def count(self, table: str) -> Optional[int]:
+        return None
+
+    def iter_rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("table") == table:
+                    yield record["row"]
+
+class SQLiteSource:
+    """SQLite veritabanını ara JSON dosyası olmadan doğrudan kaynak olarak kullanır
+    Satırlar id sırasıyla ve id'leriyle birlikte okunur; böylece loans referansları korunur.
+    `seekable` kaynaklar kesintiden sonra checkpoint'teki son id'den okumaya başlar.
+    """
+
+    seekable = True
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    @property
+    def description(self) -> str:
+        return f"sqlite:{os.path.abspath(self.manager.db_path)}"
+
+    def count(self, table: str) -> Optional[int]:
+        return self.manager.execute_query(f"SELECT COUNT(*) FROM {table}", result_format="tuple")[0][0]
+
+    def iter_rows(self, table: str, after_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        if after_id is not None:
+            return self.manager.iter_query(f"SELECT * FROM {table} WHERE id > ? ORDER BY id", (after_id,))
+        return self.manager.iter_query(f"SELECT * FROM {table} ORDER BY id")
+
+def open_backup_source(path: str):
+    """Dosya uzantısına göre JSON ya da NDJSON yedek kaynağı döndürür"""
+    if path.endswith((".ndjson", ".jsonl")):
+        return NdjsonBackupSource(path)
+    return JsonBackupSource(path)
+
+def _copy_value(value: Any) -> str:
+    """Python değerini COPY text biçimine çevirir"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    text = value if isinstance(value, str) else str(value)
+    return (text.replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+def _to_bool(value: Any) -> Any:
+    """SQLite'ın 0/1 tamsayı boolean'larını PostgreSQL BOOLEAN'a çevirir"""
+    if value is None or isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "t", "true", "yes", "on")
+
+def _to_date(value: Any) -> Any:
+    """SQLite TEXT tarihlerini ("2024-01-01", "2024-01-01 10:00:00", "2024-01-01T10:00") DATE'e indirger"""
+    if isinstance(value, str):
+        return value[:10]
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+# Hedef sütun tipine göre dönüştürücüler; tablo başına bir kez seçilir
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "boolean": _to_bool,
+    "date": _to_date,
+}
+
+def _copy_buffer(rows: Sequence[Dict[str, Any]], columns: Sequence[str],
+                 converters: Optional[Dict[str, Callable[[Any], Any]]] = None) -> io.StringIO:
+    buffer = io.StringIO()
+    if converters:
+        # Dönüştürücüsü olmayan sütunlar için kimlik fonksiyonu: satır başına dal yok
+        convert = [converters.get(column, _identity) for column in columns]
+        buffer.writelines(
+            "\t".join(_copy_value(function(row.get(column))) for column, function in zip(columns, convert)) + "\n"
+            for row in rows
+        )
+    else:
+        buffer.writelines(
+            "\t".join(_copy_value(row.get(column)) for column in columns) + "\n"
+            for row in rows
+        )
+    buffer.seek(0)
+    return buffer
+
+def _identity(value: Any) -> Any:
+    return value
+
+def _prefetch(chunks: Iterator[List[Dict[str, Any]]], depth: int = PREFETCH_CHUNKS) -> Iterator[List[Dict[str, Any]]]:
+    """Parçaları arka plan thread'inde okuyarak kaynağın okunmasını hedefe yazmayla örtüştürür"""
+    pending: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    finished = object()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer() -> None:
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+            put(finished)
+        except BaseException as e:
+            put(e)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=producer, name="migrate-read", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is finished:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+def _chunked(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    try:
+        while True:
+            chunk = list(itertools.islice(rows, size))
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        close = getattr(rows, "close", None)
+        if close is not None:
+            close()
+
+class MigrationEngine:
+    """Kaynağı tablo tablo PostgreSQL'e aktarır
+
+    - Her tablo `chunk_size` satırlık parçalar halinde COPY FROM STDIN ile yazılır
+    - Her parça, checkpoint güncellemesiyle aynı transaction'da commit edilir; yarıda kalan
+      bir çalıştırma yeniden başlatıldığında son commit edilen parçadan devam eder
+    - members/books/users paralel, loans onlardan sonra aktarılır
+    - Sonunda SERIAL sequence'leri MAX(id)'ye ayarlanır
+    """
+
+    def __init__(self, connect: Callable[[], Any], source, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 workers: int = len(INDEPENDENT_TABLES), log: Callable[[str], None] = print):
+        self.connect = connect
+        self.source = source
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.log = log
+
+    # Checkpoint işlemleri
+    def ensure_checkpoint_table(self) -> None:
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                    table_name VARCHAR(100) PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    rows_done BIGINT NOT NULL DEFAULT 0,
+                    last_id BIGINT,
+                    completed BOOLEAN NOT NULL DEFAULT FALSE,
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+                );
+            """)
+            connection.commit()
+
+    def checkpoints(self) -> Dict[str, Dict[str, Any]]:
+        """Tablo başına kaydedilmiş ilerleme"""
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(f"SELECT table_name, source, rows_done, last_id, completed FROM {CHECKPOINT_TABLE}")
+            return {
+                table: {"source": source, "rows_done": rows_done, "last_id": last_id, "completed": completed}
+                for table, source, rows_done, last_id, completed in cursor.fetchall()
+            }
+
+    def reset_checkpoints(self) -> None:
+        """Tüm ilerlemeyi siler (hedef tablolardaki veriye dokunmaz)"""
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(f"DELETE FROM {CHECKPOINT_TABLE}")
+            connection.commit()
+
+    @staticmethod
+    def _target_columns(cursor, table: str) -> Dict[str, str]:
+        """Hedef tablonun sütunları: {sütun adı: veri tipi}"""
+        cursor.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s ORDER BY ordinal_position",
+            (table,),
+        )
+        return dict(cursor.fetchall())
+
+    @staticmethod
+    def _chunk_columns(table: str, chunk: Sequence[Dict[str, Any]], target_columns: Dict[str, str]) -> List[str]:
+        """Parçadaki herhangi bir satırda bulunan hedef sütunları hedef şema sırasıyla döndürür
+
+        Kaynakta hiç olmayan hedef sütunlar listeye girmez (sunucu varsayılanı uygulanır); bazı
+        satırlarda eksik olan anahtarlar NULL yazılır. Hedefte karşılığı olmayan kaynak anahtarı
+        sessizce atılmaz, migrasyonu durdurur.
+        """
+        present = set()
+        for row in chunk:
+            present.update(row)
+        unknown = present.difference(target_columns)
+        if unknown:
+            raise MigrationError(
+                f"'{table}' kaynağındaki sütunların hedefte karşılığı yok: {', '.join(sorted(unknown))}; "
+                f"hedef şemaya ekleyin ya da kaynaktan çıkarın"
+            )
+        return [column for column in target_columns if column in present]
+
+    # Tablo aktarımı
+    def migrate_table(self, table: str) -> int:
+        """Tek bir tabloyu checkpoint'ten devam ederek aktarır; bu çalıştırmada yazılan satır sayısını döndürür"""
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            target_columns = self._target_columns(cursor, table)
+            if not target_columns:
+                connection.rollback()
+                self.log(f"⏭️ {table}: hedef şemada yok, atlandı")
+                return 0
+            cursor.execute(
+                f"SELECT source, rows_done, last_id, completed FROM {CHECKPOINT_TABLE} WHERE table_name = %s",
+                (table,),
+            )
+            checkpoint = cursor.fetchone()
+            if checkpoint is None:
+                cursor.execute(
+                    f"INSERT INTO {CHECKPOINT_TABLE} (table_name, source) VALUES (%s, %s)",
+                    (table, self.source.description),
+                )
+                connection.commit()
+                rows_done, last_id, completed = 0, None, False
+            else:
+                source, rows_done, last_id, completed = checkpoint
+                if source != self.source.description:
+                    raise MigrationError(
+                        f"'{table}' checkpoint'i başka bir kaynağa ait ({source}); "
+                        f"yeniden başlatmak için reset_checkpoints() kullanın"
+                    )
+            if completed:
+                self.log(f"⏭️ {table}: daha önce tamamlanmış ({rows_done} kayıt)")
+                return 0
+
+            connection.rollback()
+            total = self.source.count(table)
+            if rows_done and last_id is not None and getattr(self.source, "seekable", False):
+                # Kaynak id'ye göre konumlanabiliyor: baştan okuyup atlamak yerine son id'den devam et
+                self.log(f"↪️ {table}: id > {last_id} kayıtlarından devam ediliyor")
+                rows = self.source.iter_rows(table, after_id=last_id)
+            else:
+                rows = self.source.iter_rows(table)
+                if rows_done:
+                    self.log(f"↪️ {table}: {rows_done}. kayıttan devam ediliyor")
+                    rows = itertools.islice(rows, rows_done, None)
+
+            written = 0
+            converters = {
+                column: _CONVERTERS[data_type] for column, data_type in target_columns.items() if data_type in _CONVERTERS
+            }
+            start = time.perf_counter()
+            for chunk in _prefetch(_chunked(rows, self.chunk_size)):
+                columns = self._chunk_columns(table, chunk, target_columns)
+                column_list = ", ".join(columns)
+                try:
+                    cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN", _copy_buffer(chunk, columns, converters))
+                    rows_done += len(chunk)
+                    cursor.execute(
+                        f"UPDATE {CHECKPOINT_TABLE} SET rows_done = %s, last_id = %s, updated_at = NOW() "
+                        f"WHERE table_name = %s",
+                        (rows_done, chunk[-1].get("id"), table),
+                    )
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+                written += len(chunk)
+                progress = f"{rows_done}/{total}" if total is not None else str(rows_done)
+                self.log(f"📦 {table}: {progress} kayıt ({written / max(time.perf_counter() - start, 1e-9):.0f} kayıt/sn)")
+
+            cursor.execute(
+                f"UPDATE {CHECKPOINT_TABLE} SET completed = TRUE, updated_at = NOW() WHERE table_name = %s",
+                (table,),
+            )
+            connection.commit()
+            self.log(f"✅ {table}: {rows_done} kayıt aktarıldı")
+            return written
+
+    def reset_sequences(self, tables: Iterable[str]) -> None:
+        """SERIAL sequence'lerini tablodaki en büyük id'ye ayarlar (id'ler açıkça kopyalandığı için)"""
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            for table in tables:
+                cursor.execute("SELECT to_regclass(%s)", (table,))
+                if cursor.fetchone()[0] is None:
+                    continue  # Hedef şemada olmayan tablo (ör. uygulama şemasında users yok)
+                cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+                sequence = cursor.fetchone()[0]
+                if sequence is None:
+                    continue
+                cursor.execute(
+                    f"SELECT setval(%s, COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}",
+                    (sequence,),
+                )
+            connection.commit()
+        self.log("🔢 Sequence'ler güncellendi")
+
+    def refresh_book_availability(self) -> None:
+        """books.is_on_loan bayrağı varsa aktarılan aktif ödünçlere göre yeniden hesaplar"""
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            if "is_on_loan" not in self._target_columns(cursor, "books"):
+                return
+            cursor.execute("""
+                UPDATE books SET is_on_loan = EXISTS (
+                    SELECT 1 FROM loans WHERE loans.book_id = books.id AND loans.return_date IS NULL
+                )
+            """)
+            connection.commit()
+        self.log("📗 Kitap ödünç durumları güncellendi")
+
+    def run(self) -> Dict[str, int]:
+        """Tüm tabloları aktarır; tablo başına bu çalıştırmada yazılan satır sayısını döndürür"""
+        self.ensure_checkpoint_table()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="migrate") as executor:
+            futures = {table: executor.submit(self.migrate_table, table) for table in INDEPENDENT_TABLES}
+            written = {table: future.result() for table, future in futures.items()}
+        for table in DEPENDENT_TABLES:
+            written[table] = self.migrate_table(table)
+        tables = INDEPENDENT_TABLES + DEPENDENT_TABLES
+        self.reset_sequences(tables)
+        self.refresh_book_availability()
+        self.log(f"⏱️ Migrasyon {time.perf_counter() - start:.1f} sn sürdü")
+        return written
+
+# Test fonksiyonu
+def test_resume(connect: Callable[[], Any], rows: int = 20000) -> bool:
+    """Yarıda kesilen migrasyonun kaldığı yerden devam ettiğini doğrular
+    Boş bir PostgreSQL veritabanında (tablolar oluşturulmuş) çalıştırılmalıdır.
+    """
+    class FlakySource:
+        description = "test:flaky"
+        seekable = True
+
+        def __init__(self):
+            self.fail_after: Optional[int] = rows // 2
+            self.resumed_after: Dict[str, Optional[int]] = {}
+
+        def count(self, table):
+            return rows if table != "users" else 1
+
+        def iter_rows(self, table, after_id=None):
+            self.resumed_after[table] = after_id
+            if table == "users":
+                yield {"id": 1, "username": "test_admin", "password_hash": "x", "salt": "y", "is_admin": 1}
+                return
+            for i in range((after_id or 0) + 1, rows + 1):
+                if table == "loans" and self.fail_after is not None and i > self.fail_after:
+                    raise RuntimeError("Yapay kesinti")
+                if table == "members":
+                    yield {"id": i, "name": f"Üye {i}", "email": f"uye{i}@ornek.com", "phone": None,
+                           "password_hash": "x"}
+                elif table == "books":
+                    yield {"id": i, "title": f"Kitap\t{i}", "author": "Yazar\\", "isbn": f"978-{i:09d}", "year": 2000}
+                else:
+                    yield {"id": i, "book_id": i, "member_id": i, "loan_date": "2024-01-01",
+                           "due_date": "2024-01-15", "return_date": None if i % 3 else "2024-01-10"}
+
+    source = FlakySource()
+    engine = MigrationEngine(connect, source, chunk_size=1000, log=lambda message: None)
+    engine.ensure_checkpoint_table()
+    engine.reset_checkpoints()
+    try:
+        engine.run()
+        interrupted = False
+    except RuntimeError:
+        interrupted = True
+    partial = engine.checkpoints()["loans"]["rows_done"]
+    print(f"{'✅' if interrupted else '❌'} İlk çalıştırma kesildi: loans {partial}/{rows}")
+
+    source.fail_after = None
+    written = engine.run()
+    with closing(connect()) as connection, closing(connection.cursor()) as cursor:
+        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT id) FROM loans")
+        count, distinct = cursor.fetchone()
+        cursor.execute("SELECT title, author FROM books WHERE id = 1")
+        title, author = cursor.fetchone()
+        cursor.execute("SELECT nextval(pg_get_serial_sequence('loans', 'id'))")
+        next_id = cursor.fetchone()[0]
+        connection.rollback()
+    resumed = (written["loans"] == rows - partial and written["books"] == 0 and count == distinct == rows
+               and source.resumed_after["loans"] == partial)
+    escaped = title == "Kitap\t1" and author == "Yazar\\"
+    sequence_ok = next_id == rows + 1
+    print(f"{'✅' if resumed else '❌'} İkinci çalıştırma devam etti: {written}")
+    print(f"{'✅' if escaped else '❌'} COPY kaçış karakterleri korundu")
+    print(f"{'✅' if sequence_ok else '❌'} Sequence güncellendi: sıradaki loans id = {next_id}")
+    return interrupted and resumed and escaped and sequence_ok
+
+def test_columns(connect: Callable[[], Any]) -> bool:
+    """COPY sütunlarının hedef şemadan alındığını, eksik tablonun atlandığını ve bilinmeyen
+    kaynak sütununun migrasyonu durdurduğunu doğrular"""
+    table = "migration_column_test"
+
+    class ListSource:
+        description = "test:columns"
+
+        def __init__(self, rows):
+            self.rows = rows
+
+        def count(self, name):
+            return len(self.rows)
+
+        def iter_rows(self, name):
+            return iter(self.rows)
+
+    with closing(connect()) as connection, closing(connection.cursor()) as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(f"CREATE TABLE {table} (id SERIAL PRIMARY KEY, name TEXT NOT NULL, note TEXT, "
+                       f"flag BOOLEAN NOT NULL DEFAULT FALSE)")
+        connection.commit()
+    try:
+        # "note" yalnızca ikinci satırda var; "flag" kaynakta hiç yok (varsayılan kullanılmalı)
+        engine = MigrationEngine(connect, ListSource([{"id": 1, "name": "a"}, {"id": 2, "name": "b", "note": "x"}]),
+                                 log=lambda message: None)
+        engine.ensure_checkpoint_table()
+        engine.reset_checkpoints()
+        engine.migrate_table(table)
+        with closing(connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(f"SELECT id, note, flag FROM {table} ORDER BY id")
+            copied = cursor.fetchall() == [(1, None, False), (2, "x", False)]
+            connection.rollback()
+        print(f"{'✅' if copied else '❌'} Sonraki satırlardaki sütunlar da kopyalandı, eksik sütuna varsayılan yazıldı")
+
+        skipped = engine.migrate_table("missing_table") == 0
+        print(f"{'✅' if skipped else '❌'} Hedefte olmayan tablo atlandı")
+
+        engine.source = ListSource([{"id": 3, "name": "c", "extra": 1}])
+        engine.reset_checkpoints()
+        try:
+            engine.migrate_table(table)
+            rejected = False
+        except MigrationError as e:
+            rejected = "extra" in str(e)
+        print(f"{'✅' if rejected else '❌'} Hedefte karşılığı olmayan kaynak sütunu hata verdi")
+        return copied and skipped and rejected
+    finally:
+        with closing(connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE source = 'test:columns'")
+            connection.commit()
+
+def test_backup_sources(members: int = 200000) -> bool:
+    """JSON ve NDJSON yedeklerinin akış halinde, sabit bellekle okunduğunu doğrular"""
+    import tempfile
+    import tracemalloc
+
+    directory = tempfile.mkdtemp()
+    json_path = os.path.join(directory, "sqlite_backup.json")
+    ndjson_path = os.path.join(directory, "sqlite_backup.ndjson")
+    make_member = lambda i: {"id": i, "name": f"Üye [{i}] \"x\"", "email": f"uye{i}@ornek.com", "age": 20 + i % 50}
+    with open(json_path, "w", encoding="utf-8") as f:
+        f.write('{"created_at": "2024-01-01", "books": [], "members": [')
+        f.write(",".join(json.dumps(make_member(i), ensure_ascii=False) for i in range(1, members + 1)))
+        f.write('], "users": [{"id": 1, "username": "admin", "is_admin": 1}]}')
+    with open(ndjson_path, "w", encoding="utf-8") as f:
+        for i in range(1, members + 1):
+            f.write(json.dumps({"table": "members", "row": make_member(i)}, ensure_ascii=False) + "\n")
+        f.write(json.dumps({"table": "users", "row": {"id": 1, "username": "admin", "is_admin": 1}}) + "\n")
+
+    ok = True
+    for path in (json_path, ndjson_path):
+        source = open_backup_source(path)
+        tracemalloc.start()
+        count = 0
+        last = None
+        for row in source.iter_rows("members"):
+            count += 1
+            last = row
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        users = list(source.iter_rows("users"))
+        passed = (count == members and last == make_member(members) and users[0]["username"] == "admin"
+                  and not list(source.iter_rows("books")) and peak < 16 * 1024 * 1024)
+        ok = ok and passed
+        size = os.path.getsize(path) / 1e6
+        print(f"{'✅' if passed else '❌'} {type(source).__name__}: {count} kayıt, dosya {size:.0f} MB, "
+              f"tepe bellek {peak / 1e6:.1f} MB")
+    return ok
+
+if __name__ == "__main__":
+    from migrate_data import create_postgres_tables, get_postgres_connection
+    print("🧪 Migrasyon motoru test ediliyor (boş bir veritabanında çalıştırın)...")
+    import sys
+    # Yedek dosyası kaynakları veritabanı gerektirmez; PostgreSQL testlerinden önce çalışır
+    passed = test_backup_sources()
+    create_postgres_tables()
+    passed = test_resume(get_postgres_connection) and passed
+    passed = test_columns(get_postgres_connection) and passed
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,294 @@
+# Migrasyon Doğrulama
+# SQLite kaynağı ile PostgreSQL hedefini id aralıklarına (chunk) bölünmüş özetlerle
+# karşılaştırır; yalnızca uyuşmayan aralıklarda satır satır inceleme yapar
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from migration_engine import DEPENDENT_TABLES, INDEPENDENT_TABLES
+
+# Her özetin kapsadığı id aralığı genişliği
+DEFAULT_VERIFY_CHUNK = int(os.getenv("VERIFY_CHUNK_SIZE", "10000"))
+# Tablo başına raporlanacak en fazla örnek fark
+MAX_REPORTED_ROWS = 20
+
+NULL_MARKER = "\\N"
+
+def _sqlite_expression(column: str, data_type: str) -> str:
+    """Sütunu PostgreSQL tarafıyla aynı metne çeviren SQLite ifadesi (migration_engine dönüşümleriyle uyumlu)"""
+    if data_type == "boolean":
+        expression = (f"CASE WHEN {column} IS NULL THEN NULL WHEN lower(CAST({column} AS TEXT)) "
+                      f"IN ('1', 't', 'true', 'yes', 'on') THEN '1' ELSE '0' END")
+    elif data_type == "date":
+        expression = f"substr(CAST({column} AS TEXT), 1, 10)"
+    else:
+        expression = f"CAST({column} AS TEXT)"
+    return f"COALESCE({expression}, '{NULL_MARKER}')"
+
+def _postgres_expression(column: str, data_type: str) -> str:
+    if data_type == "boolean":
+        expression = f"CASE WHEN {column} THEN '1' ELSE '0' END"
+    elif data_type == "date":
+        expression = f"to_char({column}, 'YYYY-MM-DD')"
+    else:
+        expression = f"{column}::text"
+    return f"COALESCE({expression}, '{NULL_MARKER}')"
+
+def _row_text(expressions: Sequence[str], separator: str) -> str:
+    return f" || {separator} || ".join(expressions)
+
+class TableVerifier:
+    """Tek bir tablonun kaynak ve hedef özetlerini hesaplayıp karşılaştırır
+
+    Her iki tarafta da satır, sütunları TAB ile birleştirilmiş kanonik metne çevrilir ve
+    id / chunk_size aralığındaki satır metinleri id sırasıyla "\\n" ile birleştirilip MD5'i alınır.
+    PostgreSQL tarafı bir id segmentindeki tüm aralıkları tek taramada (GROUP BY) hesaplar;
+    SQLite tarafı her aralığı birincil anahtar üzerinden okur ve metni group_concat ile birleştirir.
+    """
+
+    def __init__(self, table: str, sqlite_manager, connect: Callable[[], Any], chunk_size: int = DEFAULT_VERIFY_CHUNK):
+        self.table = table
+        self.sqlite_manager = sqlite_manager
+        self.connect = connect
+        self.chunk_size = chunk_size
+        self.columns: List[Tuple[str, str]] = []
+
+    def prepare(self) -> None:
+        """Karşılaştırılacak ortak sütunları ve hedefteki veri tiplerini belirler"""
+        source_columns = {
+            row["name"] for row in self.sqlite_manager.execute_query(f"PRAGMA table_info({self.table})")
+        }
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(
+                "SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = %s ORDER BY ordinal_position",
+                (self.table,),
+            )
+            self.columns = [(name, data_type) for name, data_type in cursor.fetchall() if name in source_columns]
+            connection.rollback()
+        if not any(name == "id" for name, _ in self.columns):
+            raise ValueError(f"'{self.table}' tablosunda karşılaştırma için id sütunu yok")
+
+    def bucket_range(self) -> Optional[Tuple[int, int]]:
+        """Her iki taraftaki id'leri kapsayan (ilk, son) aralık numaraları; iki taraf da boşsa None"""
+        source = self.sqlite_manager.execute_query(f"SELECT MIN(id), MAX(id) FROM {self.table}", result_format="tuple")[0]
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(f"SELECT MIN(id), MAX(id) FROM {self.table}")
+            target = cursor.fetchone()
+            connection.rollback()
+        lows = [bound for bound in (source[0], target[0]) if bound is not None]
+        highs = [bound for bound in (source[1], target[1]) if bound is not None]
+        if not lows:
+            return None
+        return min(lows) // self.chunk_size, max(highs) // self.chunk_size
+
+    # Özetler
+    def source_checksums(self, first: int, last: int) -> Dict[int, Tuple[int, str]]:
+        """[first, last] aralıkları için {aralık no: (satır sayısı, md5)} — SQLite"""
+        row_text = _row_text([_sqlite_expression(name, data_type) for name, data_type in self.columns], "char(9)")
+        query = (
+            f"SELECT COUNT(*), group_concat(row_text, char(10)) FROM "
+            f"(SELECT {row_text} AS row_text FROM {self.table} WHERE id >= ? AND id < ? ORDER BY id)"
+        )
+        checksums: Dict[int, Tuple[int, str]] = {}
+        with closing(self.sqlite_manager.get_connection()) as connection, closing(self.sqlite_manager._cursor(connection)) as cursor:
+            for bucket in range(first, last + 1):
+                cursor.execute(query, (bucket * self.chunk_size, (bucket + 1) * self.chunk_size))
+                count, text = cursor.fetchone()
+                if count:
+                    checksums[bucket] = (count, hashlib.md5(text.encode("utf-8")).hexdigest())
+        return checksums
+
+    def target_checksums(self, first: int, last: int) -> Dict[int, Tuple[int, str]]:
+        """[first, last] aralıkları için {aralık no: (satır sayısı, md5)} — PostgreSQL"""
+        row_text = _row_text([_postgres_expression(name, data_type) for name, data_type in self.columns], "E'\\t'")
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(
+                f"SELECT id / %s AS bucket, COUNT(*), md5(string_agg({row_text}, E'\\n' ORDER BY id)) "
+                f"FROM {self.table} WHERE id >= %s AND id < %s GROUP BY 1",
+                (self.chunk_size, first * self.chunk_size, (last + 1) * self.chunk_size),
+            )
+            checksums = {bucket: (count, digest) for bucket, count, digest in cursor.fetchall()}
+            connection.rollback()
+        return checksums
+
+    # Ayrıntılı inceleme
+    def _source_rows(self, bucket: int) -> Dict[int, str]:
+        row_text = _row_text([_sqlite_expression(name, data_type) for name, data_type in self.columns], "char(9)")
+        rows = self.sqlite_manager.execute_query(
+            f"SELECT id, {row_text} FROM {self.table} WHERE id >= ? AND id < ?",
+            (bucket * self.chunk_size, (bucket + 1) * self.chunk_size),
+            result_format="tuple",
+        )
+        return dict(rows)
+
+    def _target_rows(self, bucket: int) -> Dict[int, str]:
+        row_text = _row_text([_postgres_expression(name, data_type) for name, data_type in self.columns], "E'\\t'")
+        with closing(self.connect()) as connection, closing(connection.cursor()) as cursor:
+            cursor.execute(
+                f"SELECT id, {row_text} FROM {self.table} WHERE id >= %s AND id < %s",
+                (bucket * self.chunk_size, (bucket + 1) * self.chunk_size),
+            )
+            rows = dict(cursor.fetchall())
+            connection.rollback()
+        return rows
+
+    def drill_down(self, buckets: Sequence[int]) -> Dict[str, Any]:
+        """Uyuşmayan aralıklardaki satırları karşılaştırır"""
+        missing: List[int] = []
+        extra: List[int] = []
+        different: List[Dict[str, Any]] = []
+        column_names = [name for name, _ in self.columns]
+        for bucket in buckets:
+            source_rows = self._source_rows(bucket)
+            target_rows = self._target_rows(bucket)
+            missing.extend(sorted(source_rows.keys() - target_rows.keys()))
+            extra.extend(sorted(target_rows.keys() - source_rows.keys()))
+            for row_id in sorted(source_rows.keys() & target_rows.keys()):
+                if source_rows[row_id] != target_rows[row_id]:
+                    source_values = source_rows[row_id].split("\t")
+                    target_values = target_rows[row_id].split("\t")
+                    different.append({
+                        "id": row_id,
+                        "columns": {
+                            name: {"source": source_value, "target": target_value}
+                            for name, source_value, target_value in zip(column_names, source_values, target_values)
+                            if source_value != target_value
+                        },
+                    })
+        return {"missing_in_target": missing, "extra_in_target": extra, "different": different}
+
+def _segments(first: int, last: int, parts: int) -> List[Tuple[int, int]]:
+    """[first, last] aralık numaralarını en fazla `parts` ardışık parçaya böler"""
+    total = last - first + 1
+    size = -(-total // max(1, parts))
+    return [(start, min(start + size - 1, last)) for start in range(first, last + 1, size)]
+
+def _timed(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """Fonksiyonu çalıştırır; (sonuç, bitiş anı) döndürür"""
+    return func(*args), time.perf_counter()
+
+def verify_tables(sqlite_manager, connect: Callable[[], Any], tables: Sequence[str] = INDEPENDENT_TABLES + DEPENDENT_TABLES,
+                  chunk_size: int = DEFAULT_VERIFY_CHUNK, workers: int = None) -> Dict[str, Dict[str, Any]]:
+    """Tabloları doğrular; kaynak ve hedef özetleri paralel hesaplanır
+    Her tablonun id aralığı `workers` parçaya bölünür ve her parça iki tarafta ayrı
+    bağlantılarda eşzamanlı özetlenir.
+
+    Dönüş: {tablo: {"ok", "rows", "chunks", "mismatched_chunks", "missing_in_target",
+    "extra_in_target", "different", "seconds"}}
+    "seconds" tablonun kendi süresidir: hazırlık, özetlerinin gönderilmesinden son parçanın
+    bitmesine kadar geçen süre ve ayrıntılı inceleme. Tablolar eşzamanlı özetlendiğinden
+    bu süreler toplanırsa toplam duvar saati süresini aşabilir.
+    """
+    workers = workers or min(8, os.cpu_count() or 4)
+    verifiers = {table: TableVerifier(table, sqlite_manager, connect, chunk_size) for table in tables}
+    seconds: Dict[str, float] = {}
+    with ThreadPoolExecutor(max_workers=max(2, workers), thread_name_prefix="verify") as executor:
+        futures: Dict[str, List[Tuple[Any, Any]]] = {}
+        submitted: Dict[str, float] = {}
+        for table, verifier in verifiers.items():
+            start = time.perf_counter()
+            verifier.prepare()
+            bounds = verifier.bucket_range()
+            submitted[table] = time.perf_counter()
+            seconds[table] = submitted[table] - start
+            futures[table] = [
+                (executor.submit(_timed, verifier.source_checksums, first, last), executor.submit(_timed, verifier.target_checksums, first, last))
+                for first, last in (_segments(*bounds, max(1, workers // 2)) if bounds else [])
+            ]
+        checksums: Dict[str, Tuple[Dict[int, Tuple[int, str]], Dict[int, Tuple[int, str]]]] = {}
+        for table, pairs in futures.items():
+            source: Dict[int, Tuple[int, str]] = {}
+            target: Dict[int, Tuple[int, str]] = {}
+            finished = submitted[table]
+            for source_future, target_future in pairs:
+                (source_part, source_end), (target_part, target_end) = source_future.result(), target_future.result()
+                source.update(source_part)
+                target.update(target_part)
+                finished = max(finished, source_end, target_end)
+            seconds[table] += finished - submitted[table]
+            checksums[table] = (source, target)
+
+    report: Dict[str, Dict[str, Any]] = {}
+    for table, (source, target) in checksums.items():
+        start = time.perf_counter()
+        mismatched = sorted(bucket for bucket in source.keys() | target.keys() if source.get(bucket) != target.get(bucket))
+        details = verifiers[table].drill_down(mismatched) if mismatched else {
+            "missing_in_target": [], "extra_in_target": [], "different": [],
+        }
+        report[table] = {
+            "ok": not mismatched,
+            "rows": sum(count for count, _ in source.values()),
+            "chunks": len(source.keys() | target.keys()),
+            "mismatched_chunks": len(mismatched),
+            **details,
+            "seconds": round(seconds[table] + time.perf_counter() - start, 2),
+        }
+    return report
+
+def print_report(report: Dict[str, Dict[str, Any]]) -> bool:
+    """Doğrulama raporunu yazdırır; tüm tablolar eşleşiyorsa True döner"""
+    all_ok = True
+    for table, result in report.items():
+        if result["ok"]:
+            print(f"✅ {table}: {result['rows']} kayıt, {result['chunks']} aralık eşleşti ({result['seconds']:.1f} sn)")
+            continue
+        all_ok = False
+        print(f"❌ {table}: {result['mismatched_chunks']}/{result['chunks']} aralık uyuşmuyor ({result['seconds']:.1f} sn)")
+        if result["missing_in_target"]:
+            ids = result["missing_in_target"]
+            print(f"   Hedefte eksik {len(ids)} kayıt: {ids[:MAX_REPORTED_ROWS]}")
+        if result["extra_in_target"]:
+            ids = result["extra_in_target"]
+            print(f"   Hedefte fazla {len(ids)} kayıt: {ids[:MAX_REPORTED_ROWS]}")
+        for row in result["different"][:MAX_REPORTED_ROWS]:
+            print(f"   id={row['id']} farklı: {row['columns']}")
+        if len(result["different"]) > MAX_REPORTED_ROWS:
+            print(f"   ... toplam {len(result['different'])} farklı kayıt")
+    return all_ok
+
+# Test fonksiyonu
+def test_verify(connect: Callable[[], Any], sqlite_manager) -> bool:
+    """Migrasyon sonrası hedefte yapılan bozulmaların tam olarak bulunduğunu doğrular
+    `sqlite_manager` verisi `connect` veritabanına henüz aktarılmış olmalıdır; test hedefi değiştirir.
+    """
+    clean = verify_tables(sqlite_manager, connect, tables=("loans",))
+    clean_ok = clean["loans"]["ok"]
+    print(f"{'✅' if clean_ok else '❌'} Temiz migrasyon eşleşti ({clean['loans']['rows']} kayıt)")
+
+    with closing(connect()) as connection, closing(connection.cursor()) as cursor:
+        cursor.execute("SELECT MIN(id), MAX(id) FROM loans")
+        first_id, last_id = cursor.fetchone()
+        cursor.execute("DELETE FROM loans WHERE id = %s", (last_id,))
+        cursor.execute("UPDATE loans SET due_date = due_date + 1 WHERE id = %s", (first_id,))
+        connection.commit()
+    broken = verify_tables(sqlite_manager, connect, tables=("loans",))["loans"]
+    found = (broken["missing_in_target"] == [last_id] and [row["id"] for row in broken["different"]] == [first_id]
+             and list(broken["different"][0]["columns"]) == ["due_date"])
+    print(f"{'✅' if found else '❌'} Bozulmalar bulundu: eksik {broken['missing_in_target']}, "
+          f"farklı {[row['id'] for row in broken['different']]} ({broken['mismatched_chunks']} aralık incelendi)")
+    return clean_ok and found
+
+if __name__ == "__main__":
+    import sys
+    from database_manager import SQLiteManager
+    from migrate_data import get_postgres_connection
+    if sys.argv[1:] == ["test"]:
+        # Sentetik veri boş hedefe aktarılır, ardından test hedefi bozar
+        import tempfile
+        from generate_dataset import SyntheticSource, load_sqlite
+        from migrate_data import create_postgres_tables
+        from migration_engine import MigrationEngine, SQLiteSource
+        print("🧪 Migrasyon doğrulaması test ediliyor (boş bir veritabanında çalıştırın)...")
+        source_path = os.path.join(tempfile.mkdtemp(), "verify_source.db")
+        load_sqlite(SyntheticSource(books=2000, members=500, loans=30000, seed=3), source_path, log=lambda message: None)
+        source_manager = SQLiteManager(source_path)
+        create_postgres_tables()
+        MigrationEngine(get_postgres_connection, SQLiteSource(source_manager), log=lambda message: None).run()
+        sys.exit(0 if test_verify(get_postgres_connection, source_manager) else 1)
+    print("🔍 SQLite ve PostgreSQL verileri karşılaştırılıyor...")
+    ok = print_report(verify_tables(SQLiteManager(sys.argv[1] if len(sys.argv) > 1 else "database.db"), get_postgres_connection))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,37 @@
+"""Add keyset pagination indexes
+
+Revision ID: 0768d3732b5a
+Revises: 9c90999e7bf3
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0768d3732b5a'
+down_revision: Union[str, Sequence[str], None] = '9c90999e7bf3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset sayfalama indeksleri: (sıralama kolonu, id)
+    op.create_index('ix_books_title_id', 'books', ['title', 'id'], unique=False)
+    op.create_index('ix_members_name_id', 'members', ['name', 'id'], unique=False)
+    # Yalnızca aktif ödünçleri kapsayan kısmi indeks
+    op.create_index(
+        'ix_loans_active_loan_date_id', 'loans', ['loan_date', 'id'], unique=False,
+        postgresql_where=sa.text('return_date IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loans_active_loan_date_id', table_name='loans')
+    op.drop_index('ix_members_name_id', table_name='members')
+    op.drop_index('ix_books_title_id', table_name='books')
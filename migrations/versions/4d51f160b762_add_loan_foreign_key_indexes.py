@@ -0,0 +1,31 @@
+"""Add loan foreign key indexes
+
+Revision ID: 4d51f160b762
+Revises: bd3808fa827e
+Create Date: 2026-10-18 15:21:09.112840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d51f160b762'
+down_revision: Union[str, Sequence[str], None] = 'bd3808fa827e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Kopya üye/kitap silinirken yapılan FK kontrolleri tüm ödünç tablosunu taramasın
+    op.create_index('ix_loans_book_id', 'loans', ['book_id'], unique=False)
+    op.create_index('ix_loans_member_id', 'loans', ['member_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loans_member_id', table_name='loans')
+    op.drop_index('ix_loans_book_id', table_name='loans')
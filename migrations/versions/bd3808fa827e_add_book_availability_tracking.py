@@ -0,0 +1,48 @@
+"""Add book availability tracking
+
+Revision ID: bd3808fa827e
+Revises: 0768d3732b5a
+Create Date: 2026-10-18 11:02:17.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bd3808fa827e'
+down_revision: Union[str, Sequence[str], None] = '0768d3732b5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('is_on_loan', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    # Aktif ödünç bulma indeksi (backfill bu indeksi kullanır)
+    op.create_index(
+        'ix_loans_active_book_id', 'loans', ['book_id'], unique=False,
+        postgresql_where=sa.text('return_date IS NULL'),
+    )
+
+    # Mevcut aktif ödünçlerden bayrağı doldur
+    op.execute("""
+        UPDATE books SET is_on_loan = TRUE
+        WHERE id IN (SELECT book_id FROM loans WHERE return_date IS NULL)
+    """)
+
+    # Rafta olan kitaplar için kısmi indeks
+    op.create_index(
+        'ix_books_available_title_id', 'books', ['title', 'id'], unique=False,
+        postgresql_where=sa.text('NOT is_on_loan'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_available_title_id', table_name='books')
+    op.drop_index('ix_loans_active_book_id', table_name='loans')
+    op.drop_column('books', 'is_on_loan')
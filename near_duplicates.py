@@ -0,0 +1,342 @@
+# Benzer Kayıt (Near-Duplicate) Tespiti
+# Birebir aynı olmayan ama aynı kitabı/üyeyi gösteren kayıtları ("Romeo ve Juliet" /
+# "Romeo and Juliet") MinHash imzaları ve LSH kovaları ile tüm çiftleri karşılaştırmadan bulur
+import random
+import re
+import sys
+import time
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from catalog_search import fold
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # requirements.txt'te var; yoksa imzalar saf Python ile (1M kayıtta çok daha yavaş) hesaplanır
+    np = None
+    NUMPY_AVAILABLE = False
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_DIGITS_RE = re.compile(r"\D")
+# Bağlaç ve tanımlıklar benzerliği bozmasın: "Romeo ve Juliet" == "Romeo and Juliet"
+STOPWORDS = frozenset({"ve", "ile", "and", "the", "a", "an", "of", "bir", "&"})
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16  # 16 bant x 4 satır: ~%50 benzerlikte aday olma olasılığı ~%64, %70'te ~%98
+DEFAULT_SHINGLE_SIZE = 3
+# Bu boyuttan büyük kovalarda tüm çiftler yerine yalnızca en küçük id'ye bağlanan çiftler üretilir
+MAX_BUCKET_SIZE = 20
+# NumPy ile imza hesaplanırken bir seferde işlenen kayıt sayısı
+SIGNATURE_CHUNK = 20000
+
+_MASK64 = (1 << 64) - 1
+
+def normalize_text(text: Optional[str]) -> str:
+    """Metni katlanmış, bağlaçlardan arındırılmış kelimelere indirger"""
+    if not text:
+        return ""
+    return " ".join(token for token in _TOKEN_RE.findall(fold(text)) if token not in STOPWORDS)
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """E-postayı küçük harfe çevirir; boşsa None"""
+    if not email:
+        return None
+    return email.strip().lower() or None
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Telefonun son 10 hanesini döndürür (ülke kodu ve başındaki 0 farkı önemsenmez)"""
+    digits = _DIGITS_RE.sub("", phone or "")
+    return digits[-10:] if len(digits) >= 7 else None
+
+def shingle_hashes(texts: Sequence[Optional[str]], size: int = DEFAULT_SHINGLE_SIZE) -> List[int]:
+    """Alanların n-gram'larını (UTF-8 bayt) 32 bit özetlere çevirir (alan sırası özete katılır)"""
+    hashes = set()
+    for field, text in enumerate(texts):
+        normalized = normalize_text(text)
+        if not normalized:
+            continue
+        data = f" {normalized} ".encode()
+        salt = zlib.crc32(f"{field}:".encode())
+        hashes.update(zlib.crc32(data[position:position + size], salt)
+                      for position in range(max(1, len(data) - size + 1)))
+    return list(hashes)
+
+class NearDuplicateFinder:
+    """MinHash + LSH ile benzer kayıt adaylarını bulur
+
+    - Her kayıt için alanlarının karakter n-gram kümesinden `num_perm` değerli MinHash
+      imzası çıkarılır (iki imzanın eşit değer oranı Jaccard benzerliğinin tahminidir)
+    - İmza `bands` banda bölünür; herhangi bir bantta aynı kovaya düşen kayıtlar aday olur
+    - Ayrıca ISBN, e-posta gibi engelleme (blocking) anahtarları birebir aynı olan kayıtlar
+      metinleri farklı olsa da aday olur
+    Aday üretimi kova başına sınırlı olduğundan kayıt sayısıyla yaklaşık doğrusal büyür.
+    """
+
+    def __init__(
+        self,
+        key_names: Sequence[str] = (),
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+        max_bucket_size: int = MAX_BUCKET_SIZE,
+        use_numpy: Optional[bool] = None,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) bant sayısına ({bands}) tam bölünmeli")
+        self.key_names = tuple(key_names)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_bucket_size = max_bucket_size
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else use_numpy and NUMPY_AVAILABLE
+        rng = random.Random(seed)
+        # Çarp-kaydır (multiply-shift) evrensel özet fonksiyonları: h(x) = ((a*x + b) mod 2^64) >> 32
+        self._a = [rng.getrandbits(64) | 1 for _ in range(num_perm)]
+        self._b = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._ids = array("q")
+        self._signatures = array("I")
+        self._pending: List[List[int]] = []
+        self._keys: List[Dict[Any, List[int]]] = [{} for _ in self.key_names]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, record_id: int, texts: Sequence[Optional[str]], keys: Sequence[Optional[str]] = ()) -> None:
+        """Kaydı ekler: `texts` benzerliği ölçülen alanlar, `keys` engelleme anahtarları (key_names sırasıyla)"""
+        index = len(self._ids)
+        self._ids.append(record_id)
+        hashes = shingle_hashes(texts, self.shingle_size)
+        if not hashes:
+            # Boş kayıt hiçbir kayda benzememeli: id'ye özgü tek bir özet ver
+            hashes = [zlib.crc32(f"#{record_id}".encode())]
+        self._pending.append(hashes)
+        if len(self._pending) >= SIGNATURE_CHUNK:
+            self._flush()
+        for position, key in enumerate(keys):
+            if key:
+                self._keys[position].setdefault(key, []).append(index)
+
+    def add_many(self, records: Iterable[Tuple[int, Sequence[Optional[str]], Sequence[Optional[str]]]]) -> int:
+        """(id, texts, keys) demetlerini ekler; eklenen kayıt sayısını döndürür"""
+        count = 0
+        for record_id, texts, keys in records:
+            self.add(record_id, texts, keys)
+            count += 1
+        return count
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        if self.use_numpy:
+            self._signatures.frombytes(self._numpy_signatures(self._pending).tobytes())
+        else:
+            for hashes in self._pending:
+                self._signatures.extend(
+                    min(((a * x + b) & _MASK64) >> 32 for x in hashes)
+                    for a, b in zip(self._a, self._b)
+                )
+        self._pending = []
+
+    def _numpy_signatures(self, pending: List[List[int]]):
+        lengths = np.fromiter((len(hashes) for hashes in pending), dtype=np.int64, count=len(pending))
+        values = np.fromiter((x for hashes in pending for x in hashes), dtype=np.uint64, count=int(lengths.sum()))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures = np.empty((len(pending), self.num_perm), dtype=np.uint32)
+        shift = np.uint64(32)
+        for column, (a, b) in enumerate(zip(self._a, self._b)):
+            permuted = (values * np.uint64(a) + np.uint64(b)) >> shift
+            signatures[:, column] = np.minimum.reduceat(permuted, starts)
+        return signatures
+
+    def _signature_matrix(self):
+        return np.frombuffer(self._signatures, dtype=np.uint32).reshape(-1, self.num_perm)
+
+    def _bucket_pairs(self, members: List[int], pairs: set) -> None:
+        if len(members) == 2:
+            left, right = members
+            pairs.add((left << 32) | right if left < right else (right << 32) | left)
+            return
+        members.sort()
+        if len(members) <= self.max_bucket_size:
+            for position, left in enumerate(members):
+                for right in members[position + 1:]:
+                    pairs.add((left << 32) | right)
+        else:
+            first = members[0]
+            for right in members[1:]:
+                pairs.add((first << 32) | right)
+
+    def _lsh_pairs(self) -> set:
+        pairs: set = set()
+        rows = self.rows_per_band
+        if self.use_numpy:
+            matrix = self._signature_matrix()
+            for band in range(self.bands):
+                block = matrix[:, band * rows:(band + 1) * rows]
+                keys = np.zeros(len(block), dtype=np.uint64)
+                for column in range(rows):
+                    keys = keys * np.uint64(0x9E3779B97F4A7C15) + block[:, column].astype(np.uint64)
+                order = np.argsort(keys, kind="stable")
+                ordered = keys[order]
+                boundaries = np.flatnonzero(ordered[1:] != ordered[:-1]) + 1
+                starts = np.concatenate(([0], boundaries))
+                ends = np.concatenate((boundaries, [len(ordered)]))
+                for start, end in zip(starts[ends - starts > 1].tolist(), ends[ends - starts > 1].tolist()):
+                    self._bucket_pairs(order[start:end].tolist(), pairs)
+        else:
+            signatures = self._signatures
+            width = self.num_perm
+            for band in range(self.bands):
+                buckets: Dict[bytes, List[int]] = {}
+                offset = band * rows
+                for index in range(len(self._ids)):
+                    start = index * width + offset
+                    buckets.setdefault(signatures[start:start + rows].tobytes(), []).append(index)
+                for members in buckets.values():
+                    if len(members) > 1:
+                        self._bucket_pairs(members, pairs)
+        return pairs
+
+    def _scores(self, pairs: List[int]) -> List[float]:
+        if not pairs:
+            return []
+        if self.use_numpy:
+            matrix = self._signature_matrix()
+            encoded = np.array(pairs, dtype=np.uint64)
+            left = (encoded >> np.uint64(32)).astype(np.int64)
+            right = (encoded & np.uint64(0xFFFFFFFF)).astype(np.int64)
+            scores = np.empty(len(pairs))
+            for start in range(0, len(pairs), SIGNATURE_CHUNK):
+                stop = start + SIGNATURE_CHUNK
+                scores[start:stop] = (matrix[left[start:stop]] == matrix[right[start:stop]]).mean(axis=1)
+            return scores.tolist()
+        signatures, width = self._signatures, self.num_perm
+        scores = []
+        for pair in pairs:
+            left, right = (pair >> 32) * width, (pair & 0xFFFFFFFF) * width
+            same = sum(1 for x, y in zip(signatures[left:left + width], signatures[right:right + width]) if x == y)
+            scores.append(same / width)
+        return scores
+
+    def candidates(self, min_score: float = 0.5, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Aday çiftleri benzerlik puanına göre azalan sırada döndürür
+
+        Puan, MinHash ile tahmin edilen Jaccard benzerliğidir. LSH adaylarından `min_score`
+        altındakiler elenir; engelleme anahtarı eşleşen çiftler puandan bağımsız listelenir.
+        Dönüş: [{"left_id", "right_id", "score", "matched_on"}]
+        """
+        self._flush()
+        lsh_pairs = self._lsh_pairs()
+        key_matches: Dict[int, List[str]] = {}
+        for name, blocks in zip(self.key_names, self._keys):
+            for members in blocks.values():
+                if len(members) < 2:
+                    continue
+                block_pairs: set = set()
+                self._bucket_pairs(list(members), block_pairs)
+                for pair in block_pairs:
+                    key_matches.setdefault(pair, []).append(name)
+
+        pairs = list(lsh_pairs | key_matches.keys())
+        results = []
+        for pair, score in zip(pairs, self._scores(pairs)):
+            keys = key_matches.get(pair)
+            if score < min_score and not keys:
+                continue
+            matched_on = (["minhash"] if pair in lsh_pairs and score >= min_score else []) + (keys or [])
+            results.append({
+                "left_id": self._ids[pair >> 32],
+                "right_id": self._ids[pair & 0xFFFFFFFF],
+                "score": round(score, 3),
+                "matched_on": matched_on,
+            })
+        results.sort(key=lambda item: (-item["score"], -len(item["matched_on"]), item["left_id"], item["right_id"]))
+        return results[:limit] if limit is not None else results
+
+def cluster_candidates(candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aday çiftleri birleşim-bul (union-find) ile gruplara toplar; en büyük grup önce
+    Her grup için önerilen hayatta kalan kayıt en düşük id'dir.
+    """
+    parent: Dict[int, int] = {}
+
+    def find(item: int) -> int:
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    best: Dict[Tuple[int, int], float] = {}
+    for candidate in candidates:
+        left, right = find(candidate["left_id"]), find(candidate["right_id"])
+        if left != right:
+            parent[max(left, right)] = min(left, right)
+        best[(candidate["left_id"], candidate["right_id"])] = candidate["score"]
+
+    groups: Dict[int, List[int]] = {}
+    for item in parent:
+        groups.setdefault(find(item), []).append(item)
+    scores: Dict[int, List[float]] = {}
+    for (left, _), score in best.items():
+        scores.setdefault(find(left), []).append(score)
+    clusters = [
+        {"survivor_id": root, "ids": sorted(ids), "max_score": max(scores[root]), "min_score": min(scores[root])}
+        for root, ids in groups.items()
+    ]
+    clusters.sort(key=lambda cluster: (-len(cluster["ids"]), -cluster["max_score"], cluster["survivor_id"]))
+    return clusters
+
+# Test fonksiyonu
+def test_near_duplicates(size: int = 200000, variants: int = 2000) -> bool:
+    """Sentetik katalogda bilinen benzer kayıtların bulunmasını (recall) ve süreyi kontrol eder"""
+    rng = random.Random(7)
+    syllables = ["ka", "le", "mi", "ra", "şe", "tu", "yo", "gü", "da", "ne", "bo", "çi", "ar", "el", "in", "ön"]
+    words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(30000)]
+    titles = [" ".join(rng.choice(words) for _ in range(rng.randint(2, 5))) for _ in range(size)]
+    people = [f"{rng.choice(words).title()} {rng.choice(words).title()}" for _ in range(20000)]
+    authors = [rng.choice(people) for _ in range(size)]
+
+    def perturb(title: str) -> str:
+        choice = rng.random()
+        if choice < 0.4:
+            return title.replace(" ", " ve ", 1)  # bağlaç eklenmiş
+        if choice < 0.7:
+            position = rng.randrange(len(title))
+            return title[:position] + title[position + 1:]  # harf düşmüş
+        return title.upper()  # büyük harfle yazılmış
+
+    finder = NearDuplicateFinder(key_names=("isbn",))
+    start = time.perf_counter()
+    finder.add_many((i + 1, (titles[i], authors[i]), (f"978{i:010d}",)) for i in range(size))
+    expected = set()
+    for offset in range(variants):
+        original = rng.randrange(size)
+        record_id = size + offset + 1
+        finder.add(record_id, (perturb(titles[original]), authors[original]), (None,))
+        expected.add((original + 1, record_id))
+    # Metni tamamen farklı ama ISBN'i aynı kayıt engelleme anahtarıyla yakalanmalı
+    finder.add(size + variants + 1, ("Tamamen başka bir ad", "Başka Yazar"), ("978" + f"{0:010d}",))
+    expected.add((1, size + variants + 1))
+    candidates = finder.candidates(min_score=0.5)
+    elapsed = time.perf_counter() - start
+
+    found = {(candidate["left_id"], candidate["right_id"]) for candidate in candidates}
+    recall = len(expected & found) / len(expected)
+    ok = recall >= 0.95
+    mode = "NumPy" if finder.use_numpy else "saf Python"
+    print(f"{'✅' if ok else '❌'} {size + variants + 1} kayıtta {len(candidates)} aday, "
+          f"bilinen çiftlerin %{recall * 100:.1f}'i bulundu ({elapsed:.1f} sn, {mode})")
+
+    same = normalize_text("Romeo ve Juliet") == normalize_text("ROMEO AND JULIET")
+    print(f"{'✅' if same else '❌'} 'Romeo ve Juliet' ile 'ROMEO AND JULIET' aynı normalleşiyor")
+    clusters = cluster_candidates(candidates)
+    print(f"📊 {len(clusters)} grup, en büyüğü {len(clusters[0]['ids']) if clusters else 0} kayıt")
+    return ok and same
+
+if __name__ == "__main__":
+    print("🧪 Benzer kayıt tespiti test ediliyor...")
+    sys.exit(0 if test_near_duplicates() else 1)
@@ -0,0 +1,262 @@
+# Canlı Profil Çıkarma
+# Çalışan süreçten süre sınırlı, örnekleme tabanlı CPU profili (flamegraph için "collapsed"
+# yığınlar) ve tracemalloc anlık görüntüleri/farkları üretir; yeniden başlatmadan
+# yavaşlığın ve bellek artışının nereden geldiği görülebilir.
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# CPU profili sınırları: profil en fazla MAX_PROFILE_SECONDS sürer
+DEFAULT_PROFILE_SECONDS = 10.0
+MAX_PROFILE_SECONDS = 60.0
+DEFAULT_INTERVAL = 0.005
+MIN_INTERVAL = 0.001
+# Yaprak çerçevesi bunlardan biri olan örnekler boşta bekleyen thread'dir (include_idle=False ise atlanır).
+# uvloop döngüsü C'de döndüğü için boştaki olay döngüsü thread'inin yaprağı runners.run olur.
+IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("thread.py", "_worker"), ("socket.py", "accept"), ("ssl.py", "read"),
+    ("runners.py", "run"),
+}
+# Bellek: saklanan en fazla anlık görüntü ve izlenen yığın derinliği
+MAX_SNAPSHOTS = 5
+DEFAULT_TRACE_FRAMES = 10
+
+class ProfilerBusy(RuntimeError):
+    """Aynı anda ikinci bir CPU profili başlatılamaz"""
+
+class SamplingProfiler:
+    """Tüm thread'lerin yığınlarını sabit aralıkla örnekleyen istatistiksel profil çıkarıcı
+
+    Örnekleme ayrı bir thread'de sys._current_frames() ile yapılır; profil çıkarılan kod
+    değiştirilmez ve çağrı başına maliyet eklenmez. Maliyet örnek başına yığın yürüme süresidir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[Any, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _label(self, code, line: Optional[int]) -> str:
+        if line is not None:
+            return f"{code.co_name} ({os.path.basename(code.co_filename)}:{line})"
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)})"
+        return label
+
+    def profile(self, seconds: float = DEFAULT_PROFILE_SECONDS, interval: float = DEFAULT_INTERVAL,
+                include_idle: bool = False, include_lines: bool = False) -> Dict[str, Any]:
+        """`seconds` boyunca örnekler (bloklar) ve yığın sayımlarını döndürür"""
+        seconds = min(max(seconds, interval), MAX_PROFILE_SECONDS)
+        interval = max(interval, MIN_INTERVAL)
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("Bir CPU profili zaten çalışıyor")
+        try:
+            own = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks: Counter = Counter()
+            samples = idle = 0
+            sampling_time = 0.0
+            start = time.perf_counter()
+            deadline = start + seconds
+            next_sample = start
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now < next_sample:
+                    time.sleep(next_sample - now)
+                next_sample += interval
+                sample_start = time.perf_counter()
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    code = frame.f_code
+                    if not include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                        idle += 1
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(self._label(frame.f_code, frame.f_lineno if include_lines else None))
+                        frame = frame.f_back
+                    if ident not in names:
+                        names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    labels.append(names.get(ident, f"thread-{ident}"))
+                    labels.reverse()
+                    stacks[";".join(labels)] += 1
+                samples += 1
+                sampling_time += time.perf_counter() - sample_start
+            elapsed = time.perf_counter() - start
+        finally:
+            self._lock.release()
+        return {
+            "seconds": round(elapsed, 3),
+            "interval_ms": interval * 1000,
+            "samples": samples,
+            "idle_samples_skipped": idle,
+            # Örnekleyici thread'in harcadığı süre / profil süresi (GIL paylaşıldığı için yaklaşık maliyet)
+            "overhead": round(sampling_time / elapsed, 4) if elapsed else 0.0,
+            "stacks": dict(stacks.most_common()),
+        }
+
+def collapsed(profile: Dict[str, Any]) -> str:
+    """flamegraph.pl / speedscope için "kök;...;yaprak sayı" satırları"""
+    return "".join(f"{stack} {count}\n" for stack, count in profile["stacks"].items())
+
+def _location(frame) -> str:
+    return f"{frame.filename}:{frame.lineno}"
+
+class MemoryProfiler:
+    """tracemalloc anlık görüntülerini alır, saklar ve karşılaştırır
+
+    `client_count` verilirse her görüntüye bağlı NiceGUI istemci sayısı eklenir; fark
+    raporu toplam artışı istemci artışına bölerek istemci başına bellek artışını verir.
+    """
+
+    def __init__(self, client_count: Optional[Callable[[], int]] = None):
+        self.client_count = client_count
+        self.snapshots: "OrderedDict[str, tuple[tracemalloc.Snapshot, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = DEFAULT_TRACE_FRAMES) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        """İzlemeyi durdurur ve görüntüleri bırakır (tracemalloc izlerken bellek ve CPU harcar)"""
+        tracemalloc.stop()
+        with self._lock:
+            self.snapshots.clear()
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        with self._lock:
+            snapshots = [{"id": key, **meta} for key, (_, meta) in self.snapshots.items()]
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "tracemalloc_overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+            "snapshots": snapshots,
+        }
+
+    def snapshot(self, label: str = "") -> Dict[str, Any]:
+        """Yeni görüntü alır; en eskisi MAX_SNAPSHOTS aşılınca silinir"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc çalışmıyor; önce start() çağrılmalı")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        meta = {
+            "label": label,
+            "taken_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "traced_kb": round(sum(stat.size for stat in snapshot.statistics("filename")) / 1024, 1),
+            "clients": self.client_count() if self.client_count else None,
+        }
+        key = uuid.uuid4().hex[:8]
+        with self._lock:
+            self.snapshots[key] = (snapshot, meta)
+            while len(self.snapshots) > MAX_SNAPSHOTS:
+                self.snapshots.popitem(last=False)
+        return {"id": key, **meta}
+
+    def diff(self, base: str, target: str, group_by: str = "lineno", limit: int = 30,
+             filename: Optional[str] = None) -> Dict[str, Any]:
+        """İki görüntü arasındaki en büyük artışlar; `filename` yalnızca o dosyada ayrılan belleği tutar"""
+        with self._lock:
+            if base not in self.snapshots or target not in self.snapshots:
+                raise KeyError("Anlık görüntü bulunamadı")
+            (old, old_meta), (new, new_meta) = self.snapshots[base], self.snapshots[target]
+        if filename:
+            # Yığının herhangi bir çerçevesi eşleşirse (ör. main.py'den çağrılan NiceGUI kodu) dahil edilir
+            filters = (tracemalloc.Filter(True, f"*{filename}", all_frames=True),)
+            old, new = old.filter_traces(filters), new.filter_traces(filters)
+        stats = new.compare_to(old, group_by)
+        total = sum(stat.size_diff for stat in stats)
+        clients_delta = (new_meta["clients"] - old_meta["clients"]
+                         if new_meta["clients"] is not None and old_meta["clients"] is not None else None)
+        entries = []
+        for stat in stats[:limit]:
+            entry: Dict[str, Any] = {
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "size_kb": round(stat.size / 1024, 1),
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            if group_by == "traceback":
+                entry["traceback"] = [_location(frame) for frame in stat.traceback]
+            else:
+                entry["location"] = _location(stat.traceback[0])
+            entries.append(entry)
+        return {
+            "base": {"id": base, **old_meta},
+            "target": {"id": target, **new_meta},
+            "group_by": group_by,
+            "filename": filename,
+            "total_diff_kb": round(total / 1024, 1),
+            "clients_delta": clients_delta,
+            "per_client_kb": round(total / 1024 / clients_delta, 1) if clients_delta else None,
+            "top": entries,
+        }
+
+# Test fonksiyonu
+def test_profiler() -> bool:
+    """Sıcak fonksiyonun profilde baskın çıktığını ve istemci başına bellek artışının bulunduğunu doğrular"""
+    stop = threading.Event()
+
+    def hot_loop() -> None:
+        while not stop.is_set():
+            sum(i * i for i in range(2000))
+
+    worker = threading.Thread(target=hot_loop, name="sicak-is", daemon=True)
+    worker.start()
+    profiler = SamplingProfiler()
+    try:
+        result = profiler.profile(seconds=1.0, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+    hot = sum(count for stack, count in result["stacks"].items() if stack.startswith("sicak-is;") and "hot_loop" in stack)
+    total = sum(result["stacks"].values())
+    lines = collapsed(result).splitlines()
+    cpu_ok = total > 0 and hot / total > 0.8 and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    print(f"{'✅' if cpu_ok else '❌'} CPU profili: {result['samples']} örnek, sıcak fonksiyon %{hot / max(total, 1) * 100:.0f}, "
+          f"örnekleme maliyeti %{result['overhead'] * 100:.2f}")
+
+    clients: List[List[bytes]] = []
+    memory = MemoryProfiler(client_count=lambda: len(clients))
+    memory.start()
+    try:
+        base = memory.snapshot("önce")
+        for _ in range(20):
+            clients.append([bytes(1024) for _ in range(50)])  # İstemci başına ~50 KB
+        target = memory.snapshot("sonra")
+        report = memory.diff(base["id"], target["id"], filename=os.path.basename(__file__))
+    finally:
+        memory.stop()
+    per_client = report["per_client_kb"] or 0
+    top_here = bool(report["top"]) and os.path.basename(__file__) in report["top"][0]["location"]
+    memory_ok = 45 <= per_client <= 70 and top_here
+    print(f"{'✅' if memory_ok else '❌'} Bellek farkı: {report['clients_delta']} istemci, istemci başına {per_client} KB, "
+          f"en büyük artış {report['top'][0]['location'] if report['top'] else '-'}")
+    return cpu_ok and memory_ok
+
+if __name__ == "__main__":
+    print("🧪 Canlı profil çıkarıcı test ediliyor...")
+    sys.exit(0 if test_profiler() else 1)
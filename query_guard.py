@@ -0,0 +1,145 @@
+# Sorgu Bütçesi Koruması
+# Bir sayfanın/işlemin kaç SQL sorgusu çalıştırdığını sayar ve N+1 desenlerini yakalar
+import functools
+import inspect
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Sayaçlar bağlama (context) özeldir: aynı anda çalışan diğer istemcilerin sorguları karışmaz
+_active_counters: ContextVar[tuple] = ContextVar("query_guard_counters", default=())
+
+# QUERY_BUDGET_STRICT=1 ise bütçe aşımı hata fırlatır, aksi halde uyarı yazdırılır
+STRICT = os.getenv("QUERY_BUDGET_STRICT", "0") == "1"
+
+class QueryBudgetExceeded(AssertionError):
+    """Sorgu bütçesi aşıldığında fırlatılır"""
+
+class QueryCounter:
+    """Bir blok içinde çalışan SQL ifadelerini toplar"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+# Tüm motorlar için tek dinleyici; aktif sayaç yoksa maliyeti tek bir ContextVar okumasıdır
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active_counters.get():
+        counter.statements.append(statement)
+
+@contextmanager
+def count_queries():
+    """Blok içindeki sorguları sayar
+
+    Örnek:
+        with count_queries() as counter:
+            get_members_page()
+        print(counter.count)
+    """
+    counter = QueryCounter()
+    token = _active_counters.set(_active_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "blok", strict: Optional[bool] = None):
+    """Blok `max_queries` sayısından fazla sorgu çalıştırırsa hata fırlatır (veya uyarır)"""
+    strict = STRICT if strict is None else strict
+    with count_queries() as counter:
+        yield counter
+    if counter.count > max_queries:
+        message = f"{label} {counter.count} sorgu çalıştırdı (bütçe: {max_queries})"
+        if strict:
+            raise QueryBudgetExceeded(message + "\n" + "\n".join(counter.statements))
+        print(f"⚠️ Sorgu bütçesi aşıldı: {message}")
+
+def query_budget_page(max_queries: int) -> Callable:
+    """Sayfa fonksiyonları için sorgu bütçesi dekoratörü"""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with query_budget(max_queries, label=func.__name__):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with query_budget(max_queries, label=func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Test fonksiyonu
+def test_page_query_budgets() -> bool:
+    """Liste sayfalarının ve sayfa fonksiyonlarının sabit sayıda sorgu çalıştırdığını doğrular (geçici SQLite ile)"""
+    import asyncio
+    import tempfile
+    from nicegui import Client, ui
+    import main
+    import query_guard as guard  # main'in kullandığı modül (__main__ olarak çalışırken ayrı kopyadır)
+
+    original_url = main.engine.url.render_as_string(hide_password=False)
+    original_strict = guard.STRICT
+    workdir = tempfile.mkdtemp(prefix="query_budget_")
+    # Sayfalar sorguları run_db ile başka thread'de çalıştırdığı için bellek içi değil dosya veritabanı gerekir
+    main.bind_database(f"sqlite:///{workdir}/budget.db")
+    main.init_db()
+    guard.STRICT = True
+    try:
+        for i in range(60):
+            main.create_member(f"Üye {i}")
+            main.create_book(f"Kitap {i}", "Yazar")
+        for i in range(1, 30):
+            main.create_loan(i, i, "2024-01-01", "2024-02-01")
+        # Bütçeler indeksler hazırken geçerlidir (açılıştaki yedek aramalar veritabanına gider)
+        main.build_catalog_index()
+
+        # Sayfa boyutundan bağımsız olarak her liste tek sorguyla gelmeli
+        checks = [
+            ("members", main.get_members_page, 1),
+            ("books", main.get_books_page, 1),
+            ("loans", main.get_active_loans_page, 1),
+        ]
+        for name, fetch_page, budget in checks:
+            with query_budget(budget, label=name, strict=True):
+                page = fetch_page(limit=50)
+                # Görünümün kullandığı tüm alanlara erişim ek sorgu üretmemeli
+                [dict(row) for row in page["items"]]
+            print(f"✅ {name}: {len(page['items'])} satır, bütçe {budget} sorgu")
+
+        # Sayfa fonksiyonlarının kendisi: @query_budget_page bütçesi strict modda aşılırsa hata fırlatır
+        async def build_pages() -> None:
+            for page_function in (main.books_page, main.members_page, main.loans_page):
+                with count_queries() as counter:
+                    with Client(ui.page("/__query_budget_test"), request=None):
+                        await page_function()
+                print(f"✅ {page_function.__name__}: {counter.count} sorgu")
+
+        main.login_user()
+        try:
+            asyncio.run(build_pages())
+        finally:
+            main.logout_user()
+        return True
+    except QueryBudgetExceeded as e:
+        print(f"❌ {e}")
+        return False
+    finally:
+        guard.STRICT = original_strict
+        main.bind_database(original_url)
+
+if __name__ == "__main__":
+    import sys
+    print("🧪 Sorgu bütçeleri test ediliyor...")
+    sys.exit(0 if test_page_query_budgets() else 1)
@@ -0,0 +1,297 @@
+# Yavaş Sorgu Günlüğü
+# Eşik süresini aşan SQL ifadelerini normalize edilmiş SQL, parametreler, süre, çağıran kod
+# satırı ve sorgu planıyla dönen (rotating) JSON satır günlüğüne yazar. PostgreSQL'de
+# EXPLAIN (ANALYZE, BUFFERS), SQLite'ta EXPLAIN QUERY PLAN çıktısı eklenir.
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from db_metrics import fingerprint_sql
+
+def _threshold_from_env() -> Optional[float]:
+    value = os.getenv("SLOW_QUERY_SECONDS", "0.5").strip().lower()
+    return None if value in ("", "off") else float(value)
+
+# Eşik (sn); SLOW_QUERY_SECONDS=off günlüğü kapatır. Her sayı eşiktir: 0 ve 0.0 tüm sorguları yazar
+SLOW_QUERY_SECONDS = _threshold_from_env()
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", os.path.join("logs", "slow_queries.jsonl"))
+SLOW_QUERY_LOG_BYTES = int(os.getenv("SLOW_QUERY_LOG_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+# analyze: PostgreSQL'de SELECT'ler yeniden çalıştırılarak ölçülür; plan: yalnızca plan; off: plan yok
+EXPLAIN_MODE = os.getenv("SLOW_QUERY_EXPLAIN", "analyze")
+# Aynı parmak izi için bu süre içinde ikinci kez EXPLAIN yapılmaz (yavaş sorguyu iki katına çıkarmamak için)
+EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+EXPLAIN_TIMEOUT_MS = 30000
+
+MAX_PARAMETER_LENGTH = 200
+MAX_PARAMETERS = 50
+_SENSITIVE_RE = re.compile(r"password|salt|hash|token|secret", re.IGNORECASE)
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+_WRITES_RE = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+# Çağıran aranırken atlanan dosyalar (veri erişim katmanı) ve bu modülün kendi çerçeveleri
+_SKIPPED_FILES = {"database_manager.py", "db_metrics.py", "async_db.py", "query_guard.py"}
+_SKIPPED_FUNCTIONS = {"find_caller", "log_slow_query", "_after_cursor_execute"}
+_THIS_FILE = os.path.abspath(__file__)
+_PROJECT_DIR = os.path.dirname(_THIS_FILE)
+
+_logger = logging.getLogger("library.slow_queries")
+_logger.propagate = False
+_lock = threading.Lock()
+_last_explained: Dict[str, float] = {}
+
+def configure(threshold: Optional[float] = SLOW_QUERY_SECONDS, path: Optional[str] = None,
+              explain: Optional[str] = None) -> None:
+    """Eşiği (None: kapalı, 0.0: tüm sorgular), günlük dosyasını ve EXPLAIN kipini çalışma anında değiştirir"""
+    global SLOW_QUERY_SECONDS, SLOW_QUERY_LOG, EXPLAIN_MODE
+    SLOW_QUERY_SECONDS = threshold
+    if explain is not None:
+        EXPLAIN_MODE = explain
+    if path is not None and path != SLOW_QUERY_LOG:
+        SLOW_QUERY_LOG = path
+        with _lock:
+            for handler in list(_logger.handlers):
+                _logger.removeHandler(handler)
+                handler.close()
+            _last_explained.clear()
+
+def is_slow(seconds: float) -> bool:
+    return SLOW_QUERY_SECONDS is not None and seconds >= SLOW_QUERY_SECONDS
+
+def _handler_ready() -> None:
+    """Dosya ilk yavaş sorguda açılır; eşik aşılmadıkça logs/ dizini oluşmaz"""
+    if _logger.handlers:
+        return
+    with _lock:
+        if _logger.handlers:
+            return
+        os.makedirs(os.path.dirname(SLOW_QUERY_LOG) or ".", exist_ok=True)
+        handler = RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_BYTES,
+                                      backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.INFO)
+
+def _parameter(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bayt>"
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = str(value)
+    return text if len(text) <= MAX_PARAMETER_LENGTH else text[:MAX_PARAMETER_LENGTH] + "…"
+
+def safe_parameters(params: Any) -> Any:
+    """Parametreleri JSON'a uygun, kısaltılmış ve hassas alanları maskelenmiş hale getirir"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {
+            key: "***" if _SENSITIVE_RE.search(str(key)) else _parameter(value)
+            for key, value in list(params.items())[:MAX_PARAMETERS]
+        }
+    if isinstance(params, (list, tuple)):
+        return [_parameter(value) for value in list(params)[:MAX_PARAMETERS]]
+    return _parameter(params)
+
+def find_caller() -> str:
+    """Sorguyu başlatan proje içi ilk çerçeve: "main.py:512 create_loan" """
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        name = os.path.basename(filename)
+        skipped = name in _SKIPPED_FILES or (frame.f_code.co_name in _SKIPPED_FUNCTIONS and os.path.abspath(filename) == _THIS_FILE)
+        if not skipped and os.path.dirname(os.path.abspath(filename)) == _PROJECT_DIR:
+            return f"{name}:{frame.f_lineno} {frame.f_code.co_name}"
+        if fallback is None and not skipped and "sqlalchemy" not in filename:
+            fallback = f"{name}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or "?"
+
+def _sqlite_plan(rows: List[Any]) -> str:
+    """EXPLAIN QUERY PLAN satırlarını (id, parent, notused, detail) girintili ağaca çevirir"""
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for row in rows:
+        node, parent, detail = row[0], row[1], row[3]
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return "\n".join(lines)
+
+def _run(cursor, sql: str, params: Any) -> None:
+    if params:
+        cursor.execute(sql, params)
+    else:
+        cursor.execute(sql)
+
+def explain(dialect: str, connection, statement: str, params: Any = None) -> Tuple[str, Optional[str]]:
+    """Sorgu planını DBAPI bağlantısı üzerinde alır: (kip, plan metni)
+
+    PostgreSQL'de açık bir transaction varsa EXPLAIN bir SAVEPOINT içinde çalışır; EXPLAIN
+    hata verse bile uygulamanın transaction'ı bozulmaz. ANALYZE yalnızca veri değiştirmeyen
+    sorgularda kullanılır, DML için sadece tahmini plan alınır.
+    """
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    if EXPLAIN_MODE == "off" or operation not in _EXPLAINABLE:
+        return "none", None
+    if dialect == "sqlite":
+        mode, sql = "query_plan", f"EXPLAIN QUERY PLAN {statement}"
+    elif dialect == "postgresql":
+        analyze = EXPLAIN_MODE == "analyze" and not _WRITES_RE.search(statement)
+        mode = "analyze" if analyze else "plan"
+        sql = f"EXPLAIN ({'ANALYZE, BUFFERS, ' if analyze else ''}FORMAT TEXT) {statement}"
+    else:
+        return "none", None
+
+    cursor = connection.cursor()
+    try:
+        if dialect == "sqlite":
+            _run(cursor, sql, params)
+            return mode, _sqlite_plan(cursor.fetchall())
+        in_transaction = connection.get_transaction_status() != 0  # 0: TRANSACTION_STATUS_IDLE
+        if in_transaction:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+            _run(cursor, sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            # SET LOCAL ve ANALYZE'ın tüm etkileri geri alınır
+            if in_transaction:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            else:
+                connection.rollback()
+        return mode, plan
+    finally:
+        cursor.close()
+
+def log_slow_query(dialect: str, connection, statement: str, params: Any, seconds: float,
+                   source: str, executemany: bool = False,
+                   parameter_names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Yavaş sorgu kaydını planıyla birlikte günlüğe yazar ve döndürür
+    `parameter_names` konumsal parametreleri adlandırır (hassas alanların maskelenmesi için).
+    """
+    fingerprint, normalized = fingerprint_sql(statement)
+    record: Dict[str, Any] = {
+        "time": datetime.now().isoformat(timespec="milliseconds"),
+        "duration_ms": round(seconds * 1000, 2),
+        "threshold_ms": round(SLOW_QUERY_SECONDS * 1000, 2) if SLOW_QUERY_SECONDS is not None else None,
+        "source": source,
+        "dialect": dialect,
+        "fingerprint": fingerprint,
+        "statement": normalized,
+        "caller": find_caller(),
+    }
+    if executemany:
+        record["parameter_sets"] = len(params) if hasattr(params, "__len__") else None
+    elif parameter_names and isinstance(params, (list, tuple)) and len(parameter_names) == len(params):
+        record["parameters"] = safe_parameters(dict(zip(parameter_names, params)))
+    else:
+        record["parameters"] = safe_parameters(params)
+
+    now = time.monotonic()
+    with _lock:
+        due = now - _last_explained.get(fingerprint, -EXPLAIN_INTERVAL) >= EXPLAIN_INTERVAL
+        if due and not executemany:
+            _last_explained[fingerprint] = now
+    if executemany:
+        record["plan_mode"], record["plan"] = "none", None
+    elif not due:
+        record["plan_mode"], record["plan"] = "skipped", None  # Yakın zamanda EXPLAIN yapıldı
+    else:
+        try:
+            record["plan_mode"], record["plan"] = explain(dialect, connection, statement, params)
+        except Exception as exc:
+            record["plan_mode"], record["plan"] = "error", f"{type(exc).__name__}: {exc}"
+
+    _handler_ready()
+    _logger.info(json.dumps(record, ensure_ascii=False, default=str))
+    return record
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["slow_query_start"].pop()
+    if is_slow(elapsed):
+        # Konumsal parametreli sürücülerde (sqlite3) adlar derlenmiş ifadeden alınır
+        names = getattr(getattr(context, "compiled", None), "positiontup", None)
+        log_slow_query(conn.dialect.name, cursor.connection, statement, parameters, elapsed,
+                       source="sqlalchemy", executemany=executemany, parameter_names=names)
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("slow_query_start"):
+        connection.info["slow_query_start"].pop()
+
+# Tüm SQLAlchemy motorları (main.py ORM çağrıları) için dinleyiciler
+event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+event.listen(Engine, "handle_error", _handle_error)
+
+def read_log(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Günlükteki kayıtları okur (yalnızca etkin dosya, dönmüş yedekler hariç)"""
+    path = path or SLOW_QUERY_LOG
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+# Test fonksiyonu
+def test_slow_query_log() -> bool:
+    """SQLAlchemy ve SQLiteManager sorgularının plan ve çağıranla günlüğe yazıldığını doğrular"""
+    import tempfile
+    from sqlalchemy import create_engine, text
+    from database_manager import SQLiteManager
+
+    # `python slow_query_log.py` ile çalışınca bu dosya __main__ olur; database_manager ise
+    # slow_query_log modülünü ayrıca yükler. Ayarlar o modül üzerinden yapılmalı.
+    import slow_query_log as log
+
+    workdir = tempfile.mkdtemp()
+    previous = (log.SLOW_QUERY_SECONDS, log.SLOW_QUERY_LOG, log.EXPLAIN_MODE)
+    log.configure(threshold=0.0, path=os.path.join(workdir, "slow.jsonl"), explain="analyze")
+    try:
+        manager = SQLiteManager(os.path.join(workdir, "manager.db"), pool_max=1)
+        manager.execute_update("INSERT INTO members (name, email, password_hash) VALUES (?, ?, ?)",
+                               ("Ayşe", "ayse@example.com", "gizli"))
+        manager.execute_query("SELECT * FROM members WHERE email = ?", ("ayse@example.com",))
+        manager.close()
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'orm.db')}")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT, password_hash TEXT)"))
+            connection.execute(text("INSERT INTO people (name, password_hash) VALUES (:name, :password_hash)"),
+                               {"name": "Ali", "password_hash": "x"})
+            for _ in range(2):
+                connection.execute(text("SELECT * FROM people WHERE name = :name"), {"name": "Ali"})
+        engine.dispose()
+        records = log.read_log()
+    finally:
+        log.configure(*previous)
+
+    manager_select = next(r for r in records if r["source"] == "database_manager" and r["statement"].startswith("SELECT * FROM members"))
+    orm_selects = [r for r in records if r["source"] == "sqlalchemy" and r["statement"].startswith("SELECT * FROM people")]
+    orm_insert = next(r for r in records if r["source"] == "sqlalchemy" and r["statement"].startswith("INSERT"))
+    planned = "SEARCH members USING INDEX" in (manager_select["plan"] or "") and "SCAN people" in (orm_selects[0]["plan"] or "")
+    callers = all("test_slow_query_log" in record["caller"] for record in (manager_select, orm_selects[0]))
+    rate_limited = [r["plan_mode"] for r in orm_selects] == ["query_plan", "skipped"]
+    masked = orm_insert["parameters"] == {"name": "Ali", "password_hash": "***"}
+    print(f"{'✅' if planned else '❌'} Planlar yazıldı: {manager_select['plan']!r} / {orm_selects[0]['plan']!r}")
+    print(f"{'✅' if callers else '❌'} Çağıran: {manager_select['caller']} / {orm_selects[0]['caller']}")
+    print(f"{'✅' if rate_limited else '❌'} Aynı parmak izi için tekrar EXPLAIN yapılmadı")
+    print(f"{'✅' if masked else '❌'} Hassas parametre maskelendi: {orm_insert['parameters']}")
+    return planned and callers and rate_limited and masked
+
+if __name__ == "__main__":
+    print("🧪 Yavaş sorgu günlüğü test ediliyor...")
+    sys.exit(0 if test_slow_query_log() else 1)
@@ -0,0 +1,353 @@
+# İstek İzleme (Tracing)
+# Her HTTP isteği için toplam süreyi, veritabanı çağrılarında ve NiceGUI sayfa kurulumunda
+# geçen süreyi ölçer. Sonuç tarayıcı geliştirici araçlarının okuduğu Server-Timing
+# başlığına ve OpenTelemetry uyumlu (OTLP/JSON) span satırları olarak dosyaya yazılır;
+# dosya OpenTelemetry Collector'ın otlpjsonfile alıcısıyla doğrudan okunabilir.
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from db_metrics import fingerprint_sql
+
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "yb-library")
+# TRACE_FILE=off span dosyasını kapatır (Server-Timing başlığı yine eklenir)
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join("logs", "traces.jsonl"))
+TRACE_FILE_BYTES = int(os.getenv("TRACE_FILE_BYTES", str(20 * 1024 * 1024)))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", "5"))
+# SERVER_TIMING=0 başlığı kapatır (süreler istemciye gösterilmez)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") != "0"
+# Statik dosyalar ve websocket izlenmez
+EXCLUDED_PREFIXES = ("/_nicegui",)
+# Bir istekte tek tek span'ı yazılan en fazla sorgu; fazlası yalnızca toplam süreye eklenir
+MAX_DB_SPANS = 100
+# Yazılmayı bekleyen en fazla iz; kuyruk doluysa yeni izler atılır (dropped_traces) ve istek beklemez
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+
+# OTLP span türleri
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+class Span:
+    __slots__ = ("name", "kind", "span_id", "parent_id", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, name: str, kind: int, parent_id: Optional[str], start_ns: int):
+        self.name = name
+        self.kind = kind
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = start_ns
+        self.attributes: Dict[str, Any] = {}
+
+class RequestTrace:
+    """Bir isteğin span'ları ve Server-Timing toplamları"""
+
+    def __init__(self, name: str, traceparent: Optional[str] = None):
+        match = _TRACEPARENT_RE.match(traceparent or "")
+        # Gelen W3C traceparent varsa aynı iz kimliği altında devam edilir
+        self.trace_id = match.group(1) if match else os.urandom(16).hex()
+        self.root = Span(name, KIND_SERVER, match.group(2) if match else None, time.time_ns())
+        self.spans: List[Span] = [self.root]
+        self.db_seconds = 0.0
+        self.db_count = 0
+        self.render_seconds = 0.0
+        self.started = time.perf_counter()
+
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar("tracing_request", default=None)
+_parent: ContextVar[Optional[str]] = ContextVar("tracing_parent", default=None)
+
+_exporter = logging.getLogger("library.traces")
+_exporter.propagate = False
+_exporter_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+dropped_traces = 0
+
+def current_trace() -> Optional[RequestTrace]:
+    return _trace.get()
+
+@contextmanager
+def render_span(name: str):
+    """NiceGUI sayfa kurulumunu ölçer; içindeki sorgu süresi render süresinden düşülür"""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    span = Span(f"render {name}", KIND_INTERNAL, _parent.get(), time.time_ns())
+    trace.spans.append(span)
+    token = _parent.set(span.span_id)
+    start, db_before = time.perf_counter(), trace.db_seconds
+    try:
+        yield
+    finally:
+        _parent.reset(token)
+        span.end_ns = time.time_ns()
+        db_seconds = trace.db_seconds - db_before
+        trace.render_seconds += max(0.0, time.perf_counter() - start - db_seconds)
+        span.attributes["library.db.duration_ms"] = round(db_seconds * 1000, 3)
+
+def traced_page(func: Callable) -> Callable:
+    """Sayfa fonksiyonları için render span dekoratörü"""
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with render_span(func.__name__):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with render_span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+# Sorgu span'ları: istek dışındaki sorgularda maliyet tek bir ContextVar okumasıdır
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _trace.get() is not None:
+        conn.info.setdefault("tracing_start", []).append((time.time_ns(), time.perf_counter()))
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _trace.get()
+    if trace is None:
+        return
+    start_ns, start = conn.info["tracing_start"].pop()
+    trace.db_seconds += time.perf_counter() - start
+    trace.db_count += 1
+    if trace.db_count <= MAX_DB_SPANS:
+        span = Span(f"db {statement.lstrip().split(None, 1)[0].upper()}", KIND_CLIENT, _parent.get(), start_ns)
+        span.end_ns = time.time_ns()
+        # Normalizasyon (fingerprint_sql) dışa aktarma thread'inde yapılır; burada yalnızca ham metin tutulur
+        span.attributes = {"db.system": conn.dialect.name, "db.statement": statement}
+        trace.spans.append(span)
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("tracing_start"):
+        connection.info["tracing_start"].pop()
+
+def server_timing(trace: RequestTrace, total_seconds: float) -> str:
+    """Server-Timing başlık değeri (ms)"""
+    return (f"total;dur={total_seconds * 1000:.1f}, "
+            f'db;dur={trace.db_seconds * 1000:.1f};desc="{trace.db_count} sorgu", '
+            f"render;dur={trace.render_seconds * 1000:.1f}")
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+def to_otlp(trace: RequestTrace) -> Dict[str, Any]:
+    """İzi OTLP/JSON ExportTraceServiceRequest biçimine çevirir"""
+    spans = []
+    for span in trace.spans:
+        attributes = dict(span.attributes)
+        if "db.statement" in attributes:
+            attributes["db.statement"] = fingerprint_sql(attributes["db.statement"])[1]
+        record = {
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [_attribute(key, value) for key, value in attributes.items()],
+        }
+        if span.parent_id:
+            record["parentSpanId"] = span.parent_id
+        if span is trace.root and attributes.get("http.status_code", 0) >= 500:
+            record["status"] = {"code": 2}  # STATUS_CODE_ERROR
+        spans.append(record)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+        "scopeSpans": [{"scope": {"name": "library.tracing"}, "spans": spans}],
+    }]}
+
+class _OTLPFormatter(logging.Formatter):
+    """Kayıttaki RequestTrace'i OTLP/JSON satırına çevirir (dışa aktarma thread'inde çalışır)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(to_otlp(record.msg), ensure_ascii=False, separators=(",", ":"))
+
+class _TraceQueueHandler(QueueHandler):
+    """İz nesnesini biçimlendirmeden kuyruğa koyar; dolu kuyrukta izi atar"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global dropped_traces
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_traces += 1
+
+def _start_exporter() -> None:
+    global _listener
+    with _exporter_lock:
+        if _listener is not None:
+            return
+        os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+        handler = RotatingFileHandler(TRACE_FILE, maxBytes=TRACE_FILE_BYTES, backupCount=TRACE_FILE_BACKUPS, encoding="utf-8")
+        handler.setFormatter(_OTLPFormatter())
+        records: queue.Queue = queue.Queue(TRACE_QUEUE_SIZE)
+        _listener = QueueListener(records, handler)
+        _listener.start()
+        _exporter.addHandler(_TraceQueueHandler(records))
+        _exporter.setLevel(logging.INFO)
+
+def stop_exporter() -> None:
+    """Kuyruktaki izleri dosyaya yazar ve dışa aktarma thread'ini durdurur"""
+    global _listener
+    with _exporter_lock:
+        listener, _listener = _listener, None
+        for handler in list(_exporter.handlers):
+            _exporter.removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+atexit.register(stop_exporter)
+
+def _export(trace: RequestTrace) -> None:
+    """İzi kuyruğa koyar; normalizasyon, JSON ve dosya yazımı olay döngüsünü bloklamaz"""
+    if TRACE_FILE == "off":
+        return
+    if _listener is None:
+        _start_exporter()
+    _exporter.info(trace)
+
+async def trace_requests(request, call_next):
+    """HTTP ara katmanı: app.middleware("http")(trace_requests) ile kaydedilir"""
+    path = request.url.path
+    if path.startswith(EXCLUDED_PREFIXES):
+        return await call_next(request)
+    trace = RequestTrace(f"{request.method} {path}", request.headers.get("traceparent"))
+    token, parent_token = _trace.set(trace), _parent.set(trace.root.span_id)
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        _parent.reset(parent_token)
+        _trace.reset(token)
+        total = time.perf_counter() - trace.started
+        route = getattr(request.scope.get("route"), "path", None)
+        root = trace.root
+        root.end_ns = time.time_ns()
+        if route:
+            root.name = f"{request.method} {route}"
+        root.attributes = {
+            "http.method": request.method,
+            "http.route": route or path,
+            "http.target": path,
+            "http.status_code": status,
+            "library.db.count": trace.db_count,
+            "library.db.duration_ms": round(trace.db_seconds * 1000, 3),
+            "library.render.duration_ms": round(trace.render_seconds * 1000, 3),
+        }
+        _export(trace)
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = server_timing(trace, total)
+    return response
+
+# Test fonksiyonu
+def test_tracing() -> bool:
+    """Server-Timing başlığını ve OTLP span ağacını küçük bir FastAPI uygulamasıyla doğrular"""
+    import tempfile
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine, text
+    from async_db import run_db
+
+    global TRACE_FILE
+    previous_file = TRACE_FILE
+    stop_exporter()
+    TRACE_FILE = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    engine = create_engine("sqlite://")
+
+    def query() -> int:
+        with engine.connect() as connection:
+            time.sleep(0.02)
+            return connection.execute(text("SELECT 1 WHERE 1 = :x"), {"x": 1}).scalar()
+
+    app = FastAPI()
+    app.middleware("http")(trace_requests)
+
+    @app.get("/sayfa/{kind}")
+    @traced_page
+    async def page(kind: str) -> Dict[str, Any]:
+        time.sleep(0.03)  # Eleman kurulumu yerine
+        return {"values": [await run_db(query), await run_db(query)]}
+
+    try:
+        parent = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+        response = TestClient(app).get("/sayfa/kitap", headers={"traceparent": parent})
+        header = response.headers.get("server-timing", "")
+        timings = dict(re.findall(r"(\w+);dur=([\d.]+)", header))
+        header_ok = (set(timings) == {"total", "db", "render"} and '"2 sorgu"' in header
+                     and float(timings["render"]) >= 30 and float(timings["total"]) >= float(timings["render"]) + float(timings["db"]))
+
+        # İstek yolunda yalnızca kuyruğa koyma kalmalı: biçimlendirme dışa aktarma thread'inde çalışır
+        heavy = RequestTrace("GET /agir")
+        for i in range(MAX_DB_SPANS):
+            span = Span("db SELECT", KIND_CLIENT, heavy.root.span_id, time.time_ns())
+            span.attributes = {"db.system": "sqlite", "db.statement": f"SELECT * FROM books WHERE id IN ({', '.join(['?'] * 50)}) AND title = 'x{i}'"}
+            heavy.spans.append(span)
+        queue_handlers = [handler for handler in _exporter.handlers if isinstance(handler, _TraceQueueHandler)]
+        listener_thread = _listener._thread if _listener is not None else None
+        formatter = _listener.handlers[0].formatter if _listener is not None else _OTLPFormatter()
+        format_threads = []
+
+        def recording_format(record: logging.LogRecord, original=formatter.format) -> str:
+            format_threads.append(threading.current_thread())
+            return original(record)
+
+        formatter.format = recording_format
+        _export(heavy)
+        stop_exporter()  # Kuyruk boşaltılıp dosyaya yazılır
+        with open(TRACE_FILE, encoding="utf-8") as file:
+            lines = file.readlines()
+        spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    finally:
+        stop_exporter()
+        TRACE_FILE = previous_file
+    by_name = {span["name"]: span for span in spans}
+    root, render = by_name.get("GET /sayfa/{kind}"), by_name.get("render page")
+    db_spans = [span for span in spans if span["name"] == "db SELECT"]
+    tree_ok = (root is not None and render is not None and len(db_spans) == 2
+               and root.get("parentSpanId") == "b" * 16 and all(span["traceId"] == "a" * 32 for span in spans)
+               and render["parentSpanId"] == root["spanId"] and all(span["parentSpanId"] == render["spanId"] for span in db_spans)
+               and db_spans[0]["attributes"][1]["value"]["stringValue"] == "SELECT ? WHERE ? = ?")
+    print(f"{'✅' if header_ok else '❌'} Server-Timing: {header}")
+    print(f"{'✅' if tree_ok else '❌'} OTLP span ağacı: {', '.join(span['name'] for span in spans)}")
+    offloaded = (len(lines) == 2 and len(queue_handlers) == 1 and listener_thread is not None
+                 and set(format_threads) == {listener_thread} and listener_thread is not threading.main_thread())
+    print(f"{'✅' if offloaded else '❌'} Dışa aktarma kuyruk üzerinden: {len(queue_handlers)} kuyruk işleyicisi, "
+          f"biçimlendirme {', '.join(sorted({thread.name for thread in format_threads})) or 'yapılmadı'} thread'inde, {len(lines)} satır")
+    return header_ok and tree_ok and offloaded
+
+if __name__ == "__main__":
+    print("🧪 İstek izleme test ediliyor...")
+    sys.exit(0 if test_tracing() else 1)
@@ -0,0 +1,171 @@
+# Typeahead (Yazarken Öneri) İndeksi
+# Kitap ve üye seçicileri için kelime başı önek araması yapan sıralı dizi
+import sys
+import threading
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from catalog_search import fold
+
+# Her tuş vuruşunda istemciye gönderilecek en fazla öneri sayısı
+DEFAULT_LIMIT = 20
+# Bir etiketin kaç kelime başından indeksleneceği ("Orhan Pamuk" -> "orhan pamuk", "pamuk")
+MAX_WORD_KEYS = 8
+# update_many bu sayıdan az kaydı tek tek (ikili arama ile) günceller; fazlası için dizi tek geçişte süzülür
+BULK_UPDATE_MIN = 64
+
+def _word_keys(label: str) -> List[str]:
+    """Etiketin her kelime başından başlayan katlanmış son eklerini döndürür"""
+    folded = " ".join(fold(label).split())
+    keys = [folded]
+    position = folded.find(" ")
+    while position != -1 and len(keys) < MAX_WORD_KEYS:
+        keys.append(folded[position + 1:])
+        position = folded.find(" ", position + 1)
+    return keys
+
+class PrefixIndex:
+    """Sıralı (anahtar, id) dizisi üzerinde ikili arama ile önek eşleştirme
+
+    Sorgu maliyeti O(log n + limit) olduğundan sayfa yükü ve her tuş vuruşu,
+    katalog ya da üye sayısından bağımsızdır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: List[Tuple[str, int]] = []
+        self._labels: Dict[int, str] = {}
+        self.ready = False  # Yükleyici tüm kayıtları ekleyince True yapar
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._labels
+
+    def add(self, item_id: int, label: str) -> None:
+        """Kaydı ekler (varsa etiketini günceller)"""
+        with self._lock:
+            self._remove_locked(item_id)
+            self._labels[item_id] = label
+            for key in _word_keys(label):
+                insort(self._entries, (key, item_id))
+
+    def add_many(self, items: Iterable[Tuple[int, str]]) -> int:
+        """Toplu ekleme: dizi en sonda bir kez sıralanır"""
+        count = 0
+        with self._lock:
+            for item_id, label in items:
+                self._remove_locked(item_id)
+                self._labels[item_id] = label
+                self._entries.extend((key, item_id) for key in _word_keys(label))
+                count += 1
+            self._entries.sort()
+        return count
+
+    def update_many(self, items: Iterable[Tuple[int, str]] = (), remove_ids: Iterable[int] = ()) -> None:
+        """Toplu güncelleme: eski anahtarlar dizi tek geçişte süzülerek çıkarılır, yeniler bir kez sıralanır
+
+        Kayıt başına add()/remove() her anahtar için diziyi kaydırır; birleştirme gibi binlerce
+        kaydın değiştiği işlemlerde bu, kilit tutulurken O(n * değişen) süre demektir.
+        """
+        items = list(items)
+        stale = set(remove_ids)
+        stale.update(item_id for item_id, _ in items)
+        with self._lock:
+            if len(stale) < BULK_UPDATE_MIN:
+                for item_id in stale:
+                    self._remove_locked(item_id)
+                for item_id, label in items:
+                    self._labels[item_id] = label
+                    for key in _word_keys(label):
+                        insort(self._entries, (key, item_id))
+                return
+            stale = {item_id for item_id in stale if self._labels.pop(item_id, None) is not None}
+            if stale:
+                self._entries = [entry for entry in self._entries if entry[1] not in stale]
+            for item_id, label in items:
+                self._labels[item_id] = label
+                self._entries.extend((key, item_id) for key in _word_keys(label))
+            if items:
+                self._entries.sort()
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            self._remove_locked(item_id)
+
+    def _remove_locked(self, item_id: int) -> None:
+        label = self._labels.pop(item_id, None)
+        if label is None:
+            return
+        for key in _word_keys(label):
+            position = bisect_left(self._entries, (key, item_id))
+            if position < len(self._entries) and self._entries[position] == (key, item_id):
+                del self._entries[position]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._labels.clear()
+            self.ready = False
+
+    def search(self, query: Optional[str], limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """Herhangi bir kelimesi `query` ile başlayan en fazla `limit` kaydı döndürür"""
+        prefix = " ".join(fold(query or "").split())
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._entries, (prefix, -1))
+            while position < len(self._entries) and len(results) < limit:
+                key, item_id = self._entries[position]
+                if not key.startswith(prefix):
+                    break
+                if item_id not in seen:
+                    seen.add(item_id)
+                    results.append({"id": item_id, "label": self._labels[item_id]})
+                position += 1
+        return results
+
+def book_label(title: str, author: str) -> str:
+    return f"{title} - {author}"
+
+# Test fonksiyonu
+def test_typeahead() -> bool:
+    """Önek eşleşmesi, Türkçe katlama ve silme kontrolü"""
+    index = PrefixIndex()
+    index.add_many([(1, "Orhan Pamuk"), (2, "Oğuz Atay"), (3, "İlber Ortaylı"), (4, "Ahmet Ümit")])
+    checks = [
+        ("or", {1, 3}),
+        ("pam", {1}),
+        ("ILBER", {3}),
+        ("ogu", {2}),
+        ("umit", {4}),
+    ]
+    ok = True
+    for query, expected in checks:
+        found = {item["id"] for item in index.search(query)}
+        passed = found == expected
+        ok = ok and passed
+        print(f"{'✅' if passed else '❌'} '{query}' -> {sorted(found)}")
+    index.remove(1)
+    removed = not index.search("pamuk")
+    print(f"{'✅' if removed else '❌'} Silinen kayıt önerilerden çıktı")
+
+    # Toplu güncelleme: tek tek add/remove ile aynı sonucu vermeli
+    bulk, single = PrefixIndex(), PrefixIndex()
+    for target in (bulk, single):
+        target.add_many((item_id, f"Kitap {item_id} - Yazar {item_id % 7}") for item_id in range(1, 1001))
+    changed = [(item_id, f"Yeni {item_id} - Yazar {item_id % 5}") for item_id in range(1, 301, 3)]
+    dropped = list(range(2, 601, 3))
+    bulk.update_many(changed, dropped)
+    for item_id, label in changed:
+        single.add(item_id, label)
+    for item_id in dropped:
+        single.remove(item_id)
+    batched = bulk._entries == single._entries and bulk._labels == single._labels
+    print(f"{'✅' if batched else '❌'} Toplu güncelleme tekil işlemlerle aynı: {len(bulk)} kayıt")
+    return ok and removed and batched
+
+if __name__ == "__main__":
+    print("🧪 Typeahead indeksi test ediliyor...")
+    sys.exit(0 if test_typeahead() else 1)